@@ -0,0 +1,338 @@
+import org.cryptomator.cryptofs.CryptoFileSystemProperties;
+import org.cryptomator.cryptofs.CryptoFileSystemProvider;
+import org.cryptomator.cryptolib.api.Cryptor;
+import org.cryptomator.cryptolib.api.CryptorProvider;
+import org.cryptomator.cryptolib.api.Masterkey;
+import org.cryptomator.cryptolib.api.MasterkeyLoadingFailedException;
+import org.cryptomator.cryptolib.common.MasterkeyFileAccess;
+import org.cryptomator.integrations.mount.Mount;
+import org.cryptomator.integrations.mount.MountBuilder;
+import org.cryptomator.integrations.mount.MountCapability;
+import org.cryptomator.integrations.mount.MountService;
+
+import java.io.BufferedReader;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.io.OutputStreamWriter;
+import java.io.PrintWriter;
+import java.net.StandardProtocolFamily;
+import java.net.UnixDomainSocketAddress;
+import java.nio.channels.Channels;
+import java.nio.channels.ServerSocketChannel;
+import java.nio.channels.SocketChannel;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.FileSystem;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.security.SecureRandom;
+import java.util.Arrays;
+import java.util.Base64;
+import java.util.Map;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.atomic.AtomicInteger;
+
+/**
+ * One JVM serving the FUSE mounts of many vaults.
+ *
+ * Listens on a Unix socket for the line protocol of host.py: one request per
+ * line, tab-separated fields with the operation first, answered by "ok" or
+ * "err" plus tab-separated result fields.
+ *
+ *   ping
+ *   unlock  vault-path  mount-point  base64(password)
+ *   lock    vault-path  [force]
+ *   list                      -> ok  vault-path  mount-point  ...
+ *   idle    seconds
+ *   shutdown
+ *
+ * Exits after idle-seconds without mounts or connections; 0 keeps it running
+ * as a warm standby until an idle request sets a timeout.
+ */
+public class MountHost {
+    private static final String MOUNT_PROVIDER = "org.cryptomator.frontend.fuse.mount.LinuxFuseMountProvider";
+
+    private record Hosted(FileSystem fileSystem, Mount mount, Path mountPoint) {}
+
+    private final Map<String, Hosted> mounts = new ConcurrentHashMap<>();
+    private final Map<String, Object> vaultLocks = new ConcurrentHashMap<>();
+    private final MountService mountService;
+    private final MasterkeyFileAccess masterkeyAccess;
+    private volatile long lastActivity = System.nanoTime();
+    private volatile long idleSeconds;
+    private final AtomicInteger connections = new AtomicInteger();
+
+    private MountHost() throws Exception {
+        mountService = MountService.get()
+            .filter(service -> service.getClass().getName().equals(MOUNT_PROVIDER))
+            .findAny()
+            .orElseThrow(() -> new IllegalStateException("Mount provider not available: " + MOUNT_PROVIDER));
+        masterkeyAccess = new MasterkeyFileAccess(new byte[0], SecureRandom.getInstanceStrong());
+    }
+
+    public static void main(String[] args) {
+        if (args.length < 1) {
+            System.err.println("Usage: java MountHost <socket-path> [idle-seconds]");
+            System.exit(1);
+        }
+        try {
+            Path socketPath = Paths.get(args[0]);
+            MountHost host = new MountHost();
+            host.idleSeconds = args.length > 1 ? Long.parseLong(args[1]) : 600;
+            Runtime.getRuntime().addShutdownHook(new Thread(host::lockAll));
+            host.serve(socketPath);
+            System.exit(0);
+        } catch (Exception e) {
+            System.err.println("Mount host failed: " + e.getMessage());
+            e.printStackTrace();
+            System.exit(1);
+        }
+    }
+
+    private void serve(Path socketPath) throws IOException {
+        Files.deleteIfExists(socketPath);
+        try (ServerSocketChannel server = ServerSocketChannel.open(StandardProtocolFamily.UNIX)) {
+            server.bind(UnixDomainSocketAddress.of(socketPath));
+            System.out.println("Mount host listening on " + socketPath);
+            warmUp();
+
+            Thread idleWatch = new Thread(() -> {
+                while (true) {
+                    try {
+                        Thread.sleep(10_000);
+                    } catch (InterruptedException e) {
+                        return;
+                    }
+                    long idle = (System.nanoTime() - lastActivity) / 1_000_000_000L;
+                    if (idleSeconds > 0 && mounts.isEmpty() && connections.get() == 0 && idle >= idleSeconds) {
+                        System.out.println("Idle, exiting");
+                        try {
+                            server.close();
+                        } catch (IOException ignored) {
+                        }
+                        return;
+                    }
+                }
+            }, "idle-watch");
+            idleWatch.setDaemon(true);
+            idleWatch.start();
+
+            while (server.isOpen()) {
+                SocketChannel client;
+                try {
+                    client = server.accept();
+                } catch (IOException e) {
+                    break; // Closed by the idle watch or a shutdown request
+                }
+                Thread handler = new Thread(() -> handle(client, server), "client");
+                handler.setDaemon(true);
+                handler.start();
+            }
+        } finally {
+            Files.deleteIfExists(socketPath);
+        }
+    }
+
+    /** Load and run the crypto code once so the first unlock does not wait for it */
+    private void warmUp() {
+        try {
+            SecureRandom random = new SecureRandom();
+            Masterkey masterkey = Masterkey.generate(random);
+            Cryptor cryptor = CryptorProvider.forScheme(CryptorProvider.Scheme.SIV_GCM).provide(masterkey, random);
+            cryptor.fileNameCryptor().hashDirectoryId("");
+            cryptor.fileHeaderCryptor().encryptHeader(cryptor.fileHeaderCryptor().create());
+            cryptor.destroy();
+            masterkey.destroy();
+            CryptoFileSystemProperties.cryptoFileSystemProperties();
+        } catch (Exception e) {
+            System.err.println("Warm-up failed: " + e.getMessage());
+        }
+    }
+
+    private void handle(SocketChannel client, ServerSocketChannel server) {
+        connections.incrementAndGet();
+        try (client;
+             BufferedReader in = new BufferedReader(new InputStreamReader(Channels.newInputStream(client), StandardCharsets.UTF_8));
+             PrintWriter out = new PrintWriter(new OutputStreamWriter(Channels.newOutputStream(client), StandardCharsets.UTF_8), true)) {
+            String line;
+            while ((line = in.readLine()) != null) {
+                lastActivity = System.nanoTime();
+                String[] fields = line.split("\t", -1);
+                String reply;
+                try {
+                    reply = dispatch(fields);
+                } catch (Exception e) {
+                    reply = "err\t" + String.valueOf(e.getMessage()).replace('\t', ' ').replace('\n', ' ');
+                }
+                out.println(reply);
+                if (fields[0].equals("shutdown")) {
+                    lockAll();
+                    server.close();
+                    return;
+                }
+            }
+        } catch (IOException e) {
+            // Client went away
+        } finally {
+            connections.decrementAndGet();
+            lastActivity = System.nanoTime();
+        }
+    }
+
+    private String dispatch(String[] fields) throws Exception {
+        switch (fields[0]) {
+            case "ping":
+            case "shutdown":
+                return "ok";
+            case "unlock":
+                unlock(fields[1], Paths.get(fields[2]), fields[3]);
+                return "ok";
+            case "lock":
+                return lock(fields[1], fields.length > 2 && fields[2].equals("force")) ? "ok" : "err\tnot unlocked";
+            case "idle":
+                idleSeconds = Long.parseLong(fields[1]);
+                return "ok";
+            case "list":
+                StringBuilder reply = new StringBuilder("ok");
+                mounts.forEach((vault, hosted) -> reply.append('\t').append(vault).append('\t').append(hosted.mountPoint()));
+                return reply.toString();
+            default:
+                return "err\tunknown operation";
+        }
+    }
+
+    private void unlock(String vault, Path mountPoint, String encodedPassword) throws Exception {
+        // Vaults unlock in parallel; requests for the same vault queue up
+        synchronized (vaultLocks.computeIfAbsent(vault, key -> new Object())) {
+            unlockLocked(vault, mountPoint, encodedPassword);
+        }
+    }
+
+    private void unlockLocked(String vault, Path mountPoint, String encodedPassword) throws Exception {
+        Hosted existing = mounts.get(vault);
+        if (existing != null) {
+            if (isMounted(existing.mountPoint())) {
+                return;
+            }
+            // Unmounted behind our back (fusermount -u); mount it again
+            drop(vault, existing);
+        }
+        Path vaultPath = Paths.get(vault);
+        byte[] passwordBytes = Base64.getDecoder().decode(encodedPassword);
+        String password = new String(passwordBytes, StandardCharsets.UTF_8);
+        Arrays.fill(passwordBytes, (byte) 0);
+
+        CryptoFileSystemProperties properties = CryptoFileSystemProperties.cryptoFileSystemProperties()
+            .withKeyLoader(keyId -> {
+                if (!"masterkeyfile".equals(keyId.getScheme())) {
+                    throw new MasterkeyLoadingFailedException("Unsupported key scheme: " + keyId.getScheme());
+                }
+                return masterkeyAccess.load(vaultPath.resolve(keyId.getSchemeSpecificPart()), password);
+            })
+            .build();
+        FileSystem fileSystem = CryptoFileSystemProvider.newFileSystem(vaultPath, properties);
+        try {
+            MountBuilder builder = mountService.forFileSystem(fileSystem.getPath("/"));
+            if (mountService.hasCapability(MountCapability.MOUNT_FLAGS)) {
+                builder.setMountFlags(mountService.getDefaultMountFlags());
+            }
+            if (mountService.hasCapability(MountCapability.VOLUME_NAME)) {
+                builder.setVolumeName(vaultPath.getFileName().toString());
+            }
+            builder.setMountpoint(mountPoint);
+            Mount mount = builder.mount();
+            mounts.put(vault, new Hosted(fileSystem, mount, mountPoint));
+            System.out.println("Unlocked " + vault + " at " + mountPoint);
+        } catch (Exception e) {
+            fileSystem.close();
+            throw e;
+        }
+    }
+
+    private boolean lock(String vault, boolean force) throws Exception {
+        synchronized (vaultLocks.computeIfAbsent(vault, key -> new Object())) {
+            return lockLocked(vault, force);
+        }
+    }
+
+    private boolean lockLocked(String vault, boolean force) throws Exception {
+        Hosted hosted = mounts.get(vault);
+        if (hosted == null) {
+            return false;
+        }
+        try {
+            if (force) {
+                hosted.mount().unmountForced();
+            } else {
+                hosted.mount().unmount();
+            }
+        } catch (Exception e) {
+            if (isMounted(hosted.mountPoint())) {
+                throw e;
+            }
+            // Already unmounted externally: nothing left to unmount
+        }
+        drop(vault, hosted);
+        System.out.println("Locked " + vault);
+        return true;
+    }
+
+    private void drop(String vault, Hosted hosted) {
+        mounts.remove(vault, hosted);
+        try {
+            hosted.mount().close();
+        } catch (Exception e) {
+            System.err.println("Failed to close mount of " + vault + ": " + e.getMessage());
+        }
+        try {
+            hosted.fileSystem().close();
+        } catch (IOException e) {
+            System.err.println("Failed to close file system of " + vault + ": " + e.getMessage());
+        }
+    }
+
+    /** Whether anything is mounted at mountPoint according to /proc/self/mountinfo */
+    private static boolean isMounted(Path mountPoint) {
+        String target = mountPoint.toAbsolutePath().normalize().toString();
+        try {
+            for (String line : Files.readAllLines(Paths.get("/proc/self/mountinfo"), StandardCharsets.UTF_8)) {
+                String[] fields = line.split(" ", 6);
+                if (fields.length >= 5 && unescapeMountinfo(fields[4]).equals(target)) {
+                    return true;
+                }
+            }
+            return false;
+        } catch (IOException e) {
+            return true; // Cannot tell; keep the entry
+        }
+    }
+
+    private static String unescapeMountinfo(String field) {
+        // Whitespace and backslashes are escaped as \ooo
+        StringBuilder out = new StringBuilder(field.length());
+        for (int i = 0; i < field.length(); i++) {
+            char c = field.charAt(i);
+            if (c == '\\' && i + 3 < field.length()) {
+                try {
+                    out.append((char) Integer.parseInt(field.substring(i + 1, i + 4), 8));
+                    i += 3;
+                    continue;
+                } catch (NumberFormatException e) {
+                    // Not an escape sequence
+                }
+            }
+            out.append(c);
+        }
+        return out.toString();
+    }
+
+    private void lockAll() {
+        for (String vault : mounts.keySet()) {
+            try {
+                lock(vault, true);
+            } catch (Exception e) {
+                System.err.println("Failed to lock " + vault + ": " + e.getMessage());
+            }
+        }
+    }
+}
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for Locker's backend, without a vault, FUSE or Flatpak.
+
+cryptomator-cli, flatpak-spawn and fusermount3 are replaced by the fakes in
+fake-bin/, which simulate JVM startup, mount delay, portal latency and
+failures, and mount into a stand-in mount table (see fake_mounts.py). Each
+scenario runs in a fresh Python process with its own HOME and XDG
+directories and reports wall time, process spawns and peak RSS:
+
+  unlock_lock     sequential unlock + lock cycles of one vault
+  automount       auto-mount of many vaults, then lock_many
+  restore_states  mount state restore of a large vault list
+  store           vault list save, load, update and compaction at scale
+
+  python3 benchmarks/bench.py [--json out.json] [--compare base.json]
+
+--src runs the scenarios against another checkout's src/, so a baseline can
+be measured on the same machine; --compare then fails (exit 1) when a time
+grew by more than --tolerance or a scenario spawned more processes.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import tempfile
+import subprocess
+import statistics
+from collections import Counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FAKE_BIN = os.path.join(BENCH_DIR, "fake-bin")
+DEFAULT_SRC = os.path.join(os.path.dirname(BENCH_DIR), "src")
+POLL_INTERVAL = 0.005 # The fake mount table is a regular file: no POLLPRI, so poll
+
+SCENARIOS = ("unlock_lock", "automount", "restore_states", "store")
+
+
+# Scenarios, run in the child process
+
+def _ms_stats(seconds):
+    if not seconds:
+        return {}
+    ordered = sorted(seconds)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(ordered[max(0, math.ceil(len(ordered) * 0.95) - 1)] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def _make_vaults(work_dir, count, prefix="vault"):
+    from vault import Vault
+    root = os.path.join(work_dir, "vaults")
+    vaults = []
+    for index in range(count):
+        path = os.path.join(root, f"{prefix}{index:05d}")
+        os.makedirs(path, exist_ok=True)
+        vaults.append(Vault(name=f"{prefix}{index:05d}", path=path))
+    return vaults
+
+
+def scenario_unlock_lock(config, work_dir):
+    from backend import CryptomatorBackend
+    vault = _make_vaults(work_dir, 1)[0]
+    unlocks, locks, failures = [], [], 0
+    start = time.perf_counter()
+    for _ in range(config["cycles"]):
+        t0 = time.perf_counter()
+        success, mount_path = CryptomatorBackend.unlock(vault.path, "password")
+        t1 = time.perf_counter()
+        if not success:
+            failures += 1
+            continue
+        CryptomatorBackend.lock(vault.path, mount_path)
+        unlocks.append(t1 - t0)
+        locks.append(time.perf_counter() - t1)
+    return {
+        "wall_s": round(time.perf_counter() - start, 3),
+        "cycles": config["cycles"],
+        "failures": failures,
+        "unlock": _ms_stats(unlocks),
+        "lock": _ms_stats(locks),
+    }
+
+
+def scenario_automount(config, work_dir):
+    import threading
+    import types
+    from automount import AutoMounter
+    from backend import CryptomatorBackend
+
+    # The Secret Service stand-in: every vault has a saved password, and a
+    # batched lookup costs one round trip like a single one
+    def load_password(vault_path):
+        time.sleep(config["keyring_latency"])
+        return "password"
+    def load_passwords(vault_paths):
+        time.sleep(config["keyring_latency"])
+        return {path: "password" for path in vault_paths}
+    sys.modules["keyring_helper"] = types.SimpleNamespace(load_password=load_password,
+                                                          load_passwords=load_passwords)
+
+    vaults = _make_vaults(work_dir, config["automount_vaults"])
+    states = Counter()
+    done = threading.Event()
+
+    def on_progress(vault, state, mount_path):
+        if state != "unlocking":
+            states[state] += 1
+
+    start = time.perf_counter()
+    AutoMounter(max_workers=config["concurrency"], timeout=30).run(vaults, on_progress, done.set)
+    done.wait()
+    automount_s = time.perf_counter() - start
+    start = time.perf_counter()
+    locked = CryptomatorBackend.lock_many([vault.path for vault in vaults])
+    lock_s = time.perf_counter() - start
+    return {
+        "wall_s": round(automount_s + lock_s, 3),
+        "automount_s": round(automount_s, 3),
+        "lock_many_s": round(lock_s, 3),
+        "vaults": len(vaults),
+        "states": dict(states),
+        "locked": len(locked),
+    }
+
+
+def scenario_restore_states(config, work_dir):
+    import vault as vault_module
+    from mount_monitor import MountMonitor
+    if not hasattr(vault_module, "restore_mount_states"):
+        return {"skipped": "restore_mount_states() not in this tree"}
+
+    count = config["vaults"]
+    mount_root = os.path.join(work_dir, "mnt")
+    lines = [f"{i} 1 0:{i} / /unrelated/{i} rw - ext4 /dev/sda1 rw" for i in range(1, 201)]
+    # Half the vaults remember a mount path, half of those are still mounted
+    lines += [f"{1000 + i} 1 0:{1000 + i} / {mount_root}/vault{i:05d} rw - fuse.cryptomator cryptomator rw"
+              for i in range(0, count, 4)]
+    with open(os.environ["FAKE_MOUNTINFO"], 'w') as f:
+        f.write("\n".join(lines) + "\n")
+
+    timings = []
+    for _ in range(config["repeat"]):
+        vaults = [vault_module.Vault(name=f"vault{i:05d}", path=f"/vaults/vault{i:05d}",
+                                     mount_path=f"{mount_root}/vault{i:05d}" if i % 2 == 0 else None)
+                  for i in range(count)]
+        t0 = time.perf_counter()
+        monitor = MountMonitor(os.environ["FAKE_MOUNTINFO"])
+        monitor.refresh()
+        vault_module.restore_mount_states(vaults, lambda path: monitor.mount_id(path) is not None)
+        timings.append(time.perf_counter() - t0)
+    return {
+        "wall_s": round(sum(timings), 3),
+        "vaults": count,
+        "repeat": config["repeat"],
+        "restore": _ms_stats(timings),
+    }
+
+
+def scenario_store(config, work_dir):
+    import vault_store
+    from vault import Vault
+    count = config["vaults"]
+    path = os.path.join(work_dir, "config", "vaults.json")
+    vaults = [Vault(name=f"vault{i:05d}", path=f"/vaults/vault{i:05d}") for i in range(count)]
+
+    start = time.perf_counter()
+    store = vault_store.VaultStore(path)
+    t0 = time.perf_counter()
+    store.put_all(vaults)
+    store.flush()
+    save_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    store.compact()
+    compact_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    loaded = vault_store.VaultStore(path).load()
+    load_s = time.perf_counter() - t0
+
+    # Renames of 1% of the list, one flush each, as the GUI does
+    store = vault_store.VaultStore(path)
+    store.load()
+    t0 = time.perf_counter()
+    for vault in loaded[::100]:
+        vault.name += " (renamed)"
+        store.put(vault)
+        store.flush()
+    update_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    reloaded = vault_store.VaultStore(path).load()
+    reload_s = time.perf_counter() - t0
+    assert len(reloaded) == count, f"loaded {len(reloaded)} of {count} vaults"
+    return {
+        "wall_s": round(time.perf_counter() - start, 3),
+        "vaults": count,
+        "save_s": round(save_s, 3),
+        "compact_s": round(compact_s, 3),
+        "load_s": round(load_s, 3),
+        "update_s": round(update_s, 3),
+        "reload_s": round(reload_s, 3),
+    }
+
+
+def run_child(name, config, work_dir, result_path):
+    """Entry point of the per-scenario process"""
+    import resource
+    sys.path.insert(0, config["src"])
+    # Trees from before LOCKER_MOUNTINFO existed read the real table otherwise
+    import mount_monitor
+    import backend
+    mount_monitor.MOUNTINFO_PATH = backend.MOUNTINFO_PATH = os.environ["FAKE_MOUNTINFO"]
+    backend.CryptomatorBackend.EXIT_CHECK_INTERVAL = POLL_INTERVAL
+
+    result = globals()[f"scenario_{name}"](config, work_dir)
+
+    try:
+        with open(os.environ["FAKE_SPAWN_LOG"]) as f:
+            spawns = Counter(line.strip() for line in f if line.strip())
+    except FileNotFoundError:
+        spawns = Counter()
+    result["spawns"] = dict(sorted(spawns.items()))
+    result["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_child_rss_kb"] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    with open(result_path, 'w') as f:
+        json.dump(result, f)
+
+
+# Driver
+
+def run_scenario(name, config, verbose=False):
+    with tempfile.TemporaryDirectory(prefix=f"locker-bench-{name}-") as work_dir:
+        env = dict(os.environ)
+        for var in ("HOME", "XDG_CONFIG_HOME", "XDG_CACHE_HOME", "XDG_RUNTIME_DIR"):
+            env[var] = os.path.join(work_dir, var.lower())
+            os.makedirs(env[var], mode=0o700)
+        env.update({
+            "PATH": FAKE_BIN + os.pathsep + os.environ.get("PATH", ""),
+            "LOCKER_HOST_HELPER": "daemon", # Through the fake flatpak-spawn
+            "LOCKER_MOUNTINFO": os.path.join(work_dir, "mountinfo"),
+            "FAKE_MOUNTINFO": os.path.join(work_dir, "mountinfo"),
+            "FAKE_SPAWN_LOG": os.path.join(work_dir, "spawns.log"),
+            "FAKE_CLI_STARTUP": str(config["startup"]),
+            "FAKE_CLI_MOUNT_DELAY": str(config["mount_delay"]),
+            "FAKE_CLI_FAIL_RATE": str(config["fail_rate"]),
+            "FAKE_CLI_FAIL_MODE": config["fail_mode"],
+            "FAKE_CLI_RSS_MB": str(config["cli_rss_mb"]),
+            "FAKE_SPAWN_LATENCY": str(config["spawn_latency"]),
+            "FAKE_SEED": str(config["seed"]),
+        })
+        env.pop("LOCKER_TRACE", None)
+        open(env["FAKE_MOUNTINFO"], 'w').close()
+        result_path = os.path.join(work_dir, "result.json")
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", name, json.dumps(config),
+             work_dir, result_path],
+            env=env, cwd=work_dir,
+            stdout=None if verbose else subprocess.PIPE,
+            stderr=subprocess.STDOUT, text=True
+        )
+        if proc.returncode != 0 or not os.path.exists(result_path):
+            tail = "\n".join((proc.stdout or "").splitlines()[-20:])
+            return {"error": f"exit code {proc.returncode}", "output": tail}
+        with open(result_path) as f:
+            return json.load(f)
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of results against a baseline report, as messages"""
+    regressions = []
+    for name, result in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base or "error" in base or "skipped" in base or "error" in result:
+            continue
+        for key, value in result.items():
+            if key.endswith("_s") and isinstance(base.get(key), (int, float)):
+                # Sub-10 ms differences are noise
+                if value > base[key] * (1 + tolerance) and value - base[key] > 0.01:
+                    regressions.append(f"{name}.{key}: {base[key]}s -> {value}s")
+        for command, count in result.get("spawns", {}).items():
+            if count > base.get("spawns", {}).get(command, 0):
+                regressions.append(f"{name} spawns of {command}: "
+                                   f"{base.get('spawns', {}).get(command, 0)} -> {count}")
+    return regressions
+
+
+def print_report(results):
+    print(f"{'scenario':<16} {'wall':>9} {'peak rss':>10} {'child rss':>10}  spawns")
+    for name, result in results["scenarios"].items():
+        if "error" in result or "skipped" in result:
+            print(f"{name:<16} {result.get('error') or 'skipped: ' + result['skipped']}")
+            if result.get("output"):
+                print(result["output"])
+            continue
+        spawns = ", ".join(f"{command} {count}" for command, count in result["spawns"].items()) or "-"
+        print(f"{name:<16} {result['wall_s']:>8.3f}s {result['peak_rss_kb'] / 1024:>8.1f}MB "
+              f"{result['peak_child_rss_kb'] / 1024:>8.1f}MB  {spawns}")
+        details = {key: value for key, value in result.items()
+                   if key not in ("wall_s", "spawns", "peak_rss_kb", "peak_child_rss_kb")}
+        print(f"{'':<16} {json.dumps(details)}")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "--child":
+        name, config, work_dir, result_path = argv[1:5]
+        run_child(name, json.loads(config), work_dir, result_path)
+        return 0
+
+    parser = argparse.ArgumentParser(description="Benchmark Locker with fake cryptomator-cli and flatpak-spawn")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated subset of {', '.join(SCENARIOS)}")
+    parser.add_argument("--src", default=DEFAULT_SRC, help="Locker src/ directory to benchmark")
+    parser.add_argument("--vaults", type=int, default=10000, help="Vaults for restore_states and store")
+    parser.add_argument("--automount-vaults", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4, help="Auto-mount workers")
+    parser.add_argument("--cycles", type=int, default=20, help="Unlock/lock cycles")
+    parser.add_argument("--repeat", type=int, default=5, help="restore_states repetitions")
+    parser.add_argument("--startup", type=float, default=0.2, help="Fake JVM startup, seconds")
+    parser.add_argument("--mount-delay", type=float, default=0.05, help="Fake unlock and mount time, seconds")
+    parser.add_argument("--spawn-latency", type=float, default=0.02, help="Fake flatpak-spawn latency, seconds")
+    parser.add_argument("--keyring-latency", type=float, default=0.005, help="Fake keyring lookup, seconds")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of vaults whose unlock fails")
+    parser.add_argument("--fail-mode", choices=("password", "hang", "crash"), default="password")
+    parser.add_argument("--cli-rss-mb", type=float, default=0, help="Memory touched by each fake cli")
+    parser.add_argument("--seed", type=int, default=0, help="Selects which vaults fail")
+    parser.add_argument("--json", metavar="FILE", help="Write the report as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="Baseline report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against the baseline")
+    parser.add_argument("--verbose", action="store_true", help="Show the output of the scenarios")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    config = {
+        "src": os.path.abspath(args.src),
+        "vaults": args.vaults,
+        "automount_vaults": args.automount_vaults,
+        "concurrency": args.concurrency,
+        "cycles": args.cycles,
+        "repeat": args.repeat,
+        "startup": args.startup,
+        "mount_delay": args.mount_delay,
+        "spawn_latency": args.spawn_latency,
+        "keyring_latency": args.keyring_latency,
+        "fail_rate": args.fail_rate,
+        "fail_mode": args.fail_mode,
+        "cli_rss_mb": args.cli_rss_mb,
+        "seed": args.seed,
+    }
+    results = {"config": config, "python": sys.version.split()[0], "scenarios": {}}
+    for name in names:
+        print(f"Running {name}...", file=sys.stderr, flush=True)
+        results["scenarios"][name] = run_scenario(name, config, args.verbose)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    failed = any("error" in result for result in results["scenarios"].values())
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION: {message}")
+        if regressions:
+            failed = True
+        else:
+            print(f"No regressions against {args.compare}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the crypto primitives of the vault format.
+
+Measures calls per second, and MB/s for payload-sized primitives, of what
+VaultCreator, VaultReader and vault_pipeline use:
+
+  scrypt          password -> key encryption key, per scrypt cost
+  key_wrap        AES key wrap / unwrap of a 256-bit master key
+  hmac_sha256     masterkey version MAC, vault config JWT
+  siv_seal/open   AES-SIV of file and directory names, with the directory
+                  ID as associated data: miscreant and, if available,
+                  cryptography's AESSIV (OpenSSL)
+  gcm_seal/open   AES-GCM of file headers and 32 KiB content chunks
+
+Both SIV implementations are checked to produce identical ciphertexts
+before they are timed. Each measurement runs batches until --min-time has
+passed and keeps the best of --repeat rounds.
+
+  python3 benchmarks/crypto_bench.py [--json out.json] [--primitives siv_seal,gcm_seal]
+"""
+
+import os
+import sys
+import json
+import time
+import hmac
+import hashlib
+import argparse
+import platform
+
+NAME_SIZES = (16, 64, 255) # Typical and maximum file name lengths
+CONTENT_SIZES = (40, 1024, 32 * 1024, 1024 * 1024) # Header payload, small, chunk, large
+SCRYPT_COSTS = (2 ** 14, 2 ** 15)
+PRIMITIVES = ("scrypt", "key_wrap", "key_unwrap", "hmac_sha256",
+              "siv_seal", "siv_open", "gcm_seal", "gcm_open")
+
+
+def measure(func, min_time, repeat):
+    """Best seconds per call of func() over `repeat` rounds of at least min_time"""
+    func() # Warm up caches and lazy initialization
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10 or calls >= 1 << 24:
+            break
+        calls *= 4
+    # Size the rounds to min_time from the calibration
+    calls = max(1, int(calls * min_time / max(elapsed, 1e-9)))
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best
+
+
+def siv_backends(key):
+    """{name: (seal(plaintext, ad), open(ciphertext, ad))} for every available AES-SIV"""
+    backends = {}
+    try:
+        from miscreant.aes.siv import SIV
+        siv = SIV(key)
+        backends["miscreant"] = (lambda data, ad: siv.seal(data, [ad]),
+                                 lambda data, ad: siv.open(data, [ad]))
+    except ImportError:
+        pass
+    try:
+        from cryptography.hazmat.primitives.ciphers.aead import AESSIV
+        aessiv = AESSIV(key)
+        backends["cryptography"] = (lambda data, ad: aessiv.encrypt(data, [ad]),
+                                    lambda data, ad: aessiv.decrypt(data, [ad]))
+    except ImportError:
+        pass
+    return backends
+
+
+def check_siv_agreement(backends, sizes):
+    """Both implementations must be interchangeable for the vault format"""
+    if len(backends) < 2:
+        return None
+    ad = os.urandom(36)
+    for size in sizes:
+        data = os.urandom(size)
+        sealed = {name: seal(data, ad) for name, (seal, _) in backends.items()}
+        if len(set(sealed.values())) != 1:
+            return False
+        for name, (_, open_) in backends.items():
+            for ciphertext in sealed.values():
+                if open_(ciphertext, ad) != data:
+                    return False
+    return True
+
+
+def run(primitives, min_time, repeat, scrypt_costs, on_result):
+    from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+    from cryptography.hazmat.primitives.keywrap import aes_key_wrap, aes_key_unwrap
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    enc_key, mac_key, kek = os.urandom(32), os.urandom(32), os.urandom(32)
+    dir_id = os.urandom(18).hex().encode() # Same length as a UUID string
+    results = []
+
+    def record(primitive, backend, size, seconds, **extra):
+        entry = {
+            "primitive": primitive,
+            "backend": backend,
+            "size": size,
+            "us_per_op": round(seconds * 1e6, 3),
+            "ops_per_s": round(1 / seconds, 1),
+        }
+        if size:
+            entry["mb_per_s"] = round(size / seconds / 1e6, 2)
+        entry.update(extra)
+        results.append(entry)
+        on_result(entry)
+
+    if "scrypt" in primitives:
+        salt = os.urandom(32)
+        for cost in scrypt_costs:
+            def derive():
+                Scrypt(salt=salt, length=32, n=cost, r=8, p=1).derive(b"correct horse battery staple")
+            # One derivation is already slow; a single round is precise enough
+            record("scrypt", "cryptography", 0, measure(derive, min_time, 1), cost=cost)
+
+    if "key_wrap" in primitives:
+        record("key_wrap", "cryptography", 32,
+               measure(lambda: aes_key_wrap(kek, enc_key), min_time, repeat))
+    if "key_unwrap" in primitives:
+        wrapped = aes_key_wrap(kek, enc_key)
+        record("key_unwrap", "cryptography", 32,
+               measure(lambda: aes_key_unwrap(kek, wrapped), min_time, repeat))
+    if "hmac_sha256" in primitives:
+        record("hmac_sha256", "hashlib", 4,
+               measure(lambda: hmac.new(mac_key, b"\0\0\0\x08", hashlib.sha256).digest(), min_time, repeat))
+
+    siv = siv_backends(mac_key + enc_key)
+    siv_sizes = NAME_SIZES + (1024,)
+    agreement = check_siv_agreement(siv, siv_sizes)
+    for name, (seal, open_) in siv.items():
+        for size in siv_sizes:
+            data = os.urandom(size)
+            if "siv_seal" in primitives:
+                record("siv_seal", name, size, measure(lambda: seal(data, dir_id), min_time, repeat))
+            if "siv_open" in primitives:
+                ciphertext = seal(data, dir_id)
+                record("siv_open", name, size, measure(lambda: open_(ciphertext, dir_id), min_time, repeat))
+
+    gcm = AESGCM(enc_key)
+    nonce = os.urandom(12)
+    header = os.urandom(24) # Chunk AAD: chunk number + header nonce
+    for size in CONTENT_SIZES:
+        data = os.urandom(size)
+        if "gcm_seal" in primitives:
+            record("gcm_seal", "cryptography", size,
+                   measure(lambda: gcm.encrypt(nonce, data, header), min_time, repeat))
+        if "gcm_open" in primitives:
+            ciphertext = gcm.encrypt(nonce, data, header)
+            record("gcm_open", "cryptography", size,
+                   measure(lambda: gcm.decrypt(nonce, ciphertext, header), min_time, repeat))
+
+    return results, sorted(siv), agreement
+
+
+def siv_speedups(results):
+    """{operation: {size: cryptography ops/s over miscreant ops/s}}"""
+    by_key = {(r["primitive"], r["backend"], r["size"]): r["ops_per_s"] for r in results}
+    speedups = {}
+    for (primitive, backend, size), ops in by_key.items():
+        if backend != "cryptography" or not primitive.startswith("siv_"):
+            continue
+        baseline = by_key.get((primitive, "miscreant", size))
+        if baseline:
+            speedups.setdefault(primitive, {})[str(size)] = round(ops / baseline, 2)
+    return speedups
+
+
+def environment():
+    import cryptography
+    from cryptography.hazmat.backends.openssl.backend import backend as openssl
+    try:
+        from importlib.metadata import version
+        miscreant_version = version("miscreant")
+    except Exception:
+        miscreant_version = None
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    return {
+        "cpu": cpu,
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "cryptography": cryptography.__version__,
+        "openssl": openssl.openssl_version_text(),
+        "miscreant": miscreant_version,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the vault format's crypto primitives")
+    parser.add_argument("--primitives", default=",".join(PRIMITIVES),
+                        help=f"Comma-separated subset of {', '.join(PRIMITIVES)}")
+    parser.add_argument("--scrypt-cost", type=int, action="append",
+                        help=f"scrypt N to measure (repeatable, default {', '.join(map(str, SCRYPT_COSTS))})")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per measurement round")
+    parser.add_argument("--repeat", type=int, default=3, help="Rounds per measurement, best is kept")
+    parser.add_argument("--json", metavar="FILE", help="Write the results as JSON ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    primitives = {p.strip() for p in args.primitives.split(",") if p.strip()}
+    unknown = primitives - set(PRIMITIVES)
+    if unknown:
+        parser.error(f"unknown primitive(s): {', '.join(sorted(unknown))}")
+
+    quiet = args.json == "-"
+    def on_result(entry):
+        if quiet:
+            return
+        rate = f"{entry['mb_per_s']:>10.2f} MB/s" if "mb_per_s" in entry else " " * 15
+        detail = f"N={entry['cost']}" if "cost" in entry else f"{entry['size']} B"
+        print(f"{entry['primitive']:<12} {entry['backend']:<13} {detail:>10} "
+              f"{entry['ops_per_s']:>14,.1f} ops/s {rate}", flush=True)
+
+    results, siv, agreement = run(primitives, args.min_time, args.repeat,
+                                  args.scrypt_cost or SCRYPT_COSTS, on_result)
+    report = {
+        "environment": environment(),
+        "settings": {"min_time": args.min_time, "repeat": args.repeat},
+        "results": results,
+        "siv": {"backends": siv, "identical_output": agreement, "speedup": siv_speedups(results)},
+    }
+    if not quiet:
+        for primitive, sizes in report["siv"]["speedup"].items():
+            print(f"{primitive}: cryptography vs miscreant "
+                  + ", ".join(f"{size} B x{factor}" for size, factor in sizes.items()))
+        if agreement is False:
+            print("WARNING: miscreant and cryptography AES-SIV outputs differ", file=sys.stderr)
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 1 if agreement is False else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Stand-in mount table shared by the fake executables in fake-bin/.
+
+The table is a file in /proc/self/mountinfo format (FAKE_MOUNTINFO, which
+the harness also passes to Locker as LOCKER_MOUNTINFO). Fakes rewrite it in
+place under an exclusive flock; Locker reads it without the lock and may see
+a half-written table, which only delays noticing a change by one poll.
+Every fake appends one line per process start to FAKE_SPAWN_LOG so the
+harness can count spawns.
+"""
+
+import os
+import re
+import fcntl
+import contextlib
+
+
+def _escape(path):
+    # mountinfo escapes whitespace and backslashes as octal
+    return re.sub(r'[ \t\n\\]', lambda m: f"\\{ord(m.group()):03o}", path)
+
+
+@contextlib.contextmanager
+def _locked_table():
+    path = os.environ["FAKE_MOUNTINFO"]
+    with open(path + ".lock", 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            with open(path, 'r') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            lines = []
+        result = []
+        yield lines, result
+        if result:
+            # Rewritten in place: readers keep the file open like /proc/self/mountinfo
+            with open(path, 'w') as f:
+                f.write("".join(line + "\n" for line in result[0]))
+
+
+def mount(mount_point, source="cryptomator"):
+    """Add a mount; returns its mount ID"""
+    mount_id = str(os.getpid())
+    with _locked_table() as (lines, result):
+        line = f"{mount_id} 1 0:{len(lines) + 100} / {_escape(mount_point)} rw,nosuid,nodev - fuse.{source} {source} rw"
+        result.append(lines + [line])
+    return mount_id
+
+
+def unmount(mount_point):
+    """Remove the topmost mount at mount_point; returns False if none"""
+    escaped = _escape(mount_point)
+    with _locked_table() as (lines, result):
+        for index in range(len(lines) - 1, -1, -1):
+            fields = lines[index].split(' ', 5)
+            if len(fields) >= 5 and fields[4] == escaped:
+                result.append(lines[:index] + lines[index + 1:])
+                return True
+    return False
+
+
+def is_mounted(mount_id):
+    with _locked_table() as (lines, result):
+        return any(line.split(' ', 1)[0] == mount_id for line in lines)
+
+
+def log_spawn(name):
+    log = os.environ.get("FAKE_SPAWN_LOG")
+    if log:
+        fd = os.open(log, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, f"{name}\n".encode())
+        finally:
+            os.close(fd)
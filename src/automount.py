@@ -0,0 +1,123 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+from vault import VaultStatus
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 30 # Seconds allowed per vault before its unlock is abandoned
+
+class AutoMounter:
+    """Unlocks saved vaults concurrently on a bounded worker pool.
+
+    Progress is reported per vault as (vault, state, mount_path) where state is
+    one of "unlocking", "unlocked", "failed" or "skipped" (no saved password).
+    `dispatch` is used to hand each report to the caller's thread, e.g.
+    GLib.idle_add for the GTK main loop; by default callbacks run on the worker.
+    """
+
+    def __init__(self, max_workers=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT, dispatch=None):
+        self.max_workers = max(1, int(max_workers))
+        self.timeout = timeout
+        self.dispatch = dispatch or (lambda func, *args: func(*args))
+
+    def run(self, vaults, on_progress, on_finished=None):
+        """Start unlocking all locked vaults without blocking the caller"""
+        pending = [v for v in vaults if v.status == VaultStatus.LOCKED]
+        if not pending:
+            if on_finished:
+                self.dispatch(on_finished)
+            return
+
+        # Mount points of unlocked vaults are taken; pending ones must not share them
+        taken = {v.mount_path for v in vaults if v.status == VaultStatus.UNLOCKED and v.mount_path}
+        # Mount point setup and cleanup each cost one host spawn for the whole batch
+        threading.Thread(target=self._run, args=(pending, taken, on_progress, on_finished),
+                         daemon=True).start()
+
+    def _run(self, pending, taken, on_progress, on_finished):
+        from backend import CryptomatorBackend
+
+        # Concurrent unlocks at one mount point would each see the other's
+        # mount appear, so vaults with the same name get distinct ones
+        mount_points = {}
+        for vault in pending:
+            mount_point = CryptomatorBackend.unique_mount_point(vault.name, vault.path, taken)
+            taken.add(mount_point)
+            mount_points[id(vault)] = mount_point
+        with tracing.span("automount.prepare", count=len(pending)):
+            failed = set(CryptomatorBackend.prepare_mount_points(list(mount_points.values())))
+        unused = list(failed)
+        passwords = self._load_passwords(pending)
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending)),
+                                      thread_name_prefix="automount")
+        remaining = [len(pending)]
+        lock = threading.Lock()
+
+        def task_done(future):
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                executor.shutdown(wait=False)
+                CryptomatorBackend.cleanup_mount_points(unused)
+                if on_finished:
+                    self.dispatch(on_finished)
+
+        def mount_one(vault, mount_point):
+            if mount_point in failed:
+                self.dispatch(on_progress, vault, "failed", None)
+            elif not self._mount_one(vault, mount_point, on_progress, passwords):
+                with lock:
+                    unused.append(mount_point)
+
+        for vault in pending:
+            future = executor.submit(mount_one, vault, mount_points[id(vault)])
+            future.add_done_callback(task_done)
+
+    def _load_passwords(self, pending):
+        """Fetch every pending vault's password in one keyring session, or None
+        if the batched lookup failed and each vault should look up its own"""
+        try:
+            import keyring_helper
+            with tracing.span("automount.keyring", count=len(pending)):
+                return keyring_helper.load_passwords(v.path for v in pending)
+        except Exception as e:
+            print(f"DEBUG: Batched keyring lookup failed: {e}", flush=True)
+            return None
+
+    def _mount_one(self, vault, mount_point, on_progress, passwords=None):
+        from backend import CryptomatorBackend
+
+        if passwords is not None:
+            pwd = passwords.get(vault.path)
+        else:
+            try:
+                import keyring_helper
+                with tracing.span("automount.keyring", vault=vault.name):
+                    pwd = keyring_helper.load_password(vault.path)
+            except Exception as e:
+                print(f"DEBUG: Keyring lookup failed for {vault.name}: {e}", flush=True)
+                pwd = None
+        if not pwd:
+            self.dispatch(on_progress, vault, "skipped", None)
+            return False
+
+        print(f"Auto-mounting {vault.name}...", flush=True)
+        self.dispatch(on_progress, vault, "unlocking", None)
+        try:
+            success, actual_mount = CryptomatorBackend.unlock(vault.path, pwd, mount_point,
+                                                              timeout=self.timeout, prepare=False,
+                                                              mounter=vault.mounter)
+        except Exception as e:
+            print(f"DEBUG: Auto-mount of {vault.name} raised: {e}", flush=True)
+            success, actual_mount = False, None
+
+        if success:
+            print(f"Auto-mounted {vault.name} at {actual_mount}", flush=True)
+            self.dispatch(on_progress, vault, "unlocked", actual_mount)
+        else:
+            print(f"Auto-mount of {vault.name} failed", flush=True)
+            self.dispatch(on_progress, vault, "failed", None)
+        return success
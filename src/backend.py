@@ -1,177 +1,536 @@
 import subprocess
 import os
+import sys
+import select
 import time
+import threading
+
+import host
+import tracing
+from mount_monitor import MOUNTINFO_PATH, MountMonitor, parse_mountinfo, read_mountinfo
+from supervisor import Supervisor, Backoff
 
 class CryptomatorBackend:
-    _instances = {} # Map vault_path -> (Popen process, mount_path)
+    _instances = {} # Map vault_path -> (supervisor.Child, mount_path)
+    _restarts = {} # Map vault_path -> restart state, for vaults that may be restarted
+    _lock = threading.RLock()
+    # daemon.DaemonClient when a Locker daemon owns the mounts; unlock/lock are
+    # then forwarded to it
+    remote = None
+    # Called as callback(vault_path) from a worker thread when a mount process
+    # dies and is not restarted
+    exit_listeners = []
+
+    UNLOCK_TIMEOUT = 30 # Max seconds to wait for the FUSE mount to show up
+    EXIT_CHECK_INTERVAL = 0.1 # Seconds between child exit checks while waiting
+    HOSTED_MOUNT_TIMEOUT = 5 # Max seconds for a mount reported by the mount host to show up
+
+    @staticmethod
+    def default_mount_point(vault_name):
+        # Use ~/mnt/cryptomator/ directory
+        home_dir = os.path.expanduser('~')
+        return os.path.join(home_dir, "mnt", "cryptomator", vault_name)
+
+    @classmethod
+    def unique_mount_point(cls, vault_name, vault_path, taken):
+        """default_mount_point, with a suffix derived from the vault path if
+        that is already in `taken` (vaults sharing a display name)"""
+        mount_point = cls.default_mount_point(vault_name)
+        if mount_point in taken:
+            import hashlib
+            suffix = hashlib.sha1(vault_path.encode('utf-8')).hexdigest()[:8]
+            mount_point = cls.default_mount_point(f"{vault_name}-{suffix}")
+        return mount_point
+
+    @classmethod
+    def prepare_mount_points(cls, mount_points):
+        """Create mount point directories ON THE HOST (not in sandbox) in one spawn.
+        
+        Returns the mount points that could not be created.
+        """
+        failed = []
+        for mount_point in host.prepare_dirs(mount_points):
+            print(f"DEBUG: Failed to create mount point on host: {mount_point}", flush=True)
+            # Try to create in sandbox as fallback
+            try:
+                os.makedirs(mount_point, exist_ok=True)
+            except Exception as e:
+                print(f"ERROR: Cannot create mount point: {e}", flush=True)
+                failed.append(mount_point)
+        return failed
+
+    @classmethod
+    def unlock(cls, vault_path, password, mount_point=None, timeout=None, prepare=True, mounter="cli"):
+        """Unlock a vault. Pass prepare=False if the mount point was already
+        created through prepare_mount_points().
+        
+        mounter selects cryptomator-cli ("cli") or the in-process Python FUSE
+        frontend ("native", see fuse_mount.py).
+        """
+        with tracing.span("unlock", vault=os.path.basename(vault_path), mounter=mounter) as span:
+            result = cls._unlock(vault_path, password, mount_point, timeout, prepare, mounter)
+            span.set(ok=bool(result[0]))
+            return result
 
     @classmethod
-    def unlock(cls, vault_path, password, mount_point=None):
+    def _unlock(cls, vault_path, password, mount_point, timeout, prepare, mounter):
+        if cls.remote is not None:
+            result = cls._forward("unlock", vault_path, password, mount_point, timeout, prepare, mounter)
+            if result is not None:
+                return result
+
         if vault_path in cls._instances:
               # Already unlocked?
               return True, cls._instances[vault_path][1]
 
-        # Ensure mount point exists ON THE HOST (not in sandbox)
         if not mount_point:
-            # Use ~/mnt/cryptomator/ directory
-            home_dir = os.path.expanduser('~')
-            mount_base = os.path.join(home_dir, "mnt", "cryptomator")
-            vault_name = os.path.basename(vault_path)
-            mount_point = os.path.join(mount_base, vault_name)
+            mount_point = cls.default_mount_point(os.path.basename(vault_path))
         
-        # Create mount point directory on the host using flatpak-spawn
-        try:
-            subprocess.run(['flatpak-spawn', '--host', 'mkdir', '-p', mount_point], check=True)
-            print(f"DEBUG: Created mount point on host: {mount_point}", flush=True)
-        except Exception as e:
-            print(f"DEBUG: Failed to create mount point on host: {e}", flush=True)
-            # Try to create in sandbox as fallback
-            try:
-                os.makedirs(mount_point, exist_ok=True)
-            except Exception as e2:
-                print(f"ERROR: Cannot create mount point: {e2}", flush=True)
+        if prepare:
+            with tracing.span("unlock.prepare"):
+                failed = cls.prepare_mount_points([mount_point])
+            if failed:
                 return False, None
 
-        # Use FUSE mounter with flatpak-spawn to run fusermount on host
-        cmd = [
-            'cryptomator-cli',
-            'unlock',
-            '--password:stdin',
-            '--mounter=org.cryptomator.frontend.fuse.mount.LinuxFuseMountProvider',
-            f'--mountPoint={mount_point}',
-            vault_path
-        ]
+        child = cls._launch(vault_path, password, mount_point, timeout, mounter)
+        if child is None:
+            return False, None
+        
+        restart = None
+        import config
+        if config.load_settings().get("restart_crashed_mounts", False):
+            # Restarting needs the password again; kept only while mounted
+            restart = {"password": password, "mounter": mounter, "backoff": Backoff(),
+                       "cancel": threading.Event(), "pending": False}
+        with cls._lock:
+            cls._instances[vault_path] = (child, mount_point)
+            if restart is not None:
+                cls._restarts[vault_path] = restart
+            child.on_exit = lambda child: cls._on_child_exit(vault_path, child)
+        # In case it died between mounting and the handler being set
+        Supervisor.get().report_exit(child)
+        return True, mount_point
+
+    @classmethod
+    def _launch(cls, vault_path, password, mount_point, timeout=None, mounter="cli"):
+        """Start a mount process and wait for its mount; returns the
+        supervised child, or None if it failed"""
+        if mounter == "cli" and cls._use_mount_host():
+            # One JVM for every vault instead of a cli process each
+            import mount_host
+            handle = mount_host.MountHost.get().mount(vault_path, password, mount_point, timeout)
+            if handle is None:
+                return None
+            # The host answers "ok" for a vault it believes mounted; trust the mount table
+            with tracing.span("unlock.wait_mount", hosted=True) as span:
+                mounted = cls._wait_for_mount(handle, mount_point, cls.HOSTED_MOUNT_TIMEOUT)
+                span.set(mounted=mounted)
+            if not mounted:
+                print(f"DEBUG: Mount host reported {vault_path} mounted, but {mount_point} is not", flush=True)
+                handle.kill()
+                return None
+            return handle
+        
+        secret = password
+        if mounter == "native":
+            # Unwrap the keys here: this process outlives the mount, so crash
+            # restarts and retries find them in the cache until the vault is locked
+            keys = cls._native_keys(vault_path, password)
+            if keys is None:
+                return None
+            secret = f"{keys[0].hex()} {keys[1].hex()}"
+            cmd = [
+                sys.executable,
+                os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fuse_mount.py'),
+                '--keys-stdin',
+                vault_path,
+                mount_point
+            ]
+        else:
+            # Use FUSE mounter with flatpak-spawn to run fusermount on host
+            cmd = [
+                'cryptomator-cli',
+                'unlock',
+                '--password:stdin',
+                '--mounter=org.cryptomator.frontend.fuse.mount.LinuxFuseMountProvider',
+                f'--mountPoint={mount_point}',
+                vault_path
+            ]
         
         try:
             # Start process
             print(f"DEBUG: Running command: {' '.join(cmd)}", flush=True)
             print(f"DEBUG: Mount point: {mount_point}", flush=True)
             
-            proc = subprocess.Popen(
-                cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
+            # Remember what (if anything) is mounted there already, so a stale
+            # mount is not mistaken for ours
+            previous_mount_id = read_mountinfo().get(mount_point)
+            
+            with tracing.span("unlock.spawn"):
+                proc = subprocess.Popen(
+                    cmd,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True
+                )
+                # Output is drained from here on, so a chatty process never blocks
+                proc = Supervisor.get().watch(proc, os.path.basename(vault_path))
             
             # Send password
             print(f"DEBUG: Unlocking {vault_path} with password len={len(password)}", flush=True)
+            proc.stdin.write(secret + "\n")
+            proc.stdin.flush()
             
-            # Use communicate() which is safer than manual stdin/stdout handling
-            try:
-                stdout, stderr = proc.communicate(input=password + "\n", timeout=5)
-                # Process exited within timeout
-                print(f"DEBUG: Process exited with code {proc.returncode}", flush=True)
-                print(f"DEBUG: STDOUT: {stdout}", flush=True)
-                print(f"DEBUG: STDERR: {stderr}", flush=True)
-                if proc.returncode != 0:
-                    print(f"Unlock failed with exit code {proc.returncode}", flush=True)
-                    return False, None
-                else:
-                    print(f"DEBUG: Process exited successfully but quickly - might have daemonized", flush=True)
-                    return False, None
-            except subprocess.TimeoutExpired:
-                # Process is still running after timeout -> Success (FUSE mount is active)
-                print(f"DEBUG: Process still running after timeout - mount successful!", flush=True)
+            # Return as soon as the kernel reports the mount instead of
+            # sleeping through a fixed timeout
+            if timeout is None:
+                timeout = cls.UNLOCK_TIMEOUT
+            # Covers JVM start, key derivation and the FUSE mount; the first
+            # output line roughly marks the end of JVM start
+            with tracing.span("unlock.wait_mount") as span:
+                mounted = cls._wait_for_mount(proc, mount_point, timeout, previous_mount_id)
+                span.set(mounted=mounted, first_output_ms=proc.first_output_ms())
+            if mounted:
                 print(f"DEBUG: Vault mounted at: {mount_point}", flush=True)
-                
-                cls._instances[vault_path] = (proc, mount_point)
-                return True, mount_point
+                proc.stdin.close()
+                return proc
+            
+            if proc.poll() is None:
+                print(f"DEBUG: Mount did not appear within {timeout}s, giving up", flush=True)
+                proc.terminate()
+                try:
+                    proc.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+            
+            proc.wait_output(timeout=5)
+            print(f"DEBUG: Process exited with code {proc.returncode}", flush=True)
+            print(f"DEBUG: Output:\n{proc.tail()}", flush=True)
+            print(f"Unlock failed with exit code {proc.returncode}", flush=True)
+            return None
                 
         except Exception as e:
             print(f"Error unlocking: {e}", flush=True)
             import traceback
             traceback.print_exc()
-            return False, None
-            
-        return False, None
+            return None
 
-    @classmethod
-    def is_mounted(cls, vault_path, mount_point):
-        """Check if a vault is currently mounted at the given mount point"""
-        if not mount_point or not os.path.exists(mount_point):
+    @staticmethod
+    def _use_mount_host():
+        import config
+        if not config.load_settings().get("shared_mount_host", False):
+            return False
+        import mount_host
+        if not mount_host.available():
+            print("DEBUG: Shared mount host not installed, using one cli per vault", flush=True)
             return False
+        return True
+
+    @classmethod
+    def start_standby(cls):
+        """Start the shared mount host ahead of the first unlock if the warm
+        standby setting is on; it then stays up without mounts"""
+        import config
+        if not config.load_settings().get("jvm_standby", False) or not cls._use_mount_host():
+            return
+        import mount_host
+        def run():
+            try:
+                mount_host.MountHost.get().ensure_running(idle_exit=0)
+            except mount_host.MountHostError as e:
+                print(f"DEBUG: Warm standby not started: {e}", flush=True)
+        threading.Thread(target=run, name="standby", daemon=True).start()
+
+    @staticmethod
+    def stop_standby():
+        """Let a standby host exit when idle, right away if it serves no vaults"""
+        import mount_host
+        host = mount_host.MountHost.get()
+        try:
+            host.request("idle", str(mount_host.IDLE_EXIT), timeout=2)
+            if not host.mounted():
+                host.shutdown()
+        except mount_host.MountHostError:
+            pass # Not running
+
+    @classmethod
+    def _on_child_exit(cls, vault_path, child):
+        """A mount process exited without lock(): restart it or give up"""
+        with cls._lock:
+            instance = cls._instances.get(vault_path)
+            if child.stopping or instance is None or instance[0] is not child:
+                return
+            mount_point = instance[1]
+            restart = cls._restarts.get(vault_path)
+            if restart is not None:
+                restart["pending"] = True
         
-        # Check if the mount point is a FUSE mount using /proc/mounts
+        print(f"DEBUG: Mount process for {vault_path} exited with code {child.returncode}", flush=True)
+        print(f"DEBUG: Last output:\n{child.tail(20)}", flush=True)
+        # A dead FUSE server leaves a mount that only returns ENOTCONN
+        if mount_point in read_mountinfo():
+            host.get_host().unmount(mount_point, lazy=True)
+        
+        uptime = child.uptime()
+        while restart is not None:
+            delay = restart["backoff"].next_delay(uptime)
+            if delay is None:
+                break
+            print(f"DEBUG: Restarting {vault_path} in {delay}s", flush=True)
+            if restart["cancel"].wait(delay):
+                return # Locked meanwhile
+            new_child = cls._launch(vault_path, restart["password"], mount_point,
+                                    mounter=restart["mounter"])
+            if new_child is None:
+                uptime = 0
+                continue
+            with cls._lock:
+                restart["pending"] = False
+                cancelled = restart["cancel"].is_set()
+                if not cancelled:
+                    cls._instances[vault_path] = (new_child, mount_point)
+                    new_child.on_exit = lambda child: cls._on_child_exit(vault_path, child)
+            if cancelled:
+                new_child.terminate()
+            else:
+                print(f"DEBUG: Restarted {vault_path}", flush=True)
+                Supervisor.get().report_exit(new_child)
+            return
+        
+        print(f"DEBUG: Giving up on {vault_path}", flush=True)
+        with cls._lock:
+            if cls._instances.get(vault_path) is not instance:
+                return # Locked meanwhile
+            cls._instances.pop(vault_path)
+            cls._restarts.pop(vault_path, None)
+        cls._forget_keys(vault_path)
+        for listener in list(cls.exit_listeners):
+            listener(vault_path)
+
+    @classmethod
+    def _cancel_restart(cls, vault_path):
+        with cls._lock:
+            restart = cls._restarts.pop(vault_path, None)
+            if restart is not None:
+                restart["cancel"].set()
+
+    @classmethod
+    def is_restarting(cls, vault_path):
+        """Whether a crashed mount of this vault is waiting to be restarted"""
+        with cls._lock:
+            restart = cls._restarts.get(vault_path)
+            return restart is not None and restart["pending"]
+
+    @classmethod
+    def _wait_for_mount(cls, proc, mount_point, timeout, previous_mount_id=None):
+        """Wait until a new mount at mount_point appears in the mount table.
+        
+        Returns False if the process exits first or the timeout expires.
+        """
+        deadline = time.monotonic() + timeout
+        poller = select.poll()
+        mountinfo = None
         try:
-            with open('/proc/mounts', 'r') as f:
-                for line in f:
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        mounted_path = parts[1]
-                        if mounted_path == mount_point:
-                            return True
-        except Exception as e:
-            print(f"DEBUG: Error checking if mounted: {e}", flush=True)
+            mountinfo = open(MOUNTINFO_PATH, 'r')
+            # The kernel flags POLLPRI on mountinfo whenever the mount table changes
+            poller.register(mountinfo.fileno(), select.POLLPRI | select.POLLERR)
+        except OSError as e:
+            print(f"DEBUG: Cannot watch mount table: {e}", flush=True)
         
-        return False
+        try:
+            while True:
+                if mountinfo is not None:
+                    mountinfo.seek(0)
+                    mount_id = parse_mountinfo(mountinfo.read()).get(mount_point)
+                    if mount_id is not None and mount_id != previous_mount_id:
+                        return True
+                if proc.poll() is not None:
+                    return False
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                # Wake up on mount table changes, but keep checking for the child exiting
+                poller.poll(min(remaining, cls.EXIT_CHECK_INTERVAL) * 1000)
+        finally:
+            if mountinfo is not None:
+                mountinfo.close()
+
+    @classmethod
+    def is_mounted(cls, vault_path, mount_point):
+        """Check if a vault is currently mounted at the given mount point"""
+        if not mount_point:
+            return False
+        return MountMonitor.get().is_mounted(mount_point)
+    
+    @classmethod
+    def forget(cls, vault_path):
+        """Drop a vault whose mount disappeared without going through lock()"""
+        if cls.remote is not None and cls._forward("forget", vault_path) is not None:
+            return
+        if cls.is_restarting(vault_path):
+            return # The mount went away because we are restarting it
+        cls._forget_keys(vault_path)
+        cls._cancel_restart(vault_path)
+        with cls._lock:
+            instance = cls._instances.pop(vault_path, None)
+        if instance is not None:
+            instance[0].terminate()
     
     @classmethod
     def lock(cls, vault_path, mount_point=None):
+        with tracing.span("lock", vault=os.path.basename(vault_path)) as span:
+            result = cls._lock_vault(vault_path, mount_point)
+            span.set(ok=bool(result))
+            return result
+
+    @classmethod
+    def _lock_vault(cls, vault_path, mount_point):
+        # Locking ends the session for this vault's keys too
+        cls._forget_keys(vault_path)
+        if cls.remote is not None:
+            result = cls._forward("lock", vault_path, mount_point)
+            if result is not None:
+                return result
+        cls._cancel_restart(vault_path)
         if vault_path in cls._instances:
-            proc, mount_path = cls._instances[vault_path]
-            # Terminate process to unmount
-            proc.terminate()
-            try:
-                proc.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                proc.kill()
-            
-            del cls._instances[vault_path]
+            mount_path = cls._stop_instance(vault_path)
             
             # Clean up mount point directory
-            cls._cleanup_mount(mount_path)
+            cls.cleanup_mount_points([mount_path])
             return True
             
         elif mount_point:
+            # Mounted by a shared mount host that outlived an earlier session?
+            import mount_host
+            host_instance = mount_host.MountHost.get()
+            try:
+                with tracing.span("lock.host_unmount"):
+                    hosted = host_instance.is_running() and vault_path in host_instance.mounted()
+                    if hosted:
+                        host_instance.unmount(vault_path)
+                if hosted:
+                    cls.cleanup_mount_points([mount_point])
+                    return True
+            except mount_host.MountHostError as e:
+                print(f"DEBUG: Mount host could not lock {vault_path}: {e}", flush=True)
+            
             # Not in instances, but we have a mount point. Try to unmount using fusermount.
             print(f"DEBUG: Attempting to unmount orphaned vault at {mount_point}", flush=True)
-            try:
-                subprocess.run(['flatpak-spawn', '--host', 'fusermount3', '-u', mount_point], check=True)
+            helper = host.get_host()
+            with tracing.span("lock.unmount") as span:
+                unmounted = helper.unmount(mount_point)
+                span.set(ok=unmounted)
+            if unmounted:
                 # Cleanup
-                cls._cleanup_mount(mount_point)
+                cls.cleanup_mount_points([mount_point])
                 return True
-            except Exception as e:
-                print(f"DEBUG: Failed to standard unmount {mount_point}: {e}", flush=True)
-                # Try lazy unmount
-                try:
-                     print(f"DEBUG: Retrying with lazy unmount for {mount_point}", flush=True)
-                     subprocess.run(['flatpak-spawn', '--host', 'fusermount3', '-u', '-z', mount_point], check=True)
-                     cls._cleanup_mount(mount_point)
-                     return True
-                except Exception as e2:
-                    print(f"DEBUG: Failed to lazy unmount {mount_point}: {e2}", flush=True)
-                    return False
+            print(f"DEBUG: Failed to standard unmount {mount_point}", flush=True)
+            
+            # Try lazy unmount
+            print(f"DEBUG: Retrying with lazy unmount for {mount_point}", flush=True)
+            with tracing.span("lock.unmount", lazy=True) as span:
+                unmounted = helper.unmount(mount_point, lazy=True)
+                span.set(ok=unmounted)
+            if unmounted:
+                cls.cleanup_mount_points([mount_point])
+                return True
+            print(f"DEBUG: Failed to lazy unmount {mount_point}", flush=True)
+            return False
                 
         return False
 
+    @classmethod
+    def lock_many(cls, vault_paths):
+        """Lock several vaults, cleaning up all their mount points in one spawn.
+        
+        Returns the vault paths that were locked.
+        """
+        with tracing.span("lock_many", count=len(vault_paths)) as span:
+            locked = cls._lock_vaults(vault_paths)
+            span.set(locked=len(locked))
+            return locked
+
+    @classmethod
+    def _lock_vaults(cls, vault_paths):
+        for vault_path in vault_paths:
+            cls._forget_keys(vault_path)
+        if cls.remote is not None:
+            result = cls._forward("lock_many", vault_paths)
+            if result is not None:
+                return result
+        for vault_path in vault_paths:
+            cls._cancel_restart(vault_path)
+        locked = [p for p in vault_paths if p in cls._instances]
+        for vault_path in locked:
+            cls._instances[vault_path][0].terminate()
+        mount_paths = [cls._stop_instance(vault_path) for vault_path in locked]
+        cls.cleanup_mount_points(mount_paths)
+        return locked
+
     @staticmethod
-    def _cleanup_mount(mount_path):
-        if not mount_path: return
+    def _native_keys(vault_path, password):
+        """(enc_key, mac_key) for a native mount, or None if the password is wrong"""
+        from vault_cache import MasterKeyCache
+        from vault_reader import VaultReader, VaultError
+        with tracing.span("unlock.derive_keys") as span:
+            cached = vault_path in MasterKeyCache.get()
+            try:
+                keys = VaultReader.derive_keys(vault_path, password, MasterKeyCache.get())
+            except VaultError as e:
+                print(f"DEBUG: Cannot unlock {vault_path}: {e}", flush=True)
+                keys = None
+            span.set(cached=cached, ok=keys is not None)
+        return keys
+
+    @staticmethod
+    def _forget_keys(vault_path):
+        # Only native unlocks fill the key cache, and those import vault_cache
+        vault_cache = sys.modules.get('vault_cache')
+        if vault_cache is not None:
+            vault_cache.MasterKeyCache.get().forget(vault_path)
+
+    @classmethod
+    def _forward(cls, method, *args):
+        """Run a call on the daemon; returns None (and goes local) if it is gone"""
+        from daemon import DaemonError
+        try:
+            result = getattr(cls.remote, method)(*args)
+        except DaemonError as e:
+            print(f"DEBUG: Daemon unavailable, handling {method} locally: {e}", flush=True)
+            cls.remote = None
+            return None
+        # forget() has no result
+        return True if result is None else result
+
+    @classmethod
+    def _stop_instance(cls, vault_path):
+        with cls._lock:
+            proc, mount_path = cls._instances.pop(vault_path)
+        with tracing.span("lock.stop", vault=os.path.basename(vault_path)) as span:
+            # Terminate process to unmount
+            proc.terminate()
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                span.set(killed=True)
+        return mount_path
+
+    @staticmethod
+    def cleanup_mount_points(mount_paths):
+        """Remove mount point directories and their parents once empty"""
+        mount_paths = [p for p in mount_paths if p]
+        if not mount_paths: return
         
         try:
             home_dir = os.path.expanduser('~')
             cryptomator_base = os.path.join(home_dir, "mnt", "cryptomator")
             mnt_base = os.path.join(home_dir, "mnt")
             
-            # Remove the vault-specific directory
-            subprocess.run(['flatpak-spawn', '--host', 'rmdir', mount_path], check=False)
-            
-            # Check if cryptomator directory is empty and remove it
-            try:
-                result = subprocess.run(['flatpak-spawn', '--host', 'ls', '-A', cryptomator_base], 
-                                      capture_output=True, text=True)
-                if not result.stdout.strip():
-                    subprocess.run(['flatpak-spawn', '--host', 'rmdir', cryptomator_base], check=False)
-                    
-                    # Check if mnt directory is empty and remove it
-                    result = subprocess.run(['flatpak-spawn', '--host', 'ls', '-A', mnt_base], 
-                                          capture_output=True, text=True)
-                    if not result.stdout.strip():
-                        subprocess.run(['flatpak-spawn', '--host', 'rmdir', mnt_base], check=False)
-            except Exception:
-                pass
+            # rmdir refuses non-empty directories, so no need to list them first
+            with tracing.span("cleanup_mount_points", count=len(mount_paths)):
+                host.cleanup_dirs(mount_paths, prune=[cryptomator_base, mnt_base])
         except Exception as e:
             print(f"DEBUG: Failed to clean up mount point: {e}", flush=True)
     
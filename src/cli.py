@@ -0,0 +1,185 @@
+"""
+Headless Locker commands. Never imports GTK, so they work without a display.
+
+    locker status [--json]
+    locker unlock VAULT [--password-stdin] [--mount-point PATH]
+    locker lock VAULT | --all
+    locker automount
+    locker daemon [--automount]
+
+VAULT is a vault name or path from vaults.json. Unlocks are handed to the
+daemon (started on demand), which keeps the mounts alive after the command
+exits. Passwords come from the keyring unless --password-stdin is given.
+"""
+
+import sys
+import json
+import argparse
+
+import config
+
+
+def _password_from_keyring(vault_path):
+    try:
+        import keyring_helper
+        return keyring_helper.load_password(vault_path)
+    except Exception as e:
+        print(f"DEBUG: Keyring lookup failed: {e}", flush=True)
+        return None
+
+
+def _find_vault(vaults, name_or_path):
+    vault = config.find_vault(vaults, name_or_path)
+    if vault is None:
+        print(f"Unknown vault: {name_or_path}", file=sys.stderr, flush=True)
+    return vault
+
+
+def cmd_status(args):
+    from daemon import DaemonClient, vault_status
+
+    client = DaemonClient.connect()
+    vaults = client.status() if client is not None else vault_status()
+
+    if args.json:
+        print(json.dumps({"daemon": client is not None, "vaults": vaults}, indent=2))
+        return 0
+    print(f"Daemon: {'running' if client is not None else 'not running'}")
+    for entry in vaults:
+        state = f"unlocked at {entry['mount_path']}" if entry["mounted"] else "locked"
+        print(f"{entry['name']:<24} {state}")
+    return 0
+
+
+def cmd_unlock(args):
+    from daemon import DaemonClient
+    from vault_store import VaultStore
+
+    store = VaultStore()
+    vaults = store.load()
+    vault = _find_vault(vaults, args.vault)
+    if vault is None:
+        return 1
+
+    if args.password_stdin:
+        password = sys.stdin.readline().rstrip("\n")
+    else:
+        password = _password_from_keyring(vault.path)
+        if not password and sys.stdin.isatty():
+            import getpass
+            password = getpass.getpass(f"Password for {vault.name}: ")
+    if not password:
+        print(f"No password for {vault.name}", file=sys.stderr, flush=True)
+        return 1
+
+    client = DaemonClient.connect(spawn=True)
+    if client is None:
+        print("Could not start the Locker daemon", file=sys.stderr, flush=True)
+        return 1
+
+    from backend import CryptomatorBackend
+    mount_point = args.mount_point or CryptomatorBackend.default_mount_point(vault.name)
+    success, mount_path = client.unlock(vault.path, password, mount_point, mounter=vault.mounter)
+    if not success:
+        print(f"Failed to unlock {vault.name}", file=sys.stderr, flush=True)
+        return 1
+
+    vault.mount_path = mount_path
+    store.put(vault)
+    store.flush()
+    print(f"Unlocked {vault.name} at {mount_path}", flush=True)
+    return 0
+
+
+def cmd_lock(args):
+    from backend import CryptomatorBackend
+    from daemon import DaemonClient
+    from vault_store import VaultStore
+
+    store = VaultStore()
+    vaults = store.load()
+    if args.all:
+        targets = [v for v in vaults if v.mount_path]
+    else:
+        vault = _find_vault(vaults, args.vault)
+        if vault is None:
+            return 1
+        targets = [vault]
+
+    # The daemon owns the mount processes; without one, unmount directly
+    CryptomatorBackend.remote = DaemonClient.connect()
+    failed = 0
+    for vault in targets:
+        if CryptomatorBackend.lock(vault.path, vault.mount_path):
+            print(f"Locked {vault.name}", flush=True)
+            vault.mount_path = None
+            store.put(vault)
+        else:
+            print(f"Failed to lock {vault.name}", file=sys.stderr, flush=True)
+            failed += 1
+    store.flush()
+    return 1 if failed else 0
+
+
+def cmd_automount(args):
+    from daemon import DaemonClient
+
+    client = DaemonClient.connect(spawn=True)
+    if client is None:
+        print("Could not start the Locker daemon", file=sys.stderr, flush=True)
+        return 1
+    states = client.automount(args.concurrency, args.timeout)
+    names = {v.path: v.name for v in config.load_vaults()}
+    for vault_path, state in states.items():
+        print(f"{names.get(vault_path, vault_path):<24} {state}")
+    return 1 if "failed" in states.values() else 0
+
+
+def cmd_daemon(args):
+    from daemon import LockerDaemon, DaemonError
+
+    automount = args.automount and config.load_settings().get("automount", False)
+    try:
+        return LockerDaemon().serve(automount=automount)
+    except DaemonError as e:
+        print(e, file=sys.stderr, flush=True)
+        return 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="locker", description="Manage Cryptomator vaults without the GUI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    status_parser = commands.add_parser("status", help="Show saved vaults and their state")
+    status_parser.add_argument("--json", action="store_true")
+    status_parser.set_defaults(func=cmd_status)
+
+    unlock_parser = commands.add_parser("unlock", help="Unlock and mount a vault")
+    unlock_parser.add_argument("vault", help="Vault name or path")
+    unlock_parser.add_argument("--password-stdin", action="store_true",
+                               help="Read the password from stdin instead of the keyring")
+    unlock_parser.add_argument("--mount-point")
+    unlock_parser.set_defaults(func=cmd_unlock)
+
+    lock_parser = commands.add_parser("lock", help="Lock a vault")
+    target = lock_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("vault", nargs="?", help="Vault name or path")
+    target.add_argument("--all", action="store_true", help="Lock every unlocked vault")
+    lock_parser.set_defaults(func=cmd_lock)
+
+    automount_parser = commands.add_parser("automount", help="Unlock all vaults with saved passwords")
+    automount_parser.add_argument("--concurrency", type=int)
+    automount_parser.add_argument("--timeout", type=int)
+    automount_parser.set_defaults(func=cmd_automount)
+
+    daemon_parser = commands.add_parser("daemon", help="Run the background service")
+    daemon_parser.add_argument("--automount", action="store_true",
+                               help="Auto-mount on start if enabled in the settings")
+    daemon_parser.set_defaults(func=cmd_daemon)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Locations and loaders for Locker's configuration files, usable without GTK.
+
+Follows GLib.get_user_config_dir(): $XDG_CONFIG_HOME (set per app inside
+Flatpak), falling back to ~/.config.
+"""
+
+import os
+import json
+
+
+def config_dir():
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, "locker")
+
+def vaults_file():
+    return os.path.join(config_dir(), "vaults.json")
+
+def settings_file():
+    return os.path.join(config_dir(), "settings.json")
+
+def load_vaults():
+    """Return the saved vaults, or an empty list if there are none"""
+    from vault_store import VaultStore
+    return VaultStore().load()
+
+def load_settings():
+    try:
+        with open(settings_file(), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def find_vault(vaults, name_or_path):
+    """Look a vault up by name or path"""
+    path = os.path.abspath(os.path.expanduser(name_or_path))
+    for vault in vaults:
+        if vault.name == name_or_path or vault.path == path:
+            return vault
+    return None
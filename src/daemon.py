@@ -0,0 +1,310 @@
+"""
+Headless Locker daemon and its client.
+
+The daemon owns the cryptomator-cli (or fuse_mount.py) processes of unlocked
+vaults, so mounts outlive the command or window that requested them. It
+serves a Unix socket private to the user. Every request and reply is one
+line of JSON:
+
+    {"op": "unlock", "args": {"vault_path": "...", "password": "..."}}
+    {"ok": true, "result": [true, "/home/user/mnt/cryptomator/Vault"]}
+
+GTK is never imported here.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import struct
+import threading
+import subprocess
+import socketserver
+
+CONNECT_TIMEOUT = 5 # Seconds to wait for a freshly spawned daemon
+REQUEST_TIMEOUT = 120 # Unlocks can take a while (JVM start, scrypt)
+
+
+class DaemonError(Exception):
+    pass
+
+
+def socket_path():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or f"/run/user/{os.getuid()}"
+    if os.environ.get("FLATPAK_ID"):
+        # Only this directory is shared between instances of the same app
+        return os.path.join(runtime_dir, "app", os.environ["FLATPAK_ID"], "daemon.sock")
+    return os.path.join(runtime_dir, "locker", "daemon.sock")
+
+
+def vault_status(owned=()):
+    """Saved vaults as dicts, with whether they are mounted and owned by us"""
+    import config
+    from mount_monitor import read_mountinfo
+
+    mounts = read_mountinfo()
+    result = []
+    for vault in config.load_vaults():
+        entry = vault.to_dict()
+        entry["mounted"] = bool(vault.mount_path) and vault.mount_path in mounts
+        entry["owned"] = vault.path in owned
+        result.append(entry)
+    return result
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        # Only serve our own user, even if the socket permissions were widened
+        creds = self.request.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+        _, uid, _ = struct.unpack('3i', creds)
+        if uid != os.getuid():
+            return
+
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                result = self.server.locker.dispatch(request.get("op"), request.get("args") or {})
+                reply = {"ok": True, "result": result}
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+            self.wfile.write((json.dumps(reply) + "\n").encode('utf-8'))
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class LockerDaemon:
+    """Serves CryptomatorBackend and the saved vaults over a Unix socket"""
+
+    def __init__(self, path=None):
+        self.path = path or socket_path()
+        self._server = None
+        self._config_lock = threading.Lock()
+
+    def dispatch(self, op, args):
+        from backend import CryptomatorBackend
+
+        if op == "ping":
+            return {"pid": os.getpid()}
+        if op == "status":
+            return self.status()
+        if op == "unlock":
+            return list(CryptomatorBackend.unlock(
+                args["vault_path"], args["password"], args.get("mount_point"),
+                timeout=args.get("timeout"), prepare=args.get("prepare", True),
+                mounter=args.get("mounter", "cli")))
+        if op == "lock":
+            return CryptomatorBackend.lock(args["vault_path"], args.get("mount_point"))
+        if op == "lock_many":
+            return CryptomatorBackend.lock_many(args["vault_paths"])
+        if op == "forget":
+            CryptomatorBackend.forget(args["vault_path"])
+            return None
+        if op == "automount":
+            return self.automount(args.get("max_workers"), args.get("timeout"))
+        if op == "shutdown":
+            self.shutdown()
+            return None
+        raise DaemonError(f"Unknown operation: {op}")
+
+    def status(self):
+        from backend import CryptomatorBackend
+        return vault_status(CryptomatorBackend._instances)
+
+    def automount(self, max_workers=None, timeout=None):
+        """Unlock every saved vault that has a password in the keyring; blocks
+        until done and returns {vault_path: state}"""
+        import config
+        from automount import AutoMounter, DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT
+        from mount_monitor import read_mountinfo
+        from vault import VaultStatus, restore_mount_states
+
+        settings = config.load_settings()
+        with self._config_lock:
+            vaults = config.load_vaults()
+        restore_mount_states(vaults, read_mountinfo().__contains__)
+
+        states = {}
+        done = threading.Event()
+
+        def on_progress(vault, state, mount_path):
+            states[vault.path] = state
+            if state == "unlocked":
+                vault.status = VaultStatus.UNLOCKED
+                vault.mount_path = mount_path
+
+        mounter = AutoMounter(
+            max_workers=max_workers or settings.get("automount_concurrency", DEFAULT_CONCURRENCY),
+            timeout=timeout or settings.get("automount_timeout", DEFAULT_TIMEOUT)
+        )
+        import tracing
+        from collections import Counter
+        with tracing.span("automount", vaults=len(vaults)) as span:
+            mounter.run(vaults, on_progress, done.set)
+            done.wait()
+            span.set(**Counter(states.values()))
+
+        self.update_mount_paths({v.path: v.mount_path for v in vaults if v.path in states})
+        return states
+
+    def update_mount_paths(self, mount_paths):
+        """Record new mount paths in vaults.json so the GUI finds the mounts"""
+        from vault_store import VaultStore
+
+        with self._config_lock:
+            store = VaultStore()
+            for vault in store.iter_load():
+                if vault.path in mount_paths:
+                    vault.mount_path = mount_paths[vault.path]
+                    store.put(vault)
+            store.flush()
+
+    def serve(self, automount=False):
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        if os.path.exists(self.path):
+            if DaemonClient.connect(self.path) is not None:
+                raise DaemonError(f"A daemon is already listening on {self.path}")
+            # Stale socket from a daemon that died
+            os.unlink(self.path)
+
+        old_umask = os.umask(0o077)
+        try:
+            self._server = _Server(self.path, _RequestHandler)
+        finally:
+            os.umask(old_umask)
+        self._server.locker = self
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda signum, frame: self.shutdown())
+        print(f"Locker daemon listening on {self.path}", flush=True)
+
+        from backend import CryptomatorBackend
+        CryptomatorBackend.start_standby()
+        if automount:
+            threading.Thread(target=self.automount, daemon=True).start()
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._lock_all()
+            self._server.server_close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        return 0
+
+    def shutdown(self):
+        if self._server is not None:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    @staticmethod
+    def _lock_all():
+        # The mount processes are our children and would lose their pipes
+        from backend import CryptomatorBackend
+        locked = CryptomatorBackend.lock_many(list(CryptomatorBackend._instances))
+        if locked:
+            print(f"Locked {len(locked)} vault(s) on shutdown", flush=True)
+
+
+class DaemonClient:
+    """Connection to a running LockerDaemon with the CryptomatorBackend API"""
+
+    def __init__(self, path=None):
+        self.path = path or socket_path()
+        self._sock = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def connect(cls, path=None, spawn=False):
+        """Return a client for the running daemon, or None if there is none.
+        With spawn=True a daemon is started first if needed."""
+        client = cls(path)
+        try:
+            client.ping()
+            return client
+        except DaemonError:
+            if not spawn:
+                return None
+
+        cli_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cli.py')
+        subprocess.Popen([sys.executable, cli_path, 'daemon'],
+                         stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL, start_new_session=True)
+        deadline = time.monotonic() + CONNECT_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            try:
+                client.ping()
+                return client
+            except DaemonError:
+                continue
+        return None
+
+    def request(self, op, **args):
+        line = (json.dumps({"op": op, "args": args}) + "\n").encode('utf-8')
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                    self._sock.settimeout(REQUEST_TIMEOUT)
+                    self._sock.connect(self.path)
+                    self._file = self._sock.makefile('rb')
+                self._sock.sendall(line)
+                reply = self._file.readline()
+            except OSError as e:
+                self._close()
+                raise DaemonError(f"Daemon not reachable: {e}")
+            if not reply:
+                self._close()
+                raise DaemonError("Daemon closed the connection")
+
+        reply = json.loads(reply)
+        if not reply.get("ok"):
+            raise DaemonError(reply.get("error", "Request failed"))
+        return reply.get("result")
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def ping(self):
+        return self.request("ping")
+
+    def status(self):
+        return self.request("status")
+
+    def unlock(self, vault_path, password, mount_point=None, timeout=None, prepare=True, mounter="cli"):
+        success, mount_path = self.request("unlock", vault_path=vault_path, password=password,
+                                           mount_point=mount_point, timeout=timeout,
+                                           prepare=prepare, mounter=mounter)
+        return success, mount_path
+
+    def lock(self, vault_path, mount_point=None):
+        return self.request("lock", vault_path=vault_path, mount_point=mount_point)
+
+    def lock_many(self, vault_paths):
+        return self.request("lock_many", vault_paths=list(vault_paths))
+
+    def forget(self, vault_path):
+        self.request("forget", vault_path=vault_path)
+
+    def automount(self, max_workers=None, timeout=None):
+        return self.request("automount", max_workers=max_workers, timeout=timeout)
+
+    def shutdown(self):
+        self.request("shutdown")
@@ -0,0 +1,294 @@
+"""
+Read-only FUSE mounter for Cryptomator vaults, built on vault_reader and pyfuse3.
+
+Runs as its own process, started by CryptomatorBackend in place of
+cryptomator-cli: the password is read from stdin, the process stays in the
+foreground while mounted and unmounts on SIGTERM.
+
+    python3 fuse_mount.py [--threads N] [--memory-limit MiB] VAULT MOUNTPOINT
+"""
+
+import os
+import sys
+import stat
+import errno
+import signal
+import argparse
+import threading
+
+import pyfuse3
+import trio
+
+from vault_cache import ChunkCache, DirectoryCache
+from vault_reader import VaultReader, VaultError, DecryptingReader
+
+DEFAULT_THREADS = 4
+DEFAULT_MEMORY_LIMIT = 16 * 1024 * 1024 # Bytes of read buffers in flight per mount
+MAX_READ = 128 * 1024 # Largest read request we ask the kernel to send
+ATTR_TIMEOUT = 5 # Seconds the kernel may cache attributes and entries
+
+
+class VaultOperations(pyfuse3.Operations):
+    """Serves a VaultReader through FUSE.
+
+    Crypto and file I/O run on worker threads (the cryptography library
+    releases the GIL), bounded by `threads`. Concurrent reads are additionally
+    limited so that their buffers stay below `memory_limit` bytes.
+    """
+
+    def __init__(self, reader: VaultReader, threads=DEFAULT_THREADS, memory_limit=DEFAULT_MEMORY_LIMIT):
+        super().__init__()
+        self.reader = reader
+        root = reader.resolve("/")
+        self._nodes = {pyfuse3.ROOT_INODE: root}
+        self._inodes = {str(root.path): pyfuse3.ROOT_INODE}
+        self._lookup_counts = {}
+        self._next_inode = pyfuse3.ROOT_INODE + 1
+        self._handles = {}
+        self._next_handle = 1
+        self._lock = threading.Lock()
+        self._workers = trio.CapacityLimiter(max(1, threads))
+        # Each token covers one in-flight read of at most MAX_READ bytes plus the
+        # chunks decrypted around it
+        read_cost = MAX_READ + 2 * reader.CIPHERTEXT_CHUNK_SIZE
+        self._read_budget = trio.CapacityLimiter(max(1, memory_limit // read_cost))
+
+    async def _run(self, func, *args):
+        return await trio.to_thread.run_sync(func, *args, limiter=self._workers)
+
+    def _node(self, inode):
+        node = self._nodes.get(inode)
+        if node is None:
+            raise pyfuse3.FUSEError(errno.ENOENT)
+        return node
+
+    def _inode_for(self, node):
+        key = str(node.path)
+        with self._lock:
+            inode = self._inodes.get(key)
+            if inode is None:
+                inode = self._next_inode
+                self._next_inode += 1
+                self._inodes[key] = inode
+            self._nodes[inode] = node
+            return inode
+
+    def _remember(self, inode):
+        self._lookup_counts[inode] = self._lookup_counts.get(inode, 0) + 1
+
+    def _attributes(self, inode, node):
+        st = os.lstat(node.path)
+        entry = pyfuse3.EntryAttributes()
+        entry.st_ino = inode
+        entry.generation = 0
+        entry.entry_timeout = ATTR_TIMEOUT
+        entry.attr_timeout = ATTR_TIMEOUT
+        if node.kind == "dir":
+            entry.st_mode = stat.S_IFDIR | 0o755
+            entry.st_nlink = 2
+            entry.st_size = 0
+        else:
+            size = self.reader.cleartext_size(st.st_size)
+            entry.st_mode = (stat.S_IFLNK | 0o777) if node.kind == "symlink" else (stat.S_IFREG | 0o644)
+            entry.st_nlink = 1
+            entry.st_size = size
+        entry.st_uid = os.getuid()
+        entry.st_gid = os.getgid()
+        entry.st_blksize = self.reader.CLEARTEXT_CHUNK_SIZE
+        entry.st_blocks = (entry.st_size + 511) // 512
+        entry.st_atime_ns = st.st_atime_ns
+        entry.st_mtime_ns = st.st_mtime_ns
+        entry.st_ctime_ns = st.st_ctime_ns
+        return entry
+
+    async def getattr(self, inode, ctx=None):
+        node = self._node(inode)
+        try:
+            return await self._run(self._attributes, inode, node)
+        except OSError as e:
+            raise pyfuse3.FUSEError(e.errno or errno.EIO)
+
+    async def lookup(self, parent_inode, name, ctx=None):
+        parent = self._node(parent_inode)
+        name = os.fsdecode(name)
+        if name == ".":
+            inode = parent_inode
+        elif name == "..":
+            # Parent pointers are not tracked; the kernel resolves ".." itself
+            raise pyfuse3.FUSEError(errno.ENOENT)
+        else:
+            try:
+                node = await self._run(self.reader.lookup, parent.dir_id, name)
+            except (FileNotFoundError, VaultError):
+                raise pyfuse3.FUSEError(errno.ENOENT)
+            inode = self._inode_for(node)
+        attr = await self.getattr(inode)
+        self._remember(inode)
+        return attr
+
+    async def forget(self, inode_list):
+        for inode, count in inode_list:
+            remaining = self._lookup_counts.get(inode, 0) - count
+            if remaining > 0 or inode == pyfuse3.ROOT_INODE:
+                self._lookup_counts[inode] = remaining
+                continue
+            self._lookup_counts.pop(inode, None)
+            with self._lock:
+                node = self._nodes.pop(inode, None)
+                if node is not None:
+                    self._inodes.pop(str(node.path), None)
+
+    async def opendir(self, inode, ctx):
+        if self._node(inode).kind != "dir":
+            raise pyfuse3.FUSEError(errno.ENOTDIR)
+        return inode
+
+    async def readdir(self, fh, start_id, token):
+        node = self._node(fh)
+        try:
+            children = await self._run(self.reader.list_dir, node.dir_id)
+        except VaultError:
+            raise pyfuse3.FUSEError(errno.EIO)
+        # Offsets must stay stable between calls
+        children.sort(key=lambda child: child.name)
+        for index in range(start_id, len(children)):
+            child = children[index]
+            inode = self._inode_for(child)
+            try:
+                attr = await self.getattr(inode)
+            except pyfuse3.FUSEError:
+                continue
+            if not pyfuse3.readdir_reply(token, os.fsencode(child.name), attr, index + 1):
+                break
+            self._remember(inode)
+
+    async def releasedir(self, fh):
+        pass
+
+    async def open(self, inode, flags, ctx):
+        node = self._node(inode)
+        if flags & os.O_ACCMODE != os.O_RDONLY:
+            raise pyfuse3.FUSEError(errno.EROFS)
+        if node.kind != "file":
+            raise pyfuse3.FUSEError(errno.EISDIR if node.kind == "dir" else errno.EINVAL)
+        try:
+            handle = await self._run(DecryptingReader, self.reader, node.path)
+        except (OSError, VaultError):
+            raise pyfuse3.FUSEError(errno.EIO)
+        with self._lock:
+            fh = self._next_handle
+            self._next_handle += 1
+            self._handles[fh] = handle
+        # Sync clients may replace the ciphertext while mounted, so drop the
+        # kernel page cache on open; the chunk cache is keyed per file version
+        return pyfuse3.FileInfo(fh=fh, keep_cache=False)
+
+    async def read(self, fh, off, size):
+        handle = self._handles.get(fh)
+        if handle is None:
+            raise pyfuse3.FUSEError(errno.EBADF)
+        async with self._read_budget:
+            try:
+                # read_at only decrypts the 32 KiB chunks overlapping the range
+                return await self._run(handle.read_at, off, size)
+            except VaultError:
+                raise pyfuse3.FUSEError(errno.EIO)
+
+    async def release(self, fh):
+        handle = self._handles.pop(fh, None)
+        if handle is not None:
+            handle.close()
+
+    async def readlink(self, inode, ctx):
+        node = self._node(inode)
+        if node.kind != "symlink":
+            raise pyfuse3.FUSEError(errno.EINVAL)
+        try:
+            return os.fsencode(await self._run(self.reader.read_symlink, node))
+        except (OSError, VaultError):
+            raise pyfuse3.FUSEError(errno.EIO)
+
+    async def statfs(self, ctx):
+        st = os.statvfs(self.reader.vault_path)
+        data = pyfuse3.StatvfsData()
+        data.f_bsize = st.f_bsize
+        data.f_frsize = st.f_frsize
+        data.f_blocks = st.f_blocks
+        data.f_bfree = st.f_bfree
+        data.f_bavail = st.f_bavail
+        data.f_files = st.f_files
+        data.f_ffree = st.f_ffree
+        data.f_favail = st.f_favail
+        data.f_namemax = 255
+        return data
+
+
+async def serve(threads):
+    async with trio.open_nursery() as nursery:
+        async def run_fuse():
+            # Concurrent FUSE request handlers; blocking work goes to worker threads
+            await pyfuse3.main(1, max(2, threads * 2))
+            # Returns on an external unmount too: stop waiting for signals and exit
+            nursery.cancel_scope.cancel()
+
+        nursery.start_soon(run_fuse)
+        with trio.open_signal_receiver(signal.SIGTERM, signal.SIGINT) as signals:
+            async for _ in signals:
+                pyfuse3.terminate()
+                break
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mount a Cryptomator vault read-only")
+    parser.add_argument("vault_path")
+    parser.add_argument("mount_point")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS)
+    parser.add_argument("--cache-dirs", type=int, default=1024,
+                        help="Decrypted directories kept in memory")
+    parser.add_argument("--chunk-cache", type=int, default=8,
+                        help="MiB of decrypted file chunks kept in memory")
+    parser.add_argument("--memory-limit", type=int, default=DEFAULT_MEMORY_LIMIT // (1024 * 1024),
+                        help="MiB of read buffers allowed in flight")
+    parser.add_argument("--keys-stdin", action="store_true",
+                        help="Read the hex encryption and MAC keys from stdin instead of the password")
+    args = parser.parse_args(argv)
+
+    secret = sys.stdin.readline().rstrip("\n")
+    try:
+        if args.keys_stdin:
+            # Already unwrapped by the caller, which keeps them for restarts
+            enc_hex, mac_hex = secret.split()
+            credentials = {"keys": (bytes.fromhex(enc_hex), bytes.fromhex(mac_hex))}
+        else:
+            credentials = {"password": secret}
+        reader = VaultReader.unlock(args.vault_path, **credentials,
+                                    cache=DirectoryCache(args.cache_dirs),
+                                    chunk_cache=ChunkCache(args.chunk_cache * 1024 * 1024,
+                                                           prefetch_workers=args.threads))
+    except (VaultError, ValueError) as e:
+        print(f"Unlock failed: {e}", file=sys.stderr, flush=True)
+        return 1
+    del secret, credentials
+    # Pick up changes to the ciphertext made by sync clients or other apps
+    reader.cache.watch()
+
+    ops = VaultOperations(reader, args.threads, args.memory_limit * 1024 * 1024)
+    options = set(pyfuse3.default_options)
+    options.add("fsname=locker")
+    options.add("subtype=cryptomator")
+    options.add("ro")
+    options.add(f"max_read={MAX_READ}")
+    pyfuse3.init(ops, args.mount_point, options)
+    print(f"Unlocked and mounted {args.vault_path} at {args.mount_point}", flush=True)
+
+    try:
+        trio.run(serve, args.threads)
+    finally:
+        pyfuse3.close(unmount=True)
+        reader.cache.close()
+        reader.chunk_cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""
+Helpers for running commands on the host from inside the Flatpak sandbox.
+
+Every flatpak-spawn is a D-Bus round trip through the portal, so a single
+long-lived shell is started on the host once per session and fed requests
+over a pipe. Outside Flatpak the same operations run in-process.
+
+Protocol: one request per line, fields separated by tabs (operation first).
+Each request is answered by one line, "ok" or "err", optionally followed by
+tab-separated result fields. Paths therefore must not contain tabs or newlines.
+"""
+
+import atexit
+import os
+import time
+import select
+import subprocess
+import threading
+
+REQUEST_TIMEOUT = 30 # Seconds before a request (e.g. a hung fusermount3) is given up
+
+HELPER_SCRIPT = r'''
+set -f
+TAB=$(printf '\t')
+while IFS= read -r line; do
+    op=${line%%"$TAB"*}
+    if [ "$op" = "$line" ]; then rest=; else rest=${line#*"$TAB"}; fi
+    IFS=$TAB
+    set -- $rest
+    IFS=' '
+    case "$op" in
+    ping)
+        echo ok ;;
+    mkdir)
+        # Create every path, report the ones that failed
+        printf 'ok'
+        for p in "$@"; do
+            mkdir -p -- "$p" 2>/dev/null || printf '\t%s' "$p"
+        done
+        printf '\n' ;;
+    rmdir)
+        # Remove empty directories; paths after --prune are parents removed
+        # in order while empty
+        prune=0
+        for p in "$@"; do
+            if [ "$p" = "--prune" ]; then
+                prune=1
+            elif [ $prune = 1 ]; then
+                rmdir -- "$p" 2>/dev/null || break
+            else
+                rmdir -- "$p" 2>/dev/null
+            fi
+        done
+        echo ok ;;
+    listdir)
+        if [ -d "$1" ]; then
+            printf 'ok'
+            set +f
+            for e in "$1"/* "$1"/.[!.]* "$1"/..?*; do
+                if [ -e "$e" ] || [ -L "$e" ]; then printf '\t%s' "${e##*/}"; fi
+            done
+            set -f
+            printf '\n'
+        else
+            echo err
+        fi ;;
+    stat)
+        if [ -d "$1" ]; then echo "ok${TAB}dir"
+        elif [ -e "$1" ]; then echo "ok${TAB}file"
+        else echo "ok${TAB}missing"
+        fi ;;
+    unmount)
+        if [ "$2" = "lazy" ]; then
+            fusermount3 -u -z "$1" >/dev/null 2>&1 && echo ok || echo err
+        else
+            fusermount3 -u "$1" >/dev/null 2>&1 && echo ok || echo err
+        fi ;;
+    *)
+        echo err ;;
+    esac
+done
+'''
+
+class HostError(Exception):
+    pass
+
+
+class HostHelper:
+    """Long-lived shell on the host, started on first use"""
+
+    def __init__(self, command=None):
+        # The helper can be pointed at a local sh to exercise the protocol
+        # outside Flatpak
+        self.command = command or ['flatpak-spawn', '--host', 'sh', '-c', HELPER_SCRIPT]
+        self._proc = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._proc is None or self._proc.poll() is not None:
+            try:
+                self._proc = subprocess.Popen(
+                    self.command,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    bufsize=1
+                )
+            except OSError as e:
+                self._proc = None
+                raise HostError(f"Cannot start host helper: {e}")
+
+    def _read_reply(self, deadline):
+        """Read one reply line, or None if the deadline passes first"""
+        # Read the pipe directly: a buffered readline() could not be interrupted
+        fd = self._proc.stdout.fileno()
+        data = b''
+        while not data.endswith(b'\n'):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                return None
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                return '' # Helper exited
+            data += chunk
+        return data.decode('utf-8', 'replace')
+
+    def _stop(self):
+        self._proc.kill()
+        self._proc.wait()
+        self._proc = None
+
+    def request(self, op, *args, timeout=REQUEST_TIMEOUT):
+        """Send one request and return the result fields; raises HostError"""
+        for arg in args:
+            if '\t' in arg or '\n' in arg:
+                raise HostError(f"Unsupported character in argument: {arg!r}")
+        line = '\t'.join((op,) + tuple(args)) + '\n'
+
+        with self._lock:
+            # Restart once if the helper died since the last request
+            for attempt in range(2):
+                self._ensure_started()
+                try:
+                    self._proc.stdin.write(line)
+                    self._proc.stdin.flush()
+                    reply = self._read_reply(time.monotonic() + timeout)
+                except (BrokenPipeError, OSError):
+                    reply = ''
+                if reply is None:
+                    # Stuck on the host; a fresh helper serves the next request
+                    self._stop()
+                    raise HostError(f"{op} timed out after {timeout}s")
+                if reply:
+                    break
+                self._stop()
+            else:
+                raise HostError("Host helper is not responding")
+
+        fields = reply.rstrip('\n').split('\t')
+        if fields[0] != 'ok':
+            raise HostError(f"{op} failed: {' '.join(args)}")
+        return fields[1:]
+
+    def close(self):
+        with self._lock:
+            if self._proc is not None:
+                self._proc.stdin.close()
+                try:
+                    self._proc.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    self._proc.kill()
+                self._proc = None
+
+    def mkdir(self, paths):
+        return self.request('mkdir', *paths)
+
+    def rmdir(self, paths, prune=()):
+        args = list(paths)
+        if prune:
+            args += ['--prune'] + list(prune)
+        self.request('rmdir', *args)
+
+    def listdir(self, path):
+        return self.request('listdir', path)
+
+    def stat(self, path):
+        kind = self.request('stat', path)[0]
+        return None if kind == 'missing' else kind
+
+    def unmount(self, mount_point, lazy=False):
+        try:
+            self.request('unmount', mount_point, *(['lazy'] if lazy else []))
+            return True
+        except HostError:
+            return False
+
+
+class LocalHost:
+    """In-process stand-in for HostHelper when not running inside Flatpak"""
+
+    def mkdir(self, paths):
+        failed = []
+        for path in paths:
+            try:
+                os.makedirs(path, exist_ok=True)
+            except OSError:
+                failed.append(path)
+        return failed
+
+    def rmdir(self, paths, prune=()):
+        for path in paths:
+            try:
+                os.rmdir(path)
+            except OSError:
+                pass
+        for path in prune:
+            try:
+                os.rmdir(path)
+            except OSError:
+                break
+
+    def listdir(self, path):
+        try:
+            return os.listdir(path)
+        except OSError as e:
+            raise HostError(f"listdir failed: {path}: {e}")
+
+    def stat(self, path):
+        if os.path.isdir(path):
+            return 'dir'
+        return 'file' if os.path.lexists(path) else None
+
+    def unmount(self, mount_point, lazy=False):
+        cmd = ['fusermount3', '-u'] + (['-z'] if lazy else []) + [mount_point]
+        try:
+            return subprocess.run(cmd, capture_output=True, timeout=REQUEST_TIMEOUT).returncode == 0
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+
+    def close(self):
+        pass
+
+
+_host = None
+_host_lock = threading.Lock()
+
+def get_host():
+    """Return the session-wide host: the helper inside Flatpak, LocalHost outside.
+
+    LOCKER_HOST_HELPER=daemon|local overrides the detection.
+    """
+    global _host
+    with _host_lock:
+        if _host is None:
+            mode = os.environ.get('LOCKER_HOST_HELPER')
+            if mode is None:
+                mode = 'daemon' if os.path.exists('/.flatpak-info') else 'local'
+            _host = HostHelper() if mode == 'daemon' else LocalHost()
+            atexit.register(_host.close)
+        return _host
+
+def prepare_dirs(paths):
+    """Create directories on the host. Returns the paths that could not be created."""
+    if not paths:
+        return []
+    try:
+        return get_host().mkdir(paths)
+    except HostError:
+        return list(paths)
+
+def cleanup_dirs(paths, prune=()):
+    """Remove empty directories on the host, then prune empty parents in order"""
+    if not paths and not prune:
+        return
+    get_host().rmdir(paths, prune)
@@ -1,3 +1,5 @@
+from concurrent.futures import Future
+
 import gi
 gi.require_version('Secret', '1')
 from gi.repository import Secret
@@ -11,14 +13,192 @@ SCHEMA = Secret.Schema.new("io.github.ljam96.locker",
     }
 )
 
+# Unlock the collection (at most one prompt) and fetch secrets with the search
+SEARCH_FLAGS = Secret.SearchFlags.ALL | Secret.SearchFlags.UNLOCK | Secret.SearchFlags.LOAD_SECRETS
+SERVICE_FLAGS = Secret.ServiceFlags.OPEN_SESSION | Secret.ServiceFlags.LOAD_COLLECTIONS
+
+
+class KeyringError(Exception):
+    """Raised by the futures of batched writes; errors maps each vault path
+    that failed to its GLib error"""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(f"{path}: {error}" for path, error in errors.items()))
+        self.errors = errors
+
+def _label(vault_path):
+    return f"Locker Vault: {vault_path}"
+
 def save_password(vault_path, password):
+    """Store a password, blocking until it is written; raises on failure"""
     attributes = {"vault_path": vault_path}
-    Secret.password_store(SCHEMA, attributes, Secret.COLLECTION_DEFAULT, f"Locker Vault: {vault_path}", password, None, None)
+    return Secret.password_store_sync(SCHEMA, attributes, Secret.COLLECTION_DEFAULT, _label(vault_path), password, None)
 
 def load_password(vault_path):
+    """Look up a saved password, blocking; None if there is none"""
     attributes = {"vault_path": vault_path}
-    return Secret.password_lookup(SCHEMA, attributes, None)
+    return Secret.password_lookup_sync(SCHEMA, attributes, None)
 
 def delete_password(vault_path):
+    """Remove a saved password, blocking; returns whether one was removed"""
     attributes = {"vault_path": vault_path}
-    Secret.password_clear(SCHEMA, attributes, None, None)
+    return Secret.password_clear_sync(SCHEMA, attributes, None)
+
+def _passwords_from_items(items, vault_paths):
+    wanted = set(vault_paths)
+    passwords = {}
+    for item in items:
+        path = item.get_attributes().get("vault_path")
+        if path not in wanted or path in passwords:
+            continue
+        secret = item.get_secret()
+        if secret is not None:
+            passwords[path] = secret.get_text()
+    return passwords
+
+def load_passwords(vault_paths):
+    """Look up the passwords of several vaults in one Secret Service session.
+
+    Returns {vault_path: password} for the vaults that have one saved.
+    """
+    vault_paths = list(vault_paths)
+    if not vault_paths:
+        return {}
+    service = Secret.Service.get_sync(SERVICE_FLAGS, None)
+    items = service.search_sync(SCHEMA, {}, SEARCH_FLAGS, None)
+    return _passwords_from_items(items, vault_paths)
+
+def load_password_async(vault_path, callback):
+    """Look up one password without blocking; calls callback(password, error)
+    from the main loop. password is None if nothing is saved."""
+    def on_lookup(source, result, *args):
+        try:
+            password = Secret.password_lookup_finish(result)
+        except Exception as e:
+            callback(None, e)
+            return
+        callback(password, None)
+
+    Secret.password_lookup(SCHEMA, {"vault_path": vault_path}, None, on_lookup)
+
+def load_passwords_async(vault_paths, callback):
+    """Batched load_passwords without blocking; calls callback(passwords, error)
+    from the main loop."""
+    vault_paths = list(vault_paths)
+    if not vault_paths:
+        callback({}, None)
+        return
+
+    def on_search(service, result, *args):
+        try:
+            items = service.search_finish(result)
+            passwords = _passwords_from_items(items, vault_paths)
+        except Exception as e:
+            callback({}, e)
+            return
+        callback(passwords, None)
+
+    def on_service(source, result, *args):
+        try:
+            service = Secret.Service.get_finish(result)
+        except Exception as e:
+            callback({}, e)
+            return
+        service.search(SCHEMA, {}, SEARCH_FLAGS, None, on_search)
+
+    Secret.Service.get(SERVICE_FLAGS, None, on_service)
+
+# Writes complete on the main loop: a Future's done callbacks run there, and
+# result() may only be waited on from other threads while the loop runs.
+
+def save_passwords(passwords):
+    """Store {vault_path: password} for several vaults over one Secret Service
+    session, all writes in flight at once.
+
+    Returns a Future that resolves to None once every password is stored, or
+    fails with KeyringError naming the vaults that could not be stored.
+    """
+    future = Future()
+    future.set_running_or_notify_cancel()
+    if not passwords:
+        future.set_result(None)
+        return future
+
+    pending = [len(passwords)]
+    errors = {}
+
+    def finish_one(vault_path, error):
+        if error is not None:
+            print(f"DEBUG: Storing password for {vault_path} failed: {error}", flush=True)
+            errors[vault_path] = error
+        pending[0] -= 1
+        if pending[0] == 0:
+            if errors:
+                future.set_exception(KeyringError(errors))
+            else:
+                future.set_result(None)
+
+    def on_service(source, result, *args):
+        try:
+            service = Secret.Service.get_finish(result)
+        except Exception as e:
+            future.set_exception(KeyringError({path: e for path in passwords}))
+            return
+        for vault_path, password in passwords.items():
+            def on_stored(service, result, *args, vault_path=vault_path):
+                try:
+                    service.store_finish(result)
+                except Exception as e:
+                    finish_one(vault_path, e)
+                    return
+                finish_one(vault_path, None)
+
+            value = Secret.Value.new(password, -1, "text/plain")
+            service.store(SCHEMA, {"vault_path": vault_path}, Secret.COLLECTION_DEFAULT,
+                          _label(vault_path), value, None, on_stored)
+
+    Secret.Service.get(Secret.ServiceFlags.OPEN_SESSION, None, on_service)
+    return future
+
+def wait(future, timeout=None):
+    """Run the default GLib main context until future is done and return its
+    result. For callers without a running main loop, such as command line
+    tools; raises TimeoutError after timeout seconds."""
+    from gi.repository import GLib
+    context = GLib.MainContext.default()
+    expired = []
+    source = None
+    if timeout is not None:
+        def on_timeout():
+            expired.append(True)
+            return False
+        source = GLib.timeout_add(int(timeout * 1000), on_timeout)
+    try:
+        while not future.done() and not expired:
+            context.iteration(True)
+    finally:
+        if source is not None and not expired:
+            GLib.source_remove(source)
+    return future.result(timeout=0)
+
+def save_password_async(vault_path, password):
+    """Store one password without blocking; returns a Future like save_passwords"""
+    return save_passwords({vault_path: password})
+
+def delete_password_async(vault_path):
+    """Remove a saved password without blocking; returns a Future that
+    resolves to whether one was removed"""
+    future = Future()
+    future.set_running_or_notify_cancel()
+
+    def on_cleared(source, result, *args):
+        try:
+            removed = Secret.password_clear_finish(result)
+        except Exception as e:
+            print(f"DEBUG: Removing password for {vault_path} failed: {e}", flush=True)
+            future.set_exception(KeyringError({vault_path: e}))
+            return
+        future.set_result(removed)
+
+    Secret.password_clear(SCHEMA, {"vault_path": vault_path}, None, on_cleared)
+    return future
@@ -1,12 +1,27 @@
 import sys
+
+# Headless commands and background start never load GTK
+HEADLESS_COMMANDS = ("status", "unlock", "lock", "automount", "daemon")
+if __name__ == '__main__' and len(sys.argv) > 1:
+    if sys.argv[1] in HEADLESS_COMMANDS:
+        from cli import main
+        sys.exit(main(sys.argv[1:]))
+    if sys.argv[1] in ("--background", "-b"):
+        # Autostart: run the daemon and auto-mount; the window attaches to it later
+        from cli import main
+        sys.exit(main(["daemon", "--automount"]))
+
+import startup_profile
+if __name__ == '__main__' and '--profile-startup' in sys.argv:
+    sys.argv.remove('--profile-startup')
+    startup_profile.start("gtk imports")
+
 import gi
 
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, GLib, Gio
 
-from window import MainWindow
-
 class CryptomatorApp(Adw.Application):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -25,6 +40,9 @@ class CryptomatorApp(Adw.Application):
     def do_activate(self):
         win = self.props.active_window
         if not win:
+            startup_profile.mark("window imports")
+            from window import MainWindow
+            startup_profile.mark("window construction")
             win = MainWindow(application=self)
         
         if getattr(self, 'start_in_background', False):
@@ -36,6 +54,7 @@ class CryptomatorApp(Adw.Application):
 
 if __name__ == '__main__':
     try:
+        startup_profile.mark("application init")
         app = CryptomatorApp()
         app.run(sys.argv)
     except Exception as e:
@@ -0,0 +1,240 @@
+"""
+Client for the shared mount host (MountHost.java).
+
+Instead of one cryptomator-cli JVM per vault, a single long-lived JVM mounts
+every vault through the cryptofs and FUSE libraries bundled with the cli.
+Each vault then costs its crypto state and FUSE threads, and only the first
+unlock pays for JVM startup.
+
+The host listens on a Unix socket next to the daemon's and speaks the line
+protocol of host.py; the password travels base64-encoded. It outlives the
+window like cli processes do, and exits on its own after IDLE_EXIT seconds
+without mounts, unless it was started as a warm standby. A host started by
+this process is supervised: if it dies, every vault it served is reported
+as exited.
+
+`python3 mount_host.py train VAULT PASSWORD` runs one unlock (the mount
+itself may fail) and shuts the host down; the Flatpak build uses it to
+record the host's class-data-sharing archive.
+"""
+
+import os
+import base64
+import shutil
+import socket
+import subprocess
+import threading
+import time
+
+import tracing
+from supervisor import Handle, Supervisor
+
+HOST_COMMAND = "locker-mount-host" # Installed by the Flatpak manifest
+IDLE_EXIT = 600 # Seconds the host stays up without mounts
+START_TIMEOUT = 30 # Seconds for a fresh JVM to start listening
+REQUEST_TIMEOUT = 120 # Unlocks run scrypt and mount
+
+
+class MountHostError(Exception):
+    pass
+
+
+def socket_path():
+    from daemon import socket_path as daemon_socket_path
+    return os.path.join(os.path.dirname(daemon_socket_path()), "mount-host.sock")
+
+def available():
+    return shutil.which(HOST_COMMAND) is not None
+
+
+class HostedMount(Handle):
+    """A vault mounted by the shared host. Stands in for the process of a
+    per-vault cli in CryptomatorBackend._instances."""
+
+    def __init__(self, host, vault_path, mount_point):
+        super().__init__(os.path.basename(vault_path))
+        self.host = host
+        self.vault_path = vault_path
+        self.mount_point = mount_point
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+    def terminate(self):
+        self._unmount(force=False)
+
+    def kill(self):
+        self._unmount(force=True)
+
+    def _unmount(self, force):
+        self.stopping = True
+        if self.returncode is not None:
+            return
+        try:
+            self.host.unmount(self.vault_path, force)
+        except MountHostError as e:
+            print(f"DEBUG: Mount host could not lock {self.vault_path}: {e}", flush=True)
+            if not force:
+                # Busy mount: a cli on SIGTERM would not wait either
+                try:
+                    self.host.unmount(self.vault_path, True)
+                except MountHostError:
+                    pass
+        self.returncode = 0
+
+    def tail(self, lines=None):
+        return self.host.tail(lines)
+
+
+class MountHost:
+    """The shared host; use MountHost.get()"""
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self, path=None, command=None):
+        self.path = path or socket_path()
+        self.command = command or [HOST_COMMAND]
+        self._child = None # Supervised host process, if we started it
+        self._mounts = {} # vault_path -> HostedMount
+        self._lock = threading.Lock()
+
+    def request(self, op, *args, timeout=REQUEST_TIMEOUT):
+        """Send one request on a fresh connection, so unlocks run in parallel"""
+        line = ('\t'.join((op,) + args) + '\n').encode('utf-8')
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(self.path)
+                sock.sendall(line)
+                with sock.makefile('rb') as f:
+                    reply = f.readline().decode('utf-8')
+        except OSError as e:
+            raise MountHostError(f"Mount host not reachable: {e}")
+        if not reply:
+            raise MountHostError("Mount host closed the connection")
+        fields = reply.rstrip('\n').split('\t')
+        if fields[0] != 'ok':
+            raise MountHostError(fields[1] if len(fields) > 1 else f"{op} failed")
+        return fields[1:]
+
+    def is_running(self):
+        try:
+            self.request("ping", timeout=2)
+            return True
+        except MountHostError:
+            return False
+
+    def ensure_running(self, idle_exit=IDLE_EXIT):
+        """Start the host unless one is listening already (maybe from an
+        earlier session). idle_exit=0 keeps it running without mounts."""
+        with self._lock:
+            if self.is_running():
+                return
+            os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+            print(f"DEBUG: Starting mount host: {' '.join(self.command)}", flush=True)
+            proc = subprocess.Popen(
+                self.command + [self.path, str(idle_exit)],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                start_new_session=True # Mounts outlive the window
+            )
+            self._child = Supervisor.get().watch(proc, "mount-host", on_exit=self._on_host_exit)
+            deadline = time.monotonic() + START_TIMEOUT
+            while time.monotonic() < deadline:
+                if self._child.poll() is not None:
+                    self._child.wait_output(timeout=2)
+                    raise MountHostError(f"Mount host exited with code {self._child.returncode}:\n"
+                                         f"{self._child.tail(20)}")
+                if self.is_running():
+                    return
+                time.sleep(0.1)
+            raise MountHostError("Mount host did not start listening")
+
+    def mount(self, vault_path, password, mount_point, timeout=None):
+        """Unlock and mount a vault; returns its HostedMount, or None on failure"""
+        try:
+            with tracing.span("unlock.host_start"):
+                self.ensure_running()
+            encoded = base64.b64encode(password.encode('utf-8')).decode('ascii')
+            # Key derivation and the FUSE mount, inside the host
+            with tracing.span("unlock.host_request"):
+                self.request("unlock", vault_path, mount_point, encoded,
+                             timeout=timeout or REQUEST_TIMEOUT)
+        except MountHostError as e:
+            print(f"Unlock through mount host failed: {e}", flush=True)
+            return None
+        handle = HostedMount(self, vault_path, mount_point)
+        with self._lock:
+            self._mounts[vault_path] = handle
+        return handle
+
+    def unmount(self, vault_path, force=False):
+        self.request("lock", vault_path, *(["force"] if force else []))
+        with self._lock:
+            self._mounts.pop(vault_path, None)
+
+    def mounted(self):
+        """{vault_path: mount_point} of every vault the host serves"""
+        fields = self.request("list")
+        return dict(zip(fields[0::2], fields[1::2]))
+
+    def tail(self, lines=None):
+        return self._child.tail(lines) if self._child is not None else ""
+
+    def shutdown(self):
+        """Lock every vault the host serves and stop it"""
+        try:
+            self.request("shutdown")
+        except MountHostError:
+            return
+        if self._child is not None:
+            try:
+                self._child.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self._child.kill()
+
+    def _on_host_exit(self, child):
+        print(f"DEBUG: Mount host exited with code {child.returncode}", flush=True)
+        with self._lock:
+            handles = list(self._mounts.values())
+            self._mounts.clear()
+        # Every vault it served is gone with it
+        for handle in handles:
+            handle.returncode = child.returncode if child.returncode is not None else -1
+            Supervisor.get().report_exit(handle)
+
+
+def main(argv=None):
+    import sys
+    import tempfile
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 3 or args[0] != "train":
+        print("Usage: mount_host.py train VAULT PASSWORD", file=sys.stderr)
+        return 2
+    vault_path, password = args[1], args[2]
+    with tempfile.TemporaryDirectory() as runtime_dir:
+        host = MountHost(os.path.join(runtime_dir, "mount-host.sock"))
+        mount_point = os.path.join(runtime_dir, "mnt")
+        os.mkdir(mount_point)
+        if host.mount(vault_path, password, mount_point) is not None:
+            host.unmount(vault_path, force=True)
+        host.shutdown()
+        print(host.tail(), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
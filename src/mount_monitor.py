@@ -0,0 +1,129 @@
+import os
+import re
+import threading
+
+# LOCKER_MOUNTINFO points at a stand-in mount table (see benchmarks/)
+MOUNTINFO_PATH = os.environ.get('LOCKER_MOUNTINFO', '/proc/self/mountinfo')
+
+def parse_mountinfo(text):
+    """Map mount point -> mount ID for /proc/self/mountinfo contents.
+
+    Stacked mounts on the same path resolve to the topmost (last listed) one.
+    """
+    mounts = {}
+    for line in text.splitlines():
+        parts = line.split(' ', 5)
+        if len(parts) >= 5:
+            # Whitespace and backslashes in paths are escaped as octal (e.g. \040)
+            mount_point = re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), parts[4])
+            mounts[mount_point] = parts[0]
+    return mounts
+
+def read_mountinfo(path=MOUNTINFO_PATH):
+    try:
+        with open(path, 'r') as f:
+            return parse_mountinfo(f.read())
+    except OSError:
+        return {}
+
+
+class MountMonitor:
+    """Indexed view of the mount table that refreshes only when the kernel
+    signals a change (POLLPRI on mountinfo), instead of rescanning per query.
+
+    Listeners are called as callback(added, removed) with sets of mount points.
+    """
+    _instance = None
+
+    @classmethod
+    def get(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, path=MOUNTINFO_PATH):
+        self.path = path
+        self._mounts = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._file = None
+        self._watch_id = None
+        self.refresh()
+
+    @property
+    def watching(self):
+        return self._watch_id is not None
+
+    def start(self):
+        """Watch mountinfo from the GLib main loop"""
+        if self.watching:
+            return True
+        from gi.repository import GLib
+        try:
+            self._file = open(self.path, 'r')
+        except OSError as e:
+            print(f"DEBUG: Cannot watch {self.path}: {e}", flush=True)
+            return False
+        channel = GLib.IOChannel.unix_new(self._file.fileno())
+        self._watch_id = GLib.io_add_watch(
+            channel, GLib.PRIORITY_DEFAULT,
+            GLib.IOCondition.PRI | GLib.IOCondition.ERR,
+            self._on_mountinfo_changed
+        )
+        # Reading through the watched descriptor arms the change notification
+        self.refresh()
+        return True
+
+    def stop(self):
+        if self._watch_id is not None:
+            from gi.repository import GLib
+            GLib.source_remove(self._watch_id)
+            self._watch_id = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def connect(self, callback):
+        self._listeners.append(callback)
+
+    def disconnect(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def refresh(self):
+        """Re-read the mount table and notify listeners about differences"""
+        if self._file is not None:
+            try:
+                self._file.seek(0)
+                mounts = parse_mountinfo(self._file.read())
+            except OSError:
+                mounts = read_mountinfo(self.path)
+        else:
+            mounts = read_mountinfo(self.path)
+
+        with self._lock:
+            old = self._mounts
+            self._mounts = mounts
+        added = {mp for mp, mount_id in mounts.items() if old.get(mp) != mount_id}
+        removed = {mp for mp in old if mp not in mounts}
+
+        if added or removed:
+            for callback in list(self._listeners):
+                try:
+                    callback(added, removed)
+                except Exception as e:
+                    print(f"DEBUG: Mount listener failed: {e}", flush=True)
+        return bool(added or removed)
+
+    def is_mounted(self, mount_point):
+        if not self.watching:
+            # Nobody keeps the table current, so take a fresh snapshot
+            self.refresh()
+        return mount_point in self._mounts
+
+    def mount_id(self, mount_point):
+        return self._mounts.get(mount_point)
+
+    def _on_mountinfo_changed(self, channel, condition):
+        self.refresh()
+        return True
@@ -4,18 +4,20 @@ import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, GObject, Gio, GLib, Gdk
-from vault import Vault, VaultStatus
-from backend import CryptomatorBackend
+from vault import VaultStatus
 
 class VaultRow(Adw.ActionRow):
+    """A row of the vault list.
+
+    Rows are recycled by the list view: bind() attaches a row to a VaultItem
+    and unbind() detaches it again, so a row must not keep state of its own.
+    """
     __gtype_name__ = 'VaultRow'
 
-    def __init__(self, vault: Vault, **kwargs):
+    def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.vault = vault
-        
-        self.set_title(vault.name)
-        self.set_subtitle(vault.path)
+        self.item = None
+        self._changed_id = None
         
         # Status icon
         self.status_icon = Gtk.Image()
@@ -42,7 +44,25 @@ class VaultRow(Adw.ActionRow):
         self.set_activatable(False)
         
         self.setup_context_menu()
-        self.update_status()
+
+    @property
+    def vault(self):
+        return self.item.vault if self.item is not None else None
+
+    def bind(self, item):
+        self.item = item
+        self._changed_id = item.connect("changed", self.on_item_changed)
+        self.native_action.set_state(GLib.Variant.new_boolean(item.vault.mounter == "native"))
+        self.update_ui()
+
+    def unbind(self):
+        if self.item is not None and self._changed_id is not None:
+            self.item.disconnect(self._changed_id)
+        self.item = None
+        self._changed_id = None
+
+    def on_item_changed(self, item):
+        self.update_ui()
 
     def setup_context_menu(self):
         # Action group for the row
@@ -58,11 +78,18 @@ class VaultRow(Adw.ActionRow):
         action.connect("activate", self.on_rename_action)
         action_group.add_action(action)
         
+        # Native mounter toggle (Python FUSE instead of cryptomator-cli)
+        self.native_action = Gio.SimpleAction.new_stateful("native-mounter", None,
+                                                           GLib.Variant.new_boolean(False))
+        self.native_action.connect("change-state", self.on_native_mounter_changed)
+        action_group.add_action(self.native_action)
+        
         self.insert_action_group("row", action_group)
         
         # Menu model
         menu = Gio.Menu()
         menu.append("Rename", "row.rename")
+        menu.append("Use Native Mounter", "row.native-mounter")
         menu.append("Remove", "row.remove")
         
         # Popover
@@ -86,6 +113,13 @@ class VaultRow(Adw.ActionRow):
         self.popover.set_pointing_to(rect)
         self.popover.popup()
 
+    def on_native_mounter_changed(self, action, value):
+        action.set_state(value)
+        self.vault.mounter = "native" if value.get_boolean() else "cli"
+        win = self.get_root()
+        if hasattr(win, 'save_vault'):
+            win.save_vault(self.vault)
+
     def on_remove_action(self, action, param):
         """Remove vault from the list"""
         dialog = Adw.MessageDialog(
@@ -93,6 +127,9 @@ class VaultRow(Adw.ActionRow):
             body=f"Remove '{self.vault.name}' from the vault list?\n\nThis will NOT delete the vault files, only remove it from this application.",
             transient_for=self.get_root()
         )
+        vault = self.vault
+        forget_check = Gtk.CheckButton(label="Also delete the saved password")
+        dialog.set_extra_child(forget_check)
         
         dialog.add_response("cancel", "Cancel")
         dialog.add_response("remove", "Remove")
@@ -101,9 +138,9 @@ class VaultRow(Adw.ActionRow):
         
         def response_cb(dlg, response):
             if response == "remove":
-                win = self.get_root()
+                win = dlg.get_transient_for()
                 if hasattr(win, 'remove_vault'):
-                    win.remove_vault(self.vault)
+                    win.remove_vault(vault, forget_password=forget_check.get_active())
             dlg.destroy()
             
         dialog.connect("response", response_cb)
@@ -116,6 +153,7 @@ class VaultRow(Adw.ActionRow):
             transient_for=self.get_root()
         )
         
+        item = self.item
         entry = Gtk.Entry()
         entry.set_text(self.vault.name)
         dialog.set_extra_child(entry)
@@ -128,11 +166,11 @@ class VaultRow(Adw.ActionRow):
             if response == "rename":
                 new_name = entry.get_text()
                 if new_name:
-                    self.vault.name = new_name
-                    self.update_ui()
-                    win = self.get_root()
-                    if hasattr(win, 'save_vaults'):
-                        win.save_vaults()
+                    item.vault.name = new_name
+                    item.notify_changed()
+                    win = dlg.get_transient_for()
+                    if hasattr(win, 'save_vault'):
+                        win.save_vault(item.vault)
             dlg.destroy()
             
         dialog.connect("response", response_cb)
@@ -141,6 +179,7 @@ class VaultRow(Adw.ActionRow):
     def update_status(self):
         is_unlocked = self.vault.status == VaultStatus.UNLOCKED
         
+        self.action_btn.set_sensitive(self.item.busy is None)
         if is_unlocked:
             self.status_icon.set_from_icon_name("changes-allow-symbolic")
             self.action_btn.set_icon_name("changes-allow-symbolic")
@@ -158,6 +197,8 @@ class VaultRow(Adw.ActionRow):
             self.action_btn.remove_css_class("destructive-action")
             self.set_subtitle(self.vault.path)
             self.reveal_btn.set_visible(False)
+        if self.item.busy is not None:
+            self.action_btn.set_tooltip_text(self.item.busy)
 
     def on_action_clicked(self, btn):
         win = self.get_root()
@@ -165,13 +206,14 @@ class VaultRow(Adw.ActionRow):
             # Open Password Dialog
             from password_dialog import PasswordDialog
             pwd_dlg = PasswordDialog(win, self.vault.name)
+            item = self.item
             
             def response_cb(dlg, response):
                 if response == "unlock":
                     password = dlg.get_password()
                     if password:
-                        # Call unlock logic (usually in window/backend)
-                        self.unlock_vault(password)
+                        # The row may show another vault by the time the dialog closes
+                        self.unlock_vault(item, password, win, save_password=dlg.get_save_password())
                 dlg.destroy()
             
             pwd_dlg.connect("response", response_cb)
@@ -180,55 +222,93 @@ class VaultRow(Adw.ActionRow):
             # Lock vault
             self.lock_vault()
 
-    def unlock_vault(self, password):
+    def unlock_vault(self, item, password, win, save_password=False):
         # Disable button and show spinner/loading state if possible
-        self.action_btn.set_sensitive(False)
-        self.action_btn.set_tooltip_text("Unlocking...")
+        item.set_busy("Unlocking...")
+        vault = item.vault
         
         def run_unlock():
             from backend import CryptomatorBackend
             home_dir = os.path.expanduser('~')
             mount_base = os.path.join(home_dir, "mnt", "cryptomator")
-            mount_point = os.path.join(mount_base, self.vault.name)
+            mount_point = os.path.join(mount_base, vault.name)
             
-            success, actual_mount = CryptomatorBackend.unlock(self.vault.path, password, mount_point)
+            success, actual_mount = CryptomatorBackend.unlock(vault.path, password, mount_point,
+                                                              mounter=vault.mounter)
             
             # Update UI on main thread
-            GLib.idle_add(self.on_unlock_finished, success, actual_mount)
+            GLib.idle_add(self.on_unlock_finished, item, win, success, actual_mount)
+            if success and save_password:
+                # Only a password that unlocked the vault is worth keeping
+                GLib.idle_add(self.store_password, win, vault, password)
             
         threading.Thread(target=run_unlock, daemon=True).start()
 
-    def on_unlock_finished(self, success, actual_mount):
-        self.action_btn.set_sensitive(True)
+    @staticmethod
+    def on_unlock_finished(item, win, success, actual_mount):
+        item.busy = None
         
         if success:
-            self.vault.status = VaultStatus.UNLOCKED
-            self.vault.mount_path = actual_mount
-            self.update_status()
+            item.vault.status = VaultStatus.UNLOCKED
+            item.vault.mount_path = actual_mount
+            item.notify_changed()
+            if hasattr(win, 'save_vault'):
+                win.save_vault(item.vault)
             # Automatically open file manager on success
-            self.on_reveal_clicked(None)
+            VaultRow.reveal(win, item.vault)
         else:
-            self.action_btn.set_tooltip_text("Unlock")
+            item.notify_changed()
             # Show error toast/dialog
-            win = self.get_root()
             if hasattr(win, 'toast_overlay'):
                 toast = Adw.Toast.new("Failed to unlock vault")
                 win.toast_overlay.add_toast(toast)
+        return False
+
+    @staticmethod
+    def store_password(win, vault, password):
+        try:
+            import keyring_helper
+            future = keyring_helper.save_password_async(vault.path, password)
+        except Exception as e:
+            print(f"DEBUG: Keyring unavailable: {e}", flush=True)
+            future = None
+
+        def on_stored(future):
+            if future is not None and future.exception() is None:
+                return False
+            if hasattr(win, 'toast_overlay'):
+                toast = Adw.Toast.new(f"Could not save the password for '{vault.name}'")
+                win.toast_overlay.add_toast(toast)
+            return False
+
+        if future is None:
+            on_stored(None)
+        else:
+            future.add_done_callback(lambda future: GLib.idle_add(on_stored, future))
+        return False
 
     def lock_vault(self):
         from backend import CryptomatorBackend
         if CryptomatorBackend.lock(self.vault.path, self.vault.mount_path):
             self.vault.status = VaultStatus.LOCKED
             self.vault.mount_path = None
-            self.update_status()
+            self.item.notify_changed()
+            win = self.get_root()
+            if hasattr(win, 'save_vault'):
+                win.save_vault(self.vault)
 
     def on_reveal_clicked(self, btn):
-        if self.vault.mount_path:
-            uri = f"file://{self.vault.mount_path}"
-            Gtk.show_uri(self.get_root(), uri, 0)
+        self.reveal(self.get_root(), self.vault)
+
+    @staticmethod
+    def reveal(win, vault):
+        if vault.mount_path:
+            uri = f"file://{vault.mount_path}"
+            Gtk.show_uri(win, uri, 0)
 
     def update_ui(self):
-        # Alias for update_status if window calls update_ui
+        if self.item is None:
+            return
         self.update_status()
         self.set_title(self.vault.name)
 
@@ -1,7 +1,7 @@
 import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw, Gio, GLib
+from gi.repository import Gtk, Adw, Gio, GLib, GObject
 import os
 
 class SettingsDialog(Adw.PreferencesWindow):
@@ -30,12 +30,45 @@ class SettingsDialog(Adw.PreferencesWindow):
         self.automount_row = Adw.SwitchRow(title="Auto-mount Vaults")
         self.automount_row.set_subtitle("Attempt to unlock saved vaults on startup")
         
+        from automount import DEFAULT_CONCURRENCY
+        self.concurrency_row = Adw.SpinRow.new_with_range(1, 16, 1)
+        self.concurrency_row.set_title("Parallel Unlocks")
+        self.concurrency_row.set_subtitle("Vaults unlocked at the same time during auto-mount")
+        self.concurrency_row.set_value(DEFAULT_CONCURRENCY)
+        
+        self.restart_row = Adw.SwitchRow(title="Restart Crashed Mounts")
+        self.restart_row.set_subtitle("Remount a vault if its mount process stops unexpectedly; keeps the password in memory while unlocked")
+        
+        self.shared_host_row = Adw.SwitchRow(title="Share One Java Process")
+        self.shared_host_row.set_subtitle("Serve all cryptomator-cli vaults from a single process to save memory")
+        
+        self.standby_row = Adw.SwitchRow(title="Keep Java Ready")
+        self.standby_row.set_subtitle("Start the shared process at launch and keep it running for faster unlocks")
+        
         # Use JSON file for settings (no GSettings schema compiled)
         self.settings_file = os.path.join(GLib.get_user_config_dir(), "locker", "settings.json")
         self.load_settings()
         
         self.automount_row.connect("notify::active", self.on_automount_changed)
         group.add(self.automount_row)
+        
+        # Number of vaults unlocked at the same time during auto-mount
+        self.concurrency_row.connect("notify::value", self.on_concurrency_changed)
+        group.add(self.concurrency_row)
+        
+        # Restart mount processes that die while unlocked
+        self.restart_row.connect("notify::active", self.on_restart_changed)
+        group.add(self.restart_row)
+        
+        # One JVM for all vaults instead of one per vault
+        self.shared_host_row.connect("notify::active", self.on_shared_host_changed)
+        group.add(self.shared_host_row)
+        
+        # Pre-started shared JVM, so the first unlock skips JVM startup
+        self.standby_row.connect("notify::active", self.on_standby_changed)
+        self.shared_host_row.bind_property("active", self.standby_row, "sensitive",
+                                           GObject.BindingFlags.SYNC_CREATE)
+        group.add(self.standby_row)
 
     def get_host_autostart_dir(self):
         # In Flatpak, os.path.expanduser("~") points to sandbox home.
@@ -93,10 +126,34 @@ Categories=Utility;Security;
                 with open(self.settings_file, 'r') as f:
                     data = json.load(f)
                     self.automount_row.set_active(data.get("automount", False))
+                    if "automount_concurrency" in data:
+                        self.concurrency_row.set_value(data["automount_concurrency"])
+                    self.restart_row.set_active(data.get("restart_crashed_mounts", False))
+                    self.shared_host_row.set_active(data.get("shared_mount_host", False))
+                    self.standby_row.set_active(data.get("jvm_standby", False))
             except:
                 pass
 
     def on_automount_changed(self, row, param):
+        self.save_setting("automount", row.get_active())
+
+    def on_concurrency_changed(self, row, param):
+        self.save_setting("automount_concurrency", int(row.get_value()))
+
+    def on_restart_changed(self, row, param):
+        self.save_setting("restart_crashed_mounts", row.get_active())
+
+    def on_shared_host_changed(self, row, param):
+        self.save_setting("shared_mount_host", row.get_active())
+
+    def on_standby_changed(self, row, param):
+        self.save_setting("jvm_standby", row.get_active())
+        import threading
+        from backend import CryptomatorBackend
+        target = CryptomatorBackend.start_standby if row.get_active() else CryptomatorBackend.stop_standby
+        threading.Thread(target=target, daemon=True).start()
+
+    def save_setting(self, key, value):
         import json
         data = {}
         if os.path.exists(self.settings_file):
@@ -105,8 +162,8 @@ Categories=Utility;Security;
                     data = json.load(f)
              except: pass
         
-        data["automount"] = row.get_active()
+        data[key] = value
         
+        from vault_store import write_atomic
         os.makedirs(os.path.dirname(self.settings_file), exist_ok=True)
-        with open(self.settings_file, 'w') as f:
-            json.dump(data, f)
+        write_atomic(self.settings_file, json.dumps(data))
@@ -0,0 +1,111 @@
+"""
+Startup profiling for `locker --profile-startup`.
+
+Splits startup into named phases and records, per phase, the wall time and
+every module imported for the first time with its self and cumulative
+import time (like `python -X importtime`). The report is printed to stderr
+and saved as JSON to $XDG_CACHE_HOME/locker/startup-profile.json.
+
+All functions are no-ops unless start() was called.
+"""
+
+import os
+import sys
+import json
+import time
+import builtins
+import threading
+
+_active = False
+_start = 0.0
+_phases = [] # [name, start, end, [(module, self_s, total_s), ...]]
+_stack = [] # Time spent in nested imports, per active import
+_original_import = builtins.__import__
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or threading.current_thread() is not threading.main_thread():
+        return _original_import(name, globals, locals, fromlist, level)
+    # Only first-time imports cost anything worth recording
+    module = sys.modules.get(name)
+    if module is not None and all(attr == "*" or hasattr(module, attr) for attr in fromlist or ()):
+        return _original_import(name, globals, locals, fromlist, level)
+
+    # fromlist names may be submodules or plain attributes; only what lands
+    # in sys.modules is a module imported for the first time
+    before = set(sys.modules)
+    start = time.perf_counter()
+    _stack.append(0.0)
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        total = time.perf_counter() - start
+        children = _stack.pop()
+        if _stack:
+            _stack[-1] += total
+        wanted = [name] + [f"{name}.{attr}" for attr in (fromlist or ()) if attr != "*"]
+        new = [module for module in wanted if module in sys.modules and module not in before]
+        if _phases and new:
+            _phases[-1][3].append((", ".join(new), total - children, total))
+
+
+def start(first_phase="startup"):
+    global _active, _start
+    if _active:
+        return
+    _active = True
+    _start = time.perf_counter()
+    _phases.append([first_phase, _start, None, []])
+    builtins.__import__ = _timed_import
+
+
+def mark(phase):
+    """End the current phase and start the next one"""
+    if not _active:
+        return
+    now = time.perf_counter()
+    _phases[-1][2] = now
+    _phases.append([phase, now, None, []])
+
+
+def finish(top=5):
+    """Stop profiling, print the breakdown and save it"""
+    global _active
+    if not _active:
+        return None
+    _active = False
+    builtins.__import__ = _original_import
+    _phases[-1][2] = time.perf_counter()
+
+    report = {
+        "total_ms": round((_phases[-1][2] - _start) * 1000, 2),
+        "phases": [
+            {
+                "name": name,
+                "ms": round((end - begin) * 1000, 2),
+                "import_ms": round(sum(self_s for _, self_s, _ in imports) * 1000, 2),
+                "imports": [
+                    {"module": module, "self_ms": round(self_s * 1000, 2), "total_ms": round(total_s * 1000, 2)}
+                    for module, self_s, total_s in sorted(imports, key=lambda i: -i[1])
+                ],
+            }
+            for name, begin, end, imports in _phases
+        ],
+    }
+
+    print(f"Startup profile: {report['total_ms']:.1f} ms", file=sys.stderr)
+    for phase in report["phases"]:
+        print(f"  {phase['name']:<24} {phase['ms']:8.1f} ms  "
+              f"(imports {phase['import_ms']:.1f} ms, {len(phase['imports'])} modules)", file=sys.stderr)
+        for entry in phase["imports"][:top]:
+            print(f"      {entry['self_ms']:7.1f} ms  {entry['module']}", file=sys.stderr)
+    sys.stderr.flush()
+
+    cache_dir = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "locker")
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(os.path.join(cache_dir, "startup-profile.json"), 'w') as f:
+            json.dump(report, f, indent=2)
+    except OSError as e:
+        print(f"DEBUG: Cannot save startup profile: {e}", flush=True)
+    return report
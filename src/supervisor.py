@@ -0,0 +1,278 @@
+"""
+Supervision of long-running mount processes.
+
+A single background thread watches every supervised child: it drains their
+stdout and stderr as soon as data arrives, keeping the last OUTPUT_LINES
+lines in a ring buffer, so a chatty process never blocks on a full pipe. A
+pidfd per child wakes the thread when the child exits; the exit is reaped
+and reported to the child's on_exit callback on a separate thread. Without
+pidfd support (Linux < 5.3), children are polled every POLL_INTERVAL seconds.
+"""
+
+import os
+import time
+import selectors
+import threading
+from collections import deque
+
+OUTPUT_LINES = 200 # Lines of output kept per child
+MAX_LINE = 64 * 1024 # Longer lines are split
+READ_SIZE = 64 * 1024
+POLL_INTERVAL = 1.0 # Seconds between exit checks without pidfd
+
+
+class Handle:
+    """Something running a mount whose exit is reported once to on_exit"""
+
+    def __init__(self, name, on_exit=None):
+        self.name = name
+        self.on_exit = on_exit
+        self.started = time.monotonic()
+        self.stopping = False # Set by terminate()/kill(): the exit is expected
+        self.exit_reported = False
+        self._lock = threading.Lock()
+
+    def uptime(self):
+        return time.monotonic() - self.started
+
+
+class Child(Handle):
+    """A supervised process. Mirrors the parts of Popen the backend uses."""
+
+    def __init__(self, proc, name, on_exit=None, output_lines=OUTPUT_LINES):
+        super().__init__(name, on_exit)
+        self.proc = proc
+        self.pid = proc.pid
+        self.output = deque(maxlen=output_lines) # (stream name, line)
+        self.first_output = None # time.monotonic() of the first output
+        self._partial = {}
+        self._open_streams = 0
+        self._output_done = threading.Event()
+
+    @property
+    def returncode(self):
+        return self.proc.returncode
+
+    @property
+    def stdin(self):
+        return self.proc.stdin
+
+    def poll(self):
+        return self.proc.poll()
+
+    def wait(self, timeout=None):
+        return self.proc.wait(timeout=timeout)
+
+    def terminate(self):
+        self.stopping = True
+        if self.proc.poll() is None:
+            self.proc.terminate()
+
+    def kill(self):
+        self.stopping = True
+        if self.proc.poll() is None:
+            self.proc.kill()
+
+    def tail(self, lines=None):
+        """The most recent output, oldest first"""
+        with self._lock:
+            entries = list(self.output)
+        if lines is not None:
+            entries = entries[-lines:]
+        return "\n".join(f"[{stream}] {line}" for stream, line in entries)
+
+    def first_output_ms(self):
+        """Milliseconds from start to the first output, or None"""
+        if self.first_output is None:
+            return None
+        return round((self.first_output - self.started) * 1000, 1)
+
+    def wait_output(self, timeout=None):
+        """Wait until stdout and stderr are closed; returns False on timeout"""
+        return self._output_done.wait(timeout)
+
+    def _add_output(self, stream, data):
+        if self.first_output is None:
+            self.first_output = time.monotonic()
+        text = self._partial.pop(stream, b"") + data
+        lines = text.split(b"\n")
+        rest = lines.pop()
+        if len(rest) > MAX_LINE:
+            lines.append(rest)
+            rest = b""
+        if rest:
+            self._partial[stream] = rest
+        with self._lock:
+            for line in lines:
+                self.output.append((stream, line.decode('utf-8', 'replace')))
+
+    def _close_stream(self, stream):
+        rest = self._partial.pop(stream, b"")
+        if rest:
+            with self._lock:
+                self.output.append((stream, rest.decode('utf-8', 'replace')))
+        self._open_streams -= 1
+        if self._open_streams <= 0:
+            self._output_done.set()
+
+
+class Supervisor:
+    """Watches children from one thread; use Supervisor.get()"""
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._children = set()
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._thread = None
+
+    def watch(self, proc, name, on_exit=None):
+        """Supervise a Popen started with stdout/stderr=PIPE; returns its Child.
+
+        The pipes are drained by the supervisor from now on, so the caller
+        must not read proc.stdout or proc.stderr itself.
+        """
+        child = Child(proc, name, on_exit)
+        with self._lock:
+            self._pending.append(child)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="supervisor", daemon=True)
+                self._thread.start()
+        self._wake()
+        return child
+
+    def children(self):
+        with self._lock:
+            return list(self._children)
+
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            pass # Already woken
+
+    def _register(self, child):
+        for stream, pipe in (("stdout", child.proc.stdout), ("stderr", child.proc.stderr)):
+            if pipe is None:
+                continue
+            os.set_blocking(pipe.fileno(), False)
+            self._selector.register(pipe.fileno(), selectors.EVENT_READ, (child, stream, pipe))
+            child._open_streams += 1
+        if child._open_streams == 0:
+            child._output_done.set()
+        child.pidfd = None
+        pidfd_open = getattr(os, "pidfd_open", None)
+        if pidfd_open is not None:
+            try:
+                child.pidfd = pidfd_open(child.pid)
+                self._selector.register(child.pidfd, selectors.EVENT_READ, (child, None, None))
+            except OSError:
+                # Already reaped, or no kernel support: polled below
+                child.pidfd = None
+        self._children.add(child)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                for child in pending:
+                    self._register(child)
+                polled = [child for child in self._children if child.pidfd is None]
+
+            timeout = POLL_INTERVAL if polled else None
+            for key, events in self._selector.select(timeout):
+                if key.data is None:
+                    try:
+                        while os.read(self._wake_r, 512):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+                child, stream, pipe = key.data
+                if stream is None:
+                    self._selector.unregister(key.fd)
+                    os.close(key.fd)
+                    child.pidfd = -1
+                    self._reap(child)
+                    continue
+                try:
+                    data = os.read(key.fd, READ_SIZE)
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    data = b""
+                if data:
+                    child._add_output(stream, data)
+                else:
+                    self._selector.unregister(key.fd)
+                    pipe.close()
+                    child._close_stream(stream)
+
+            for child in polled:
+                if child.poll() is not None:
+                    self._reap(child)
+
+    def _reap(self, child):
+        child.poll()
+        if child.returncode is None:
+            # pidfd readable means the child exited; wait for the status
+            child.wait()
+        with self._lock:
+            self._children.discard(child)
+        if child.on_exit is not None:
+            threading.Thread(target=self._report_exit, args=(child,), daemon=True).start()
+
+    @staticmethod
+    def _report_exit(child):
+        """Call child.on_exit, once per Handle"""
+        # Exits race with the callback being set; report each one once
+        with child._lock:
+            if child.exit_reported:
+                return
+            child.exit_reported = True
+        try:
+            child.on_exit(child)
+        except Exception as e:
+            print(f"DEBUG: Exit handler for {child.name} failed: {e}", flush=True)
+
+    def report_exit(self, child):
+        """Run child.on_exit now if the child already exited and it was not
+        reported yet; for callbacks set after the child was watched"""
+        if child.poll() is not None and child.on_exit is not None:
+            self._report_exit(child)
+
+
+class Backoff:
+    """Restart delays: each failed attempt waits longer, up to the last delay.
+
+    A child that ran for at least reset_after seconds resets the sequence.
+    """
+
+    def __init__(self, delays=(1, 2, 4, 8, 16, 30), max_attempts=5, reset_after=60):
+        self.delays = delays
+        self.max_attempts = max_attempts
+        self.reset_after = reset_after
+        self.attempts = 0
+
+    def next_delay(self, uptime):
+        """Delay before the next restart, or None to give up"""
+        if uptime >= self.reset_after:
+            self.attempts = 0
+        if self.attempts >= self.max_attempts:
+            return None
+        delay = self.delays[min(self.attempts, len(self.delays) - 1)]
+        self.attempts += 1
+        return delay
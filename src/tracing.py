@@ -0,0 +1,180 @@
+"""
+Phase timing for unlock, lock and auto-mount, enabled by LOCKER_TRACE.
+
+    with tracing.span("unlock.prepare", vault=name):
+        ...
+
+Each finished span is appended as one JSON line to the trace log and its
+duration is added to an in-memory histogram per span name; summary() gives
+count, p50, p95, p99 and max per name, and it is printed to stderr at exit.
+Spans nest per thread: an event records the span that was open around it.
+
+LOCKER_TRACE=1 logs to $XDG_CACHE_HOME/locker/trace.jsonl, any other value
+but 0 is taken as the log path. Unset, span() returns a shared no-op object
+and nothing is recorded.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import atexit
+import threading
+from collections import defaultdict, deque
+
+HISTOGRAM_SIZE = 10000 # Most recent durations kept per span name
+
+
+def _log_path(value):
+    if value == "1":
+        cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        return os.path.join(cache_dir, "locker", "trace.jsonl")
+    return os.path.abspath(os.path.expanduser(value))
+
+
+_setting = os.environ.get("LOCKER_TRACE", "")
+ENABLED = _setting not in ("", "0")
+LOG_PATH = _log_path(_setting) if ENABLED else None
+
+_histograms = defaultdict(lambda: deque(maxlen=HISTOGRAM_SIZE)) # name -> seconds
+_lock = threading.Lock()
+_local = threading.local()
+_log = None
+
+
+class Span:
+    """A running phase; ends on leaving its with-block or on end()"""
+    __slots__ = ("name", "attrs", "parent", "start", "wall", "ended")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        stack = _stack()
+        self.parent = stack[-1].name if stack else None
+        self.start = time.perf_counter()
+        self.wall = time.time()
+        self.ended = False
+
+    def set(self, **attrs):
+        """Add attributes, e.g. the outcome, to the event"""
+        self.attrs.update(attrs)
+
+    def end(self, **attrs):
+        if self.ended:
+            return
+        self.ended = True
+        seconds = time.perf_counter() - self.start
+        self.attrs.update(attrs)
+        _record(self, seconds)
+
+    def __enter__(self):
+        _stack().append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        stack = _stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        if exc_type is not None:
+            self.attrs.setdefault("error", exc_type.__name__)
+        self.end()
+        return False
+
+
+class _NoSpan:
+    """Stands in for Span while tracing is off"""
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def end(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name, **attrs):
+    """Time a phase; use as a context manager, or call end() on the result
+    for phases that finish on another thread"""
+    if not ENABLED:
+        return _NO_SPAN
+    return Span(name, attrs)
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _record(span, seconds):
+    global _log
+    event = {
+        "ts": round(span.wall, 6),
+        "span": span.name,
+        "ms": round(seconds * 1000, 3),
+        "thread": threading.current_thread().name,
+    }
+    if span.parent is not None:
+        event["parent"] = span.parent
+    event.update(span.attrs)
+    line = json.dumps(event, default=str) + "\n"
+    with _lock:
+        _histograms[span.name].append(seconds)
+        if _log is None:
+            try:
+                os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+                _log = open(LOG_PATH, 'a', buffering=1)
+            except OSError as e:
+                print(f"DEBUG: Cannot open trace log {LOG_PATH}: {e}", flush=True)
+                _log = False
+        if _log:
+            _log.write(line)
+
+
+def _percentile(ordered, fraction):
+    # Nearest rank
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summary():
+    """{span name: {count, p50_ms, p95_ms, p99_ms, max_ms}}"""
+    with _lock:
+        histograms = {name: sorted(durations) for name, durations in _histograms.items()}
+    return {
+        name: {
+            "count": len(ordered),
+            "p50_ms": round(_percentile(ordered, 0.50) * 1000, 1),
+            "p95_ms": round(_percentile(ordered, 0.95) * 1000, 1),
+            "p99_ms": round(_percentile(ordered, 0.99) * 1000, 1),
+            "max_ms": round(ordered[-1] * 1000, 1),
+        }
+        for name, ordered in sorted(histograms.items()) if ordered
+    }
+
+
+def print_summary(file=None):
+    file = file or sys.stderr
+    stats = summary()
+    if not stats:
+        return
+    print(f"Trace summary ({LOG_PATH}):", file=file)
+    print(f"  {'span':<28} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}", file=file)
+    for name, entry in stats.items():
+        print(f"  {name:<28} {entry['count']:>6} {entry['p50_ms']:>7.1f}ms {entry['p95_ms']:>7.1f}ms "
+              f"{entry['p99_ms']:>7.1f}ms {entry['max_ms']:>7.1f}ms", file=file)
+    file.flush()
+
+
+if ENABLED:
+    atexit.register(print_summary)
@@ -0,0 +1,161 @@
+"""
+Unlock latency benchmark.
+
+Unlocks and locks one vault RUNS times per mode through CryptomatorBackend
+and reports how long each unlock took until the mount appeared:
+
+  cli-nocds   one cryptomator-cli per unlock, without the CDS archive
+  cli         one cryptomator-cli per unlock, with the CDS archive
+  host-cold   shared mount host, started by every unlock
+  host-warm   shared mount host, already running (warm standby)
+
+Every mode runs against a private settings file, so the user's settings are
+left alone, and the first WARMUP runs of a mode are not counted (page cache,
+CPU frequency). Use a vault with its usual scrypt cost: that is part of
+every unlock.
+
+  python3 unlock_benchmark.py VAULT [--runs 10] [--modes cli,host-warm]
+                              [--password-env VAR] [--json FILE]
+"""
+
+import os
+import sys
+import json
+import time
+import getpass
+import platform
+import argparse
+import tempfile
+import statistics
+
+MODES = ("cli-nocds", "cli", "host-cold", "host-warm")
+WARMUP = 1
+
+
+def _configure(mode, config_dir):
+    """Point the backend at settings for this mode"""
+    settings_dir = os.path.join(config_dir, "locker")
+    os.makedirs(settings_dir, exist_ok=True)
+    with open(os.path.join(settings_dir, "settings.json"), 'w') as f:
+        json.dump({"shared_mount_host": mode.startswith("host")}, f)
+    os.environ["XDG_CONFIG_HOME"] = config_dir
+    os.environ["LOCKER_CDS"] = "0" if mode == "cli-nocds" else "1"
+
+
+def _stop_host():
+    import mount_host
+    mount_host.MountHost.get().shutdown()
+
+
+def run_mode(mode, vault_path, password, runs, mount_point):
+    """Time `runs` unlocks (plus the warm-up) in one mode; returns seconds per
+    unlock, or raises RuntimeError when an unlock fails"""
+    from backend import CryptomatorBackend
+    import mount_host
+
+    timings = []
+    for run in range(WARMUP + runs):
+        if mode == "host-cold":
+            _stop_host()
+        elif mode == "host-warm":
+            mount_host.MountHost.get().ensure_running(idle_exit=0)
+        start = time.perf_counter()
+        success, actual_mount = CryptomatorBackend.unlock(vault_path, password, mount_point)
+        elapsed = time.perf_counter() - start
+        if not success:
+            raise RuntimeError(f"{mode}: unlock failed on run {run + 1}")
+        if not CryptomatorBackend.lock(vault_path, actual_mount):
+            raise RuntimeError(f"{mode}: lock failed on run {run + 1}")
+        if run >= WARMUP:
+            timings.append(elapsed)
+        print(f"{mode:10} run {run + 1 - WARMUP:>3}: {elapsed * 1000:8.1f} ms"
+              f"{' (warm-up)' if run < WARMUP else ''}", flush=True)
+    if mode.startswith("host"):
+        _stop_host()
+    return timings
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    return {
+        "runs": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 1),
+        "median_ms": round(statistics.median(ordered) * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+def environment():
+    """What a result depends on besides the code"""
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    return {
+        "kernel": platform.release(),
+        "cpu": cpu,
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "flatpak": os.path.exists("/.flatpak-info"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time vault unlocks per mount mode")
+    parser.add_argument("vault", help="Vault directory (must be locked)")
+    parser.add_argument("--runs", type=int, default=10, help="Timed unlocks per mode")
+    parser.add_argument("--modes", default=",".join(MODES),
+                        help=f"Comma-separated subset of {', '.join(MODES)}")
+    parser.add_argument("--password-env", metavar="VAR",
+                        help="Read the password from this environment variable")
+    parser.add_argument("--json", metavar="FILE", help="Also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+    if args.password_env:
+        password = os.environ.get(args.password_env)
+        if password is None:
+            parser.error(f"{args.password_env} is not set")
+    else:
+        password = getpass.getpass(f"Password for {args.vault}: ")
+
+    vault_path = os.path.abspath(args.vault)
+    results = {"vault": vault_path, "environment": environment(), "modes": {}}
+    with tempfile.TemporaryDirectory(prefix="locker-benchmark-") as work_dir:
+        mount_point = os.path.join(work_dir, "mnt")
+        os.mkdir(mount_point)
+        # A private host, so stopping it never locks the user's vaults
+        import mount_host
+        mount_host.MountHost._instance = mount_host.MountHost(os.path.join(work_dir, "mount-host.sock"))
+        for mode in modes:
+            _configure(mode, os.path.join(work_dir, mode))
+            try:
+                results["modes"][mode] = summarize(
+                    run_mode(mode, vault_path, password, args.runs, mount_point))
+            except RuntimeError as e:
+                print(e, file=sys.stderr)
+                results["modes"][mode] = {"error": str(e)}
+
+    print(f"\n{'mode':10} {'runs':>5} {'min':>9} {'median':>9} {'max':>9}")
+    for mode, result in results["modes"].items():
+        if "error" in result:
+            print(f"{mode:10} failed")
+            continue
+        print(f"{mode:10} {result['runs']:>5} {result['min_ms']:>7.1f}ms "
+              f"{result['median_ms']:>7.1f}ms {result['max_ms']:>7.1f}ms")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0 if all("error" not in result for result in results["modes"].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,12 +14,14 @@ class Vault:
     path: str
     status: VaultStatus = VaultStatus.LOCKED
     mount_path: str = None
+    mounter: str = "cli"  # "cli" (cryptomator-cli) or "native" (fuse_mount.py)
 
     def to_dict(self):
         return {
             "name": self.name,
             "path": self.path,
-            "mount_path": self.mount_path
+            "mount_path": self.mount_path,
+            "mounter": self.mounter
         }
 
     @classmethod
@@ -27,5 +29,24 @@ class Vault:
         return cls(
             name=data["name"],
             path=data["path"],
-            mount_path=data.get("mount_path")
+            mount_path=data.get("mount_path"),
+            mounter=data.get("mounter", "cli")
         )
+
+
+def restore_mount_states(vaults, is_mounted):
+    """Mark vaults whose saved mount_path is still mounted as unlocked and the
+    rest as locked. Returns the vaults that changed."""
+    changed = []
+    for vault in vaults:
+        if vault.mount_path and is_mounted(vault.mount_path):
+            print(f"DEBUG: Vault {vault.name} is still mounted at {vault.mount_path}", flush=True)
+            if vault.status != VaultStatus.UNLOCKED:
+                vault.status = VaultStatus.UNLOCKED
+                changed.append(vault)
+        elif vault.mount_path or vault.status != VaultStatus.LOCKED:
+            # Not mounted, clear mount_path
+            vault.mount_path = None
+            vault.status = VaultStatus.LOCKED
+            changed.append(vault)
+    return changed
@@ -0,0 +1,448 @@
+"""
+Caches for the native vault engine (vault_reader).
+
+Resolving cleartext paths costs an AES-SIV operation per name plus a
+SHA1/Base32 directory hash, so decrypted directory contents are kept in a
+bounded LRU keyed by directory ID and dropped when the ciphertext changes.
+Decrypted file content is cached per 32 KiB chunk, with read-ahead for
+sequential access.
+"""
+
+import os
+import select
+import struct
+import ctypes
+import threading
+from collections import OrderedDict
+
+# inotify(7) constants
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Minimal inotify binding; calls callback(wd, mask) from a background thread"""
+
+    MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+
+    def __init__(self, callback):
+        self.callback = callback
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_CLOEXEC | IN_NONBLOCK)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="vault-inotify", daemon=True)
+        self._thread.start()
+
+    def add(self, path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(path)), self.MASK)
+        return wd if wd >= 0 else None
+
+    def remove(self, wd):
+        self._libc.inotify_rm_watch(self._fd, wd)
+
+    def close(self):
+        if self._fd is not None:
+            os.write(self._wakeup_w, b'x')
+            self._thread.join(timeout=1)
+            os.close(self._fd)
+            os.close(self._wakeup_r)
+            os.close(self._wakeup_w)
+            self._fd = None
+
+    def _run(self):
+        poller = select.poll()
+        poller.register(self._fd, select.POLLIN)
+        poller.register(self._wakeup_r, select.POLLIN)
+        while True:
+            for fd, _ in poller.poll():
+                if fd == self._wakeup_r:
+                    return
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, cookie, name_len = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size + name_len
+                try:
+                    self.callback(wd, mask)
+                except Exception as e:
+                    print(f"DEBUG: inotify callback failed: {e}", flush=True)
+
+
+class _CachedDir:
+    __slots__ = ('path', 'children', 'listing', 'wd')
+
+    def __init__(self, path):
+        self.path = path
+        self.children = {}  # cleartext name -> Node
+        self.listing = None  # Full decrypted listing, once list_dir ran
+        self.wd = None
+
+
+class DirectoryCache:
+    """LRU of decrypted directories keyed by directory ID.
+
+    Holds the ciphertext directory path of each directory ID and the Nodes of
+    its children, so repeated lookups and listings skip the crypto entirely.
+    Call invalidate() after writing to a directory; watch() additionally
+    follows changes made by others through inotify.
+    """
+
+    def __init__(self, max_dirs=1024):
+        self.max_dirs = max_dirs
+        # Lookups and listings; a miss resolves the directory path, which is
+        # counted separately so one resolution is not counted twice
+        self.hits = 0
+        self.misses = 0
+        self.path_hits = 0
+        self.path_misses = 0
+        self._dirs = OrderedDict()
+        self._by_wd = {}
+        self._watcher = None
+        self._lock = threading.Lock()
+
+    def watch(self):
+        """Invalidate directories when their ciphertext changes on disk"""
+        with self._lock:
+            if self._watcher is None:
+                self._watcher = InotifyWatcher(self._on_inotify_event)
+                for dir_id, cached in self._dirs.items():
+                    self._add_watch(dir_id, cached)
+
+    def close(self):
+        with self._lock:
+            watcher, self._watcher = self._watcher, None
+            self._by_wd.clear()
+        if watcher is not None:
+            watcher.close()
+
+    def stats(self):
+        total = self.hits + self.misses
+        path_total = self.path_hits + self.path_misses
+        return {
+            "dirs": len(self._dirs),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "path_hits": self.path_hits,
+            "path_misses": self.path_misses,
+            "path_hit_rate": self.path_hits / path_total if path_total else 0.0,
+        }
+
+    def _get(self, dir_id):
+        cached = self._dirs.get(dir_id)
+        if cached is not None:
+            self._dirs.move_to_end(dir_id)
+        return cached
+
+    def _count(self, found):
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def dir_path(self, dir_id):
+        with self._lock:
+            cached = self._get(dir_id)
+            if cached is not None:
+                self.path_hits += 1
+                return cached.path
+            self.path_misses += 1
+            return None
+
+    def add_dir(self, dir_id, path):
+        with self._lock:
+            if dir_id in self._dirs:
+                self._dirs.move_to_end(dir_id)
+                return
+            cached = _CachedDir(path)
+            self._dirs[dir_id] = cached
+            self._add_watch(dir_id, cached)
+            while len(self._dirs) > self.max_dirs:
+                _, evicted = self._dirs.popitem(last=False)
+                self._remove_watch(evicted)
+
+    def child(self, dir_id, name):
+        with self._lock:
+            cached = self._get(dir_id)
+            node = cached.children.get(name) if cached is not None else None
+            self._count(node is not None)
+            return node
+
+    def add_child(self, dir_id, node):
+        with self._lock:
+            cached = self._dirs.get(dir_id)
+            if cached is not None:
+                cached.children[node.name] = node
+
+    def listing(self, dir_id):
+        with self._lock:
+            cached = self._get(dir_id)
+            listing = cached.listing if cached is not None else None
+            self._count(listing is not None)
+            return list(listing) if listing is not None else None
+
+    def set_listing(self, dir_id, nodes):
+        with self._lock:
+            cached = self._dirs.get(dir_id)
+            if cached is not None:
+                cached.listing = list(nodes)
+                cached.children = {node.name: node for node in nodes}
+
+    def invalidate(self, dir_id):
+        """Forget the children of dir_id (its ciphertext path never changes)"""
+        with self._lock:
+            cached = self._dirs.get(dir_id)
+            if cached is not None:
+                cached.children = {}
+                cached.listing = None
+
+    def invalidate_all(self):
+        with self._lock:
+            for cached in self._dirs.values():
+                cached.children = {}
+                cached.listing = None
+
+    def _add_watch(self, dir_id, cached):
+        if self._watcher is not None and cached.wd is None:
+            cached.wd = self._watcher.add(cached.path)
+            if cached.wd is not None:
+                self._by_wd[cached.wd] = dir_id
+
+    def _remove_watch(self, cached):
+        if cached.wd is not None:
+            self._by_wd.pop(cached.wd, None)
+            if self._watcher is not None:
+                self._watcher.remove(cached.wd)
+            cached.wd = None
+
+    def _on_inotify_event(self, wd, mask):
+        if mask & IN_Q_OVERFLOW:
+            self.invalidate_all()
+            return
+        dir_id = self._by_wd.get(wd)
+        if dir_id is None:
+            return
+        if mask & IN_IGNORED:
+            # The directory itself went away
+            with self._lock:
+                self._by_wd.pop(wd, None)
+                cached = self._dirs.get(dir_id)
+                if cached is not None:
+                    cached.wd = None
+        self.invalidate(dir_id)
+
+
+class ChunkCache:
+    """Memory-bounded LRU of decrypted content chunks shared by all open files.
+
+    Keys are (header nonce, chunk index); the header nonce is random per file,
+    so it identifies the file without tracking paths. Chunks can be decrypted
+    ahead of time on a small worker pool (see prefetch()).
+    """
+
+    def __init__(self, max_bytes=8 * 1024 * 1024, prefetch_workers=2, max_readahead=8):
+        self.max_bytes = max_bytes
+        self.max_readahead = max_readahead
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        self._chunks = OrderedDict()
+        self._pending = {}  # key -> (Future of a prefetch in progress, owner)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._prefetch_workers = prefetch_workers
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "chunks": len(self._chunks),
+            "bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def get(self, key, load):
+        """Return the cached chunk for key, or call load() and cache the result"""
+        with self._lock:
+            data = self._chunks.get(key)
+            if data is not None:
+                self._chunks.move_to_end(key)
+                self.hits += 1
+                return data
+            pending = self._pending.get(key)
+            if pending is None:
+                self.misses += 1
+        if pending is not None:
+            # Read-ahead is already decrypting this chunk
+            try:
+                data = pending[0].result()
+            except Exception:
+                data = None
+            with self._lock:
+                if data is not None:
+                    self.hits += 1
+                    return data
+                self.misses += 1
+        data = load()
+        self._store(key, data)
+        return data
+
+    def prefetch(self, loads, owner=None):
+        """Decrypt chunks in the background; loads is a list of (key, load).
+        Call cancel_prefetch(owner) before the loads become invalid."""
+        if self._prefetch_workers <= 0:
+            return
+        with self._lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(max_workers=self._prefetch_workers,
+                                                    thread_name_prefix="readahead")
+            for key, load in loads:
+                if key in self._chunks or key in self._pending:
+                    continue
+                self._pending[key] = (self._executor.submit(self._prefetch_one, key, load), owner)
+
+    def cancel_prefetch(self, owner):
+        """Drop queued prefetches of owner and wait for its running ones"""
+        from concurrent.futures import wait
+        running = []
+        with self._lock:
+            for key, (future, pending_owner) in list(self._pending.items()):
+                if pending_owner is not owner:
+                    continue
+                if future.cancel():
+                    del self._pending[key]
+                else:
+                    running.append(future)
+        if running:
+            wait(running, timeout=5)
+
+    def _prefetch_one(self, key, load):
+        try:
+            data = load()
+            self._store(key, data)
+            return data
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def _store(self, key, data):
+        if not data or len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._chunks.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._chunks[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._chunks.popitem(last=False)
+                self._size -= len(evicted)
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._chunks.clear()
+            self._size = 0
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class MasterKeyCache:
+    """Cache of unwrapped master keys for the time a vault is unlocked, so
+    restarting or retrying its mount skips scrypt.
+
+    Keys only live in memory and are forgotten when the vault is locked, so
+    a manual unlock after a lock derives them again. An entry is bound to the masterkey file it came
+    from (device, inode, size, mtime) and to a keyed hash of the password, so a
+    wrong password or a changed masterkey file still goes through scrypt.
+    forget() overwrites the cached key material; copies already handed to a
+    VaultReader or a mount process go away with it.
+    """
+    _instance = None
+
+    @classmethod
+    def get(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self._entries = {}  # vault path -> (file signature, password hash, enc_key, mac_key)
+        self._secret = os.urandom(32)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(masterkey_path):
+        st = os.stat(masterkey_path)
+        return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _password_hash(self, password):
+        import hmac
+        import hashlib
+        return hmac.new(self._secret, password.encode('utf-8'), hashlib.sha256).digest()
+
+    def lookup(self, vault_path, masterkey_path, password):
+        """Return (enc_key, mac_key) if cached for this password, else None"""
+        import hmac
+        try:
+            signature = self._signature(masterkey_path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(str(vault_path))
+            if entry is None or entry[0] != signature:
+                return None
+            if not hmac.compare_digest(entry[1], self._password_hash(password)):
+                return None
+            return bytes(entry[2]), bytes(entry[3])
+
+    def store(self, vault_path, masterkey_path, password, enc_key, mac_key):
+        try:
+            signature = self._signature(masterkey_path)
+        except OSError:
+            return
+        entry = (signature, self._password_hash(password), bytearray(enc_key), bytearray(mac_key))
+        with self._lock:
+            old = self._entries.pop(str(vault_path), None)
+            self._entries[str(vault_path)] = entry
+        if old is not None:
+            self._wipe(old)
+
+    def forget(self, vault_path):
+        with self._lock:
+            entry = self._entries.pop(str(vault_path), None)
+        if entry is not None:
+            self._wipe(entry)
+
+    def clear(self):
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            self._wipe(entry)
+
+    def __contains__(self, vault_path):
+        return str(vault_path) in self._entries
+
+    @staticmethod
+    def _wipe(entry):
+        for key in entry[2:]:
+            key[:] = bytes(len(key))
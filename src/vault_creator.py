@@ -34,16 +34,21 @@ class VaultCreator:
     SCRYPT_SALT_LENGTH = 8
     SCRYPT_COST_PARAM = 32768  # 2^15
     SCRYPT_BLOCK_SIZE = 8
+    SCRYPT_PARALLELIZATION = 1  # Fixed: masterkey files have no field for it
+    SCRYPT_MAX_MEMORY = 256 * 1024 * 1024  # Upper bound for recommended parameters
     KEY_LENGTH = 32  # 256 bits
     
     @staticmethod
-    def create_vault(vault_path: str, password: str) -> tuple[bool, str]:
+    def create_vault(vault_path: str, password: str, scrypt_cost: int = None,
+                     scrypt_block_size: int = None) -> tuple[bool, str]:
         """
         Create a new Cryptomator vault at the specified path.
         
         Args:
             vault_path: Path where the vault should be created
             password: Password to protect the vault
+            scrypt_cost: scrypt N (power of two), defaults to SCRYPT_COST_PARAM
+            scrypt_block_size: scrypt r, defaults to SCRYPT_BLOCK_SIZE
             
         Returns:
             Tuple of (success: bool, error_message: str)
@@ -51,6 +56,9 @@ class VaultCreator:
         import subprocess
         import tempfile
         
+        if scrypt_cost is not None and (scrypt_cost < 2 or scrypt_cost & (scrypt_cost - 1)):
+            return False, f"scrypt cost must be a power of two: {scrypt_cost}"
+        
         try:
             vault_path_obj = Path(vault_path)
             
@@ -73,7 +81,9 @@ class VaultCreator:
                 vault_path_obj,
                 enc_master_key,
                 mac_master_key,
-                password
+                password,
+                scrypt_cost,
+                scrypt_block_size
             )
             
             # 5. Create vault configuration file
@@ -106,8 +116,11 @@ class VaultCreator:
             return False, f"Failed to create vault: {str(e)}"
     
     @staticmethod
-    def _create_masterkey_file(vault_path: Path, enc_key: bytes, mac_key: bytes, password: str):
+    def _create_masterkey_file(vault_path: Path, enc_key: bytes, mac_key: bytes, password: str,
+                               cost: int = None, block_size: int = None):
         """Create and save the encrypted masterkey file"""
+        cost = cost or VaultCreator.SCRYPT_COST_PARAM
+        block_size = block_size or VaultCreator.SCRYPT_BLOCK_SIZE
         
         # Generate random salt
         salt = secrets.token_bytes(VaultCreator.SCRYPT_SALT_LENGTH)
@@ -115,7 +128,7 @@ class VaultCreator:
         # Derive KEK (Key Encryption Key) using scrypt
         # Note: Cryptomator uses a pepper, but for simplicity we'll use empty pepper
         pepper = b''
-        kek = VaultCreator._derive_kek(password, salt, pepper)
+        kek = VaultCreator._derive_kek(password, salt, pepper, cost, block_size)
         
         # Wrap (encrypt) the master keys using AES Key Wrap
         wrapped_enc_key = VaultCreator._aes_key_wrap(enc_key, kek)
@@ -129,8 +142,8 @@ class VaultCreator:
         masterkey_data = {
             "version": VaultCreator.VAULT_FORMAT,
             "scryptSalt": base64.b64encode(salt).decode('ascii'),
-            "scryptCostParam": VaultCreator.SCRYPT_COST_PARAM,
-            "scryptBlockSize": VaultCreator.SCRYPT_BLOCK_SIZE,
+            "scryptCostParam": cost,
+            "scryptBlockSize": block_size,
             "primaryMasterKey": base64.b64encode(wrapped_enc_key).decode('ascii'),
             "hmacMasterKey": base64.b64encode(wrapped_mac_key).decode('ascii'),
             "versionMac": base64.b64encode(version_mac).decode('ascii')
@@ -138,25 +151,165 @@ class VaultCreator:
         
         # Write to file
         masterkey_path = vault_path / VaultCreator.MASTERKEY_FILENAME
-        with open(masterkey_path, 'w') as f:
-            json.dump(masterkey_data, f, indent=2)
+        VaultCreator._write_atomic(masterkey_path, json.dumps(masterkey_data, indent=2))
+    
+    @staticmethod
+    def _write_atomic(path: Path, content: str):
+        """Write a file so that it is either complete or absent, even on power loss"""
+        temp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            with open(temp_path, 'w') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    
+    @staticmethod
+    def create_vaults(entries, workers: int = None, scrypt_cost: int = None,
+                      scrypt_block_size: int = None, on_result=None) -> list[dict]:
+        """
+        Create many vaults at once, deriving keys on every core.
+        
+        Args:
+            entries: Iterable of (vault_path, password) pairs
+            workers: Number of processes, defaults to the CPU count
+            scrypt_cost, scrypt_block_size: As for create_vault
+            on_result: Optional callback(result) called as each vault finishes
+            
+        Returns:
+            One dict per entry, in input order, with "path", "success",
+            "error" and "seconds"
+        """
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        
+        entries = list(entries)
+        results = [None] * len(entries)
+        workers = max(1, min(workers or os.cpu_count() or 1, len(entries) or 1))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_create_vault_job, str(path), password, scrypt_cost, scrypt_block_size): index
+                for index, (path, password) in enumerate(entries)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process itself failed
+                    result = {"path": str(entries[index][0]), "success": False,
+                              "error": str(e), "seconds": 0.0}
+                results[index] = result
+                if on_result is not None:
+                    on_result(result)
+        return results
+    
+    @staticmethod
+    def read_manifest(manifest_path: str) -> list[tuple[str, str]]:
+        """
+        Load (vault_path, password) pairs from a JSON manifest.
+        
+        The manifest is a list of objects with a "path" and one password
+        source: "password_file" (first line of the file), "password_env"
+        (environment variable) or "password". Relative paths are resolved
+        against the manifest's directory.
+        """
+        manifest_path = Path(manifest_path).absolute()
+        base = manifest_path.parent
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        if not isinstance(manifest, list):
+            raise ValueError("Manifest must be a list of vault entries")
+        
+        entries = []
+        for number, entry in enumerate(manifest, 1):
+            if not isinstance(entry, dict) or not entry.get("path"):
+                raise ValueError(f"Entry {number}: missing path")
+            if "password_file" in entry:
+                with open(base / Path(entry["password_file"]).expanduser(), 'r') as f:
+                    password = f.readline().rstrip("\n")
+            elif "password_env" in entry:
+                password = os.environ.get(entry["password_env"])
+                if password is None:
+                    raise ValueError(f"Entry {number}: ${entry['password_env']} is not set")
+            elif "password" in entry:
+                password = entry["password"]
+            else:
+                raise ValueError(f"Entry {number}: no password source")
+            if not password:
+                raise ValueError(f"Entry {number}: empty password")
+            entries.append((str(base / Path(entry["path"]).expanduser()), password))
+        return entries
     
     @staticmethod
-    def _derive_kek(password: str, salt: bytes, pepper: bytes) -> bytes:
+    def _derive_kek(password: str, salt: bytes, pepper: bytes, cost: int = None,
+                    block_size: int = None) -> bytes:
         """Derive Key Encryption Key using scrypt"""
         salt_and_pepper = salt + pepper
         
         kdf = Scrypt(
             salt=salt_and_pepper,
             length=VaultCreator.KEY_LENGTH,
-            n=VaultCreator.SCRYPT_COST_PARAM,
-            r=VaultCreator.SCRYPT_BLOCK_SIZE,
-            p=1,
+            n=cost or VaultCreator.SCRYPT_COST_PARAM,
+            r=block_size or VaultCreator.SCRYPT_BLOCK_SIZE,
+            p=VaultCreator.SCRYPT_PARALLELIZATION,
             backend=default_backend()
         )
         
         return kdf.derive(password.encode('utf-8'))
     
+    @staticmethod
+    def benchmark_scrypt(target_ms: float = 1000, block_size: int = None, rounds: int = 3) -> dict:
+        """
+        Time scrypt on this machine and recommend a cost parameter.
+        
+        Doubles N from 2^14 until one derivation exceeds target_ms or the
+        memory use (128 * N * r bytes) exceeds SCRYPT_MAX_MEMORY. The
+        recommendation is the largest N within the target, but never below
+        the Cryptomator default of SCRYPT_COST_PARAM.
+        
+        Returns:
+            Dict with "timings" (list of {cost, block_size, memory, ms}),
+            "recommended_cost", "block_size" and "target_ms"
+        """
+        import time
+        
+        block_size = block_size or VaultCreator.SCRYPT_BLOCK_SIZE
+        salt = secrets.token_bytes(VaultCreator.SCRYPT_SALT_LENGTH)
+        timings = []
+        recommended = VaultCreator.SCRYPT_COST_PARAM
+        cost = 2 ** 14
+        while 128 * cost * block_size <= VaultCreator.SCRYPT_MAX_MEMORY:
+            samples = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                VaultCreator._derive_kek("benchmark", salt, b'', cost, block_size)
+                samples.append((time.perf_counter() - start) * 1000)
+            ms = min(samples)
+            timings.append({"cost": cost, "block_size": block_size,
+                            "memory": 128 * cost * block_size, "ms": round(ms, 1)})
+            if ms > target_ms:
+                break
+            recommended = max(recommended, cost)
+            cost *= 2
+        
+        return {
+            "timings": timings,
+            "recommended_cost": recommended,
+            "block_size": block_size,
+            "target_ms": target_ms,
+        }
+    
     @staticmethod
     def _aes_key_wrap(plaintext_key: bytes, kek: bytes) -> bytes:
         """
@@ -203,8 +356,7 @@ class VaultCreator:
         
         # Write to file
         config_path = vault_path / VaultCreator.VAULT_CONFIG_FILENAME
-        with open(config_path, 'w') as f:
-            f.write(token)
+        VaultCreator._write_atomic(config_path, token)
     
     @staticmethod
     def _create_encrypted_root(d_path: Path, enc_master_key: bytes, mac_master_key: bytes):
@@ -307,3 +459,109 @@ Created: """ + datetime.now().strftime("%Y-%m-%d %H:%M:%S") + r"""\
         readme_path = vault_path / "IMPORTANT.rtf"
         with open(readme_path, 'w') as f:
             f.write(readme_content)
+
+
+def _create_vault_job(vault_path, password, scrypt_cost, scrypt_block_size):
+    """Process pool entry point for VaultCreator.create_vaults"""
+    import time
+    
+    start = time.perf_counter()
+    success, error = VaultCreator.create_vault(vault_path, password, scrypt_cost, scrypt_block_size)
+    return {"path": vault_path, "success": success, "error": error,
+            "seconds": round(time.perf_counter() - start, 3)}
+
+
+def main(argv=None):
+    import argparse
+    import sys
+    import time
+    
+    parser = argparse.ArgumentParser(description="Cryptomator vault creation tools")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--benchmark", action="store_true",
+                      help="Time scrypt and recommend a cost parameter")
+    mode.add_argument("--manifest", metavar="FILE",
+                      help="Create every vault listed in a JSON manifest")
+    parser.add_argument("--target-ms", type=float, default=1000,
+                        help="Acceptable key derivation time per unlock")
+    parser.add_argument("--block-size", type=int, default=VaultCreator.SCRYPT_BLOCK_SIZE)
+    parser.add_argument("--scrypt-cost", type=int, default=None,
+                        help="scrypt N for created vaults")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Vaults created in parallel (default: CPU count)")
+    parser.add_argument("--add", action="store_true",
+                        help="Add the created vaults to Locker's vault list")
+    parser.add_argument("--save-passwords", action="store_true",
+                        help="Store the created vaults' passwords in the keyring")
+    args = parser.parse_args(argv)
+    
+    if args.benchmark:
+        result = VaultCreator.benchmark_scrypt(args.target_ms, args.block_size)
+        for timing in result["timings"]:
+            print(f"N=2^{timing['cost'].bit_length() - 1:<3} r={timing['block_size']} "
+                  f"{timing['memory'] // (1024 * 1024):>4} MiB  {timing['ms']:8.1f} ms")
+        print(f"Recommended for {args.target_ms:.0f} ms: N={result['recommended_cost']} r={result['block_size']}")
+        return 0
+    
+    try:
+        entries = VaultCreator.read_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"Invalid manifest: {e}", file=sys.stderr, flush=True)
+        return 1
+    
+    def report(result):
+        status = "ok" if result["success"] else f"FAILED: {result['error']}"
+        print(f"{result['seconds']:7.2f}s  {result['path']}  {status}", flush=True)
+    
+    start = time.perf_counter()
+    results = VaultCreator.create_vaults(entries, args.workers, args.scrypt_cost,
+                                         args.block_size, on_result=report)
+    failed = sum(1 for result in results if not result["success"])
+    print(f"Created {len(results) - failed} of {len(results)} vaults in "
+          f"{time.perf_counter() - start:.2f}s", flush=True)
+    
+    created = [entry for entry, result in zip(entries, results) if result["success"]]
+    if args.add and created:
+        _add_to_vault_list([path for path, _ in created])
+    if args.save_passwords and created:
+        failed += _save_passwords(dict(created))
+    return 1 if failed else 0
+
+
+def _add_to_vault_list(vault_paths):
+    from vault import Vault
+    from vault_store import VaultStore
+    
+    store = VaultStore()
+    known = {vault.path for vault in store.load()}
+    for path in vault_paths:
+        if path not in known:
+            store.put(Vault(name=os.path.basename(path), path=path))
+    store.flush()
+    print(f"Added {len(set(vault_paths) - known)} vaults to the vault list", flush=True)
+
+
+def _save_passwords(passwords):
+    """Store the passwords in one keyring session; returns how many failed"""
+    import sys
+    try:
+        import keyring_helper
+        keyring_helper.wait(keyring_helper.save_passwords(passwords), timeout=120)
+    except (ImportError, ValueError) as e:
+        print(f"Keyring unavailable: {e}", file=sys.stderr, flush=True)
+        return len(passwords)
+    except keyring_helper.KeyringError as e:
+        for path, error in e.errors.items():
+            print(f"Could not save the password for {path}: {error}", file=sys.stderr, flush=True)
+        print(f"Saved {len(passwords) - len(e.errors)} of {len(passwords)} passwords", flush=True)
+        return len(e.errors)
+    except TimeoutError:
+        print("Timed out saving passwords to the keyring", file=sys.stderr, flush=True)
+        return len(passwords)
+    print(f"Saved {len(passwords)} passwords to the keyring", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
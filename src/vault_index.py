@@ -0,0 +1,162 @@
+"""
+In-memory search index over the vault list.
+
+Each vault is indexed by name, path and mount path through a trigram index,
+and by status. A query is a list of words that must all match: plain words
+match anywhere in those fields, `is:<status>` matches a status by prefix
+(`is:un` finds unlocked vaults). Words of three or more characters are
+looked up through their trigrams, shorter ones are checked against the
+candidates left by the others.
+
+Updates are incremental: add, update and remove touch only the trigrams of
+the vault that changed. Typing further into a query narrows the previous
+result instead of searching again.
+"""
+
+from collections import defaultdict
+
+STATUS_PREFIX = "is:"
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class VaultIndex:
+    """Search index keyed by vault path"""
+
+    def __init__(self):
+        self._text = {} # path -> lowercased searchable text
+        self._status = {} # path -> status name
+        self._grams = defaultdict(set) # trigram -> paths
+        self._by_status = defaultdict(set) # status name -> paths
+        self._last_query = None
+        self._last_result = None
+
+    def __len__(self):
+        return len(self._text)
+
+    def __contains__(self, path):
+        return path in self._text
+
+    @staticmethod
+    def _document(vault):
+        fields = (vault.name, vault.path, vault.mount_path or "")
+        return "\n".join(fields).lower(), vault.status.name.lower()
+
+    def add(self, vault):
+        """Index a vault, or re-index it if it is already known"""
+        text, status = self._document(vault)
+        old_text = self._text.get(vault.path)
+        if old_text == text and self._status.get(vault.path) == status:
+            return False
+        old_grams = _trigrams(old_text) if old_text is not None else set()
+        new_grams = _trigrams(text)
+        for gram in old_grams - new_grams:
+            paths = self._grams[gram]
+            paths.discard(vault.path)
+            if not paths:
+                del self._grams[gram]
+        for gram in new_grams - old_grams:
+            self._grams[gram].add(vault.path)
+        old_status = self._status.get(vault.path)
+        if old_status is not None:
+            self._by_status[old_status].discard(vault.path)
+        self._by_status[status].add(vault.path)
+        self._text[vault.path] = text
+        self._status[vault.path] = status
+        self._last_query = None
+        return True
+
+    update = add
+
+    def remove(self, path):
+        text = self._text.pop(path, None)
+        if text is None:
+            return False
+        self._by_status[self._status.pop(path)].discard(path)
+        for gram in _trigrams(text):
+            paths = self._grams[gram]
+            paths.discard(path)
+            if not paths:
+                del self._grams[gram]
+        self._last_query = None
+        return True
+
+    @staticmethod
+    def parse(query):
+        """Split a query into (words, status prefixes)"""
+        words = []
+        statuses = []
+        for word in query.lower().split():
+            if word.startswith(STATUS_PREFIX):
+                statuses.append(word[len(STATUS_PREFIX):])
+            else:
+                words.append(word)
+        return words, statuses
+
+    def matches(self, path, query):
+        """Whether one indexed vault matches a query"""
+        words, statuses = self.parse(query)
+        return self._matches(path, words, statuses)
+
+    def _matches(self, path, words, statuses):
+        text = self._text.get(path)
+        if text is None:
+            return False
+        status = self._status[path]
+        return (all(status.startswith(prefix) for prefix in statuses)
+                and all(word in text for word in words))
+
+    def search(self, query):
+        """Return the set of matching vault paths, or None for an empty query"""
+        if not query.strip():
+            return None
+        words, statuses = self.parse(query)
+
+        if self._last_query is not None and self.refines(self._last_query, query):
+            candidates = [self._last_result]
+        else:
+            candidates = []
+        for prefix in statuses:
+            candidates.append(set().union(*(paths for status, paths in self._by_status.items()
+                                            if status.startswith(prefix))))
+        for word in words:
+            for gram in _trigrams(word):
+                candidates.append(self._grams.get(gram, ()))
+
+        if candidates:
+            # Intersect smallest first; the sets stay owned by the index
+            candidates.sort(key=len)
+            result = set(candidates[0])
+            for paths in candidates[1:]:
+                if not result:
+                    break
+                result.intersection_update(paths)
+        else:
+            result = set(self._text)
+
+        # Trigrams are exact for three letter words; anything else is verified
+        text = self._text
+        for word in words:
+            if len(word) != 3 and result:
+                result = {path for path in result if word in text[path]}
+
+        self._last_query = query
+        self._last_result = result
+        return set(result)
+
+    @staticmethod
+    def refines(old_query, new_query):
+        """Whether new_query can only match a subset of what old_query matched,
+        as when typing on: every old word grows or stays, and words are added"""
+        old_words = old_query.lower().split()
+        new_words = new_query.lower().split()
+        if not old_words or len(new_words) < len(old_words):
+            return False
+        for old, new in zip(old_words, new_words):
+            if not new.startswith(old):
+                return False
+            if old.startswith(STATUS_PREFIX) != new.startswith(STATUS_PREFIX):
+                return False
+        return True
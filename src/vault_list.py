@@ -0,0 +1,150 @@
+"""
+Model behind the vault list.
+
+Vaults live in a Gio.ListStore as VaultItem objects and are rendered by a
+Gtk.ListView, which only creates rows for what is on screen and recycles
+them while scrolling. A dict keyed by vault path gives constant time lookup,
+and a Gtk.FilterListModel narrows the visible list without touching the
+store. Searching goes through a VaultIndex kept in step with the store.
+"""
+
+import gi
+gi.require_version('Gtk', '4.0')
+from gi.repository import Gtk, Gio, GObject
+
+from vault import Vault, VaultStatus
+from vault_index import VaultIndex
+
+
+class VaultItem(GObject.Object):
+    """A Vault in the list store.
+
+    Rows are recycled, so anything a row shows lives here rather than on the
+    row: call notify_changed() after changing the vault and whichever row is
+    bound to this item redraws.
+    """
+    __gtype_name__ = 'VaultItem'
+    __gsignals__ = {
+        'changed': (GObject.SignalFlags.RUN_FIRST, None, ()),
+    }
+
+    def __init__(self, vault: Vault):
+        super().__init__()
+        self.vault = vault
+        self.busy = None # Tooltip while an unlock is in progress, else None
+
+    def notify_changed(self):
+        self.emit('changed')
+
+    def set_busy(self, message):
+        self.busy = message
+        self.notify_changed()
+
+    def set_automount_state(self, state, mount_path=None):
+        """Reflect progress reported by the auto-mounter"""
+        if state == "unlocking":
+            self.set_busy("Unlocking...")
+            return
+        self.busy = None
+        if state == "unlocked":
+            self.vault.status = VaultStatus.UNLOCKED
+            self.vault.mount_path = mount_path
+        self.notify_changed()
+
+
+class VaultListModel:
+    """The vault list: a Gio.ListStore plus an index by path and a filter"""
+
+    def __init__(self):
+        self.store = Gio.ListStore(item_type=VaultItem)
+        self._by_path = {}
+        self.index = VaultIndex()
+        self._query = ""
+        self._results = None # Paths matching the query, None when not searching
+        self.filter = Gtk.CustomFilter.new(self._filter_func)
+        self.filtered = Gtk.FilterListModel(model=self.store, filter=self.filter)
+
+    def __len__(self):
+        return self.store.get_n_items()
+
+    def __iter__(self):
+        """Iterate over the items in list order"""
+        for i in range(self.store.get_n_items()):
+            yield self.store.get_item(i)
+
+    def __contains__(self, path):
+        return path in self._by_path
+
+    def vaults(self):
+        return [item.vault for item in self]
+
+    def get(self, path):
+        """Return the VaultItem for a vault path, or None"""
+        return self._by_path.get(path)
+
+    def append(self, vault):
+        """Add one vault; returns its item (the existing one if already listed)"""
+        self.extend([vault])
+        return self._by_path[vault.path]
+
+    def extend(self, vaults):
+        """Add vaults with a single items-changed emission"""
+        items = []
+        for vault in vaults:
+            if vault.path in self._by_path:
+                continue
+            item = VaultItem(vault)
+            item.connect("changed", self._on_item_changed)
+            self._by_path[vault.path] = item
+            self.index.add(vault)
+            items.append(item)
+        if items:
+            self.store.splice(self.store.get_n_items(), 0, items)
+        return items
+
+    def remove(self, path):
+        """Remove a vault by path; returns its item, or None if not listed"""
+        item = self._by_path.pop(path, None)
+        if item is None:
+            return None
+        self.index.remove(path)
+        if self._results is not None:
+            self._results.discard(path)
+        found, position = self.store.find(item)
+        if found:
+            self.store.remove(position)
+        return item
+
+    def search(self, query):
+        """Show only vaults matching a search query; an empty query shows all"""
+        old_query, self._query = self._query, query
+        self._results = self.index.search(query)
+        if self._results is None:
+            change = Gtk.FilterChange.LESS_STRICT
+        elif VaultIndex.refines(old_query, query):
+            # Only rows still shown need another look
+            change = Gtk.FilterChange.MORE_STRICT
+        elif VaultIndex.refines(query, old_query):
+            change = Gtk.FilterChange.LESS_STRICT
+        else:
+            change = Gtk.FilterChange.DIFFERENT
+        self.filter.changed(change)
+
+    def _on_item_changed(self, item):
+        vault = item.vault
+        if not self.index.update(vault) or self._results is None:
+            return
+        # Re-filter just this vault if a rename or status change flipped it
+        matches = self.index.matches(vault.path, self._query)
+        if matches == (vault.path in self._results):
+            return
+        if matches:
+            self._results.add(vault.path)
+        else:
+            self._results.discard(vault.path)
+        found, position = self.store.find(item)
+        if found:
+            self.store.items_changed(position, 1, 1)
+
+    def _filter_func(self, item):
+        return self._results is None or item.vault.path in self._results
@@ -0,0 +1,258 @@
+"""
+Parallel chunk encryption and decryption for large files in a vault.
+
+Every 32 KiB chunk of a .c9r file has its own nonce and is bound to its
+position through the AAD, so chunks are encrypted or decrypted on a thread
+pool (the cryptography library releases the GIL) and written back in order.
+At most `max_in_flight` chunks are buffered at any time.
+
+    python3 vault_pipeline.py export [--workers N] VAULT /path/in/vault DEST
+    python3 vault_pipeline.py import [--workers N] VAULT SOURCE /path/in/vault
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from vault_reader import VaultReader, VaultError, DecryptingReader
+
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:
+    print("Warning: cryptography libraries not available. Native vault access disabled.")
+
+DEFAULT_WORKERS = os.cpu_count() or 4
+IN_FLIGHT_PER_WORKER = 4
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class ChunkPipeline:
+    """Thread pool that processes chunks concurrently and returns them in order"""
+
+    def __init__(self, workers=None, max_in_flight=None):
+        self.workers = max(1, workers or DEFAULT_WORKERS)
+        self.max_in_flight = max_in_flight or self.workers * IN_FLIGHT_PER_WORKER
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="chunk")
+
+    def submit(self, func, *args):
+        return self._executor.submit(func, *args)
+
+    def map(self, func, items):
+        """Like map(), but runs func on the pool with bounded read-ahead"""
+        pending = deque()
+        try:
+            for item in items:
+                if len(pending) >= self.max_in_flight:
+                    yield pending.popleft().result()
+                pending.append(self._executor.submit(func, item))
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # The consumer stopped early or a chunk failed
+            for future in pending:
+                future.cancel()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PipelinedReader(io.RawIOBase):
+    """Sequential file object over a .c9r file that decrypts ahead in parallel"""
+
+    def __init__(self, vault: VaultReader, ciphertext_path, pipeline: ChunkPipeline):
+        super().__init__()
+        self._source = DecryptingReader(vault, ciphertext_path)
+        self.size = self._source.size
+        self._chunks = pipeline.map(self._source.decrypt_chunk_at,
+                                    range(vault.chunk_count(self.size)))
+        self._buffer = b""
+        self._buffer_pos = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.size
+        out = bytearray()
+        while len(out) < size:
+            if self._buffer_pos >= len(self._buffer):
+                self._buffer = next(self._chunks, b"")
+                self._buffer_pos = 0
+                if not self._buffer:
+                    break
+            take = self._buffer[self._buffer_pos:self._buffer_pos + size - len(out)]
+            self._buffer_pos += len(take)
+            out += take
+        return bytes(out)
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._chunks.close()
+            self._source.close()
+        super().close()
+
+
+class EncryptingWriter(io.RawIOBase):
+    """Write-only file object producing a new .c9r file, encrypting in parallel"""
+
+    def __init__(self, vault: VaultReader, ciphertext_path, pipeline: ChunkPipeline):
+        super().__init__()
+        self.vault = vault
+        self._pipeline = pipeline
+        self.header_nonce = os.urandom(vault.HEADER_NONCE_SIZE)
+        content_key = os.urandom(32)
+        self._gcm = AESGCM(content_key)
+        self._file = open(ciphertext_path, 'wb')
+        self._file.write(vault.encrypt_header(self.header_nonce, content_key))
+        self._buffer = bytearray()
+        self._pending = deque()
+        self._chunk_index = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        chunk_size = self.vault.CLEARTEXT_CHUNK_SIZE
+        while len(self._buffer) >= chunk_size:
+            self._submit(bytes(self._buffer[:chunk_size]))
+            del self._buffer[:chunk_size]
+        return len(data)
+
+    def _submit(self, cleartext):
+        while len(self._pending) >= self._pipeline.max_in_flight:
+            self._file.write(self._pending.popleft().result())
+        self._pending.append(self._pipeline.submit(
+            self.vault.encrypt_chunk, cleartext, self._chunk_index, self.header_nonce, self._gcm))
+        self._chunk_index += 1
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._file.write(self._pending.popleft().result())
+        finally:
+            for future in self._pending:
+                future.cancel()
+            self._file.close()
+            super().close()
+
+
+def export_file(vault: VaultReader, cleartext_path, destination, workers=None):
+    """Decrypt a file from the vault to destination; returns the byte count"""
+    node = vault.resolve(cleartext_path)
+    if node.kind != "file":
+        raise IsADirectoryError(cleartext_path)
+    with ChunkPipeline(workers) as pipeline:
+        with PipelinedReader(vault, node.path, pipeline) as source, open(destination, 'wb') as out:
+            shutil.copyfileobj(source, out, COPY_BUFFER_SIZE)
+            return source.size
+
+
+def import_file(vault: VaultReader, source, cleartext_path, workers=None):
+    """Encrypt source into the vault at cleartext_path, replacing an existing file.
+    The parent directory must already exist. Returns the byte count."""
+    parent_path, _, name = cleartext_path.rstrip("/").rpartition("/")
+    if not name:
+        raise ValueError(f"Invalid file name: {cleartext_path}")
+    parent = vault.resolve(parent_path)
+    if parent.kind != "dir":
+        raise NotADirectoryError(parent_path)
+    try:
+        if vault.lookup(parent.dir_id, name).kind != "file":
+            raise IsADirectoryError(cleartext_path)
+    except FileNotFoundError:
+        pass
+
+    node_path = vault.dir_path(parent.dir_id) / vault.node_name(name, parent.dir_id)
+    if node_path.name.endswith(".c9s"):
+        # Long names keep the full encrypted name next to the contents
+        node_path.mkdir(exist_ok=True)
+        (node_path / "name.c9s").write_text(vault.encrypt_name(name, parent.dir_id))
+        target = node_path / "contents.c9r"
+    else:
+        target = node_path
+    # Write under a name the vault ignores, then move it into place
+    temp_path = target.with_name(f".{target.name}.tmp")
+
+    try:
+        with ChunkPipeline(workers) as pipeline:
+            with open(source, 'rb') as src, EncryptingWriter(vault, temp_path, pipeline) as out:
+                size = os.fstat(src.fileno()).st_size
+                shutil.copyfileobj(src, out, COPY_BUFFER_SIZE)
+        os.replace(temp_path, target)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+    if vault.cache is not None:
+        vault.cache.invalidate(parent.dir_id)
+    return size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Copy large files into or out of a vault")
+    # Given after the command, as in "export --workers 8 ..."
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Chunks encrypted or decrypted in parallel")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", parents=[common], help="Decrypt a file out of the vault")
+    export_parser.add_argument("vault_path")
+    export_parser.add_argument("cleartext_path")
+    export_parser.add_argument("destination")
+    import_parser = commands.add_parser("import", parents=[common], help="Encrypt a file into the vault")
+    import_parser.add_argument("vault_path")
+    import_parser.add_argument("source")
+    import_parser.add_argument("cleartext_path")
+    args = parser.parse_args(argv)
+
+    password = sys.stdin.readline().rstrip("\n")
+    try:
+        vault = VaultReader.unlock(args.vault_path, password)
+    except VaultError as e:
+        print(f"Unlock failed: {e}", file=sys.stderr, flush=True)
+        return 1
+    del password
+
+    start = time.monotonic()
+    try:
+        if args.command == "export":
+            size = export_file(vault, args.cleartext_path, args.destination, args.workers)
+        else:
+            size = import_file(vault, args.source, args.cleartext_path, args.workers)
+    except (OSError, ValueError, VaultError) as e:
+        print(f"{args.command.capitalize()} failed: {e}", file=sys.stderr, flush=True)
+        return 1
+    elapsed = time.monotonic() - start
+    rate = size / (1024 * 1024) / elapsed if elapsed > 0 else 0
+    print(f"{args.command.capitalize()}ed {size} bytes in {elapsed:.2f}s ({rate:.1f} MiB/s)", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
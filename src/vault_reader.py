@@ -0,0 +1,451 @@
+"""
+Native Cryptomator vault format 8 reader.
+Unlocks a vault and decrypts directory listings and file contents in-process,
+without starting cryptomator-cli. Counterpart to vault_creator.
+"""
+
+import io
+import os
+import json
+import hmac
+import base64
+import hashlib
+import threading
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    from cryptography.hazmat.primitives.keywrap import aes_key_unwrap, InvalidUnwrap
+    from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+    from cryptography.hazmat.backends import default_backend
+    import jwt
+    from miscreant.aes.siv import SIV
+    from miscreant.exceptions import IntegrityError
+except ImportError:
+    print("Warning: cryptography libraries not available. Native vault access disabled.")
+
+
+class VaultError(Exception):
+    """The vault is damaged, unsupported or could not be decrypted"""
+
+
+class InvalidPasswordError(VaultError):
+    pass
+
+
+@dataclass
+class Node:
+    """A cleartext directory entry and where its ciphertext lives"""
+    name: str
+    kind: str  # "file", "dir" or "symlink"
+    path: Path  # Ciphertext file for files/symlinks, node directory for dirs
+    dir_id: str = None  # Only set for directories
+
+
+class VaultReader:
+    """Read access to an unlocked Cryptomator vault"""
+
+    VAULT_FORMAT = 8
+    CIPHER_COMBO = "SIV_GCM"
+    MASTERKEY_FILENAME = "masterkey.cryptomator"
+    VAULT_CONFIG_FILENAME = "vault.cryptomator"
+    ROOT_DIR_ID = ""
+    # Bookkeeping files that live next to the encrypted nodes
+    METADATA_FILENAMES = ("dirid.c9r", "dir.c9r")
+
+    # File content layout: header, then fixed-size AES-GCM chunks
+    HEADER_NONCE_SIZE = 12
+    HEADER_SIZE = 68  # nonce + 40 byte payload + 16 byte tag
+    CHUNK_NONCE_SIZE = 12
+    TAG_SIZE = 16
+    CLEARTEXT_CHUNK_SIZE = 32 * 1024
+    CIPHERTEXT_CHUNK_SIZE = CHUNK_NONCE_SIZE + CLEARTEXT_CHUNK_SIZE + TAG_SIZE
+
+    def __init__(self, vault_path, enc_key: bytes, mac_key: bytes, config: dict = None, cache=None,
+                 chunk_cache=None):
+        self.vault_path = Path(vault_path)
+        self.data_path = self.vault_path / "d"
+        self.enc_key = enc_key
+        self.mac_key = mac_key
+        self.config = config or {}
+        # Optional vault_cache.DirectoryCache for decrypted directories
+        self.cache = cache
+        # Optional vault_cache.ChunkCache for decrypted file content
+        self.chunk_cache = chunk_cache
+        # Miscreant SIV expects: key = mac_key || enc_key (concatenated)
+        self._siv = SIV(mac_key + enc_key)
+        self._header_gcm = AESGCM(enc_key)
+
+    @classmethod
+    def unlock(cls, vault_path, password: str = None, cache=None, chunk_cache=None,
+               key_cache=None, keys=None) -> "VaultReader":
+        """Unwrap the masterkey with the password and verify the vault config.
+        With a vault_cache.MasterKeyCache holding the keys, scrypt is skipped; with
+        keys=(enc_key, mac_key) already unwrapped, no password is needed."""
+        vault_path = Path(vault_path)
+        if keys is None:
+            keys = cls.derive_keys(vault_path, password, key_cache)
+        enc_key, mac_key = keys
+        config = cls.verify_config(vault_path / cls.VAULT_CONFIG_FILENAME, enc_key, mac_key)
+        return cls(vault_path, enc_key, mac_key, config, cache, chunk_cache)
+
+    @classmethod
+    def derive_keys(cls, vault_path, password: str, key_cache=None) -> tuple[bytes, bytes]:
+        """Return (enc_key, mac_key) for the password, from key_cache if it
+        holds them, else by unwrapping the masterkey (scrypt)"""
+        vault_path = Path(vault_path)
+        masterkey_path = vault_path / cls.MASTERKEY_FILENAME
+        keys = key_cache.lookup(vault_path, masterkey_path, password) if key_cache is not None else None
+        if keys is None:
+            keys = cls.unwrap_masterkey(masterkey_path, password)
+            if key_cache is not None:
+                key_cache.store(vault_path, masterkey_path, password, *keys)
+        return keys
+
+    @staticmethod
+    def unwrap_masterkey(masterkey_path, password: str) -> tuple[bytes, bytes]:
+        """Return (enc_key, mac_key) from a masterkey.cryptomator file"""
+        try:
+            with open(masterkey_path, 'r') as f:
+                data = json.load(f)
+            salt = base64.b64decode(data["scryptSalt"])
+            wrapped_enc_key = base64.b64decode(data["primaryMasterKey"])
+            wrapped_mac_key = base64.b64decode(data["hmacMasterKey"])
+            cost = int(data["scryptCostParam"])
+            block_size = int(data["scryptBlockSize"])
+        except (OSError, ValueError, KeyError) as e:
+            raise VaultError(f"Cannot read masterkey file: {e}")
+
+        kdf = Scrypt(salt=salt, length=32, n=cost, r=block_size, p=1, backend=default_backend())
+        kek = kdf.derive(password.encode('utf-8'))
+        try:
+            enc_key = aes_key_unwrap(kek, wrapped_enc_key, default_backend())
+            mac_key = aes_key_unwrap(kek, wrapped_mac_key, default_backend())
+        except InvalidUnwrap:
+            raise InvalidPasswordError("Invalid password")
+
+        if "versionMac" in data:
+            version_bytes = int(data["version"]).to_bytes(4, byteorder='big')
+            expected = hmac.new(mac_key, version_bytes, hashlib.sha256).digest()
+            if not hmac.compare_digest(expected, base64.b64decode(data["versionMac"])):
+                raise VaultError("Masterkey version MAC mismatch")
+        return enc_key, mac_key
+
+    @classmethod
+    def verify_config(cls, config_path, enc_key: bytes, mac_key: bytes) -> dict:
+        """Check the vault.cryptomator JWT signature and supported format"""
+        try:
+            token = Path(config_path).read_text().strip()
+            header = jwt.get_unverified_header(token)
+            payload = jwt.decode(token, enc_key + mac_key, algorithms=["HS256", "HS384", "HS512"])
+        except OSError as e:
+            raise VaultError(f"Cannot read vault config: {e}")
+        except jwt.InvalidTokenError as e:
+            raise VaultError(f"Invalid vault config: {e}")
+
+        if not header.get("kid", "").startswith("masterkeyfile:"):
+            raise VaultError(f"Unsupported key loader: {header.get('kid')}")
+        if payload.get("format") != cls.VAULT_FORMAT:
+            raise VaultError(f"Unsupported vault format: {payload.get('format')}")
+        if payload.get("cipherCombo") != cls.CIPHER_COMBO:
+            raise VaultError(f"Unsupported cipher combo: {payload.get('cipherCombo')}")
+        return payload
+
+    # Directories
+
+    def hash_dir_id(self, dir_id: str) -> str:
+        """BASE32(SHA1(SIV-ENCRYPT(directoryId)))"""
+        encrypted_dir_id = self._siv.seal(dir_id.encode('utf-8'))
+        dir_hash_bytes = hashlib.sha1(encrypted_dir_id).digest()
+        return base64.b32encode(dir_hash_bytes).decode('ascii').rstrip('=')
+
+    def dir_path(self, dir_id: str) -> Path:
+        """Ciphertext directory holding the children of dir_id: d/XX/REMAINDER"""
+        if self.cache is not None:
+            path = self.cache.dir_path(dir_id)
+            if path is not None:
+                return path
+        dir_hash = self.hash_dir_id(dir_id)
+        path = self.data_path / dir_hash[:2] / dir_hash[2:]
+        if self.cache is not None:
+            self.cache.add_dir(dir_id, path)
+        return path
+
+    def encrypt_name(self, name: str, dir_id: str) -> str:
+        cleartext = unicodedata.normalize('NFC', name).encode('utf-8')
+        ciphertext = self._siv.seal(cleartext, [dir_id.encode('utf-8')])
+        return base64.urlsafe_b64encode(ciphertext).decode('ascii') + ".c9r"
+
+    def decrypt_name(self, encrypted_name: str, dir_id: str) -> str:
+        if encrypted_name.endswith(".c9r"):
+            encrypted_name = encrypted_name[:-4]
+        try:
+            ciphertext = base64.urlsafe_b64decode(encrypted_name)
+            cleartext = self._siv.open(ciphertext, [dir_id.encode('utf-8')])
+        except (ValueError, IntegrityError) as e:
+            raise VaultError(f"Cannot decrypt file name {encrypted_name}: {e}")
+        return cleartext.decode('utf-8')
+
+    def list_dir(self, dir_id: str = ROOT_DIR_ID) -> list[Node]:
+        """Decrypt the entries of a directory; undecryptable entries are skipped"""
+        if self.cache is not None:
+            nodes = self.cache.listing(dir_id)
+            if nodes is not None:
+                return nodes
+
+        try:
+            entries = list(os.scandir(self.dir_path(dir_id)))
+        except OSError as e:
+            raise VaultError(f"Cannot list directory: {e}")
+
+        nodes = []
+        for entry in entries:
+            try:
+                node = self._load_node(Path(entry.path), dir_id)
+            except VaultError as e:
+                print(f"DEBUG: Skipping {entry.name}: {e}", flush=True)
+                continue
+            if node is not None:
+                nodes.append(node)
+        if self.cache is not None:
+            self.cache.set_listing(dir_id, nodes)
+        return nodes
+
+    def _load_node(self, node_path: Path, dir_id: str, name: str = None):
+        """Classify a ciphertext node; name is decrypted unless already known"""
+        if node_path.name in self.METADATA_FILENAMES:
+            return None
+        if node_path.name.endswith(".c9s") and node_path.is_dir():
+            # Shortened name: the full encrypted name is stored in name.c9s
+            if name is None:
+                try:
+                    encrypted_name = (node_path / "name.c9s").read_text().strip()
+                except OSError as e:
+                    raise VaultError(f"Missing name.c9s: {e}")
+                name = self.decrypt_name(encrypted_name, dir_id)
+            contents = node_path / "contents.c9r"
+        elif node_path.name.endswith(".c9r"):
+            if name is None:
+                name = self.decrypt_name(node_path.name, dir_id)
+            contents = node_path
+        else:
+            # Foreign files
+            return None
+
+        if (node_path / "dir.c9r").is_file():
+            return Node(name, "dir", node_path, self.read_dir_id(node_path))
+        if (node_path / "symlink.c9r").is_file():
+            return Node(name, "symlink", node_path / "symlink.c9r")
+        if contents.is_file():
+            return Node(name, "file", contents)
+        return None
+
+    @staticmethod
+    def read_dir_id(node_path: Path) -> str:
+        try:
+            return (Path(node_path) / "dir.c9r").read_bytes().decode('utf-8')
+        except (OSError, UnicodeDecodeError) as e:
+            raise VaultError(f"Cannot read directory ID: {e}")
+
+    def resolve(self, cleartext_path: str) -> Node:
+        """Walk a cleartext path like "/docs/a.txt" down from the root"""
+        node = Node("", "dir", self.dir_path(self.ROOT_DIR_ID), self.ROOT_DIR_ID)
+        for component in [c for c in cleartext_path.split("/") if c]:
+            if node.kind != "dir":
+                raise FileNotFoundError(cleartext_path)
+            node = self.lookup(node.dir_id, component)
+        return node
+
+    def lookup(self, dir_id: str, name: str) -> Node:
+        """Find one child by encrypting its name instead of listing the directory"""
+        if self.cache is not None:
+            node = self.cache.child(dir_id, name)
+            if node is not None:
+                return node
+
+        node_path = self.dir_path(dir_id) / self.node_name(name, dir_id)
+        node = self._load_node(node_path, dir_id, name) if os.path.lexists(node_path) else None
+        if node is None:
+            raise FileNotFoundError(name)
+        if self.cache is not None:
+            self.cache.add_child(dir_id, node)
+        return node
+
+    def node_name(self, name: str, dir_id: str) -> str:
+        """Ciphertext node name, shortened to a SHA1 based .c9s name if too long"""
+        encrypted_name = self.encrypt_name(name, dir_id)
+        if len(encrypted_name) <= self.config.get("shorteningThreshold", 220):
+            return encrypted_name
+        digest = hashlib.sha1(encrypted_name.encode('utf-8')).digest()
+        return base64.urlsafe_b64encode(digest).decode('ascii') + ".c9s"
+
+    # File contents
+
+    def decrypt_header(self, header: bytes) -> tuple[bytes, bytes]:
+        """Return (header_nonce, content_key) from a 68 byte file header"""
+        if len(header) != self.HEADER_SIZE:
+            raise VaultError("Truncated file header")
+        nonce = header[:self.HEADER_NONCE_SIZE]
+        try:
+            payload = self._header_gcm.decrypt(nonce, header[self.HEADER_NONCE_SIZE:], None)
+        except InvalidTag:
+            raise VaultError("File header authentication failed")
+        # 8 reserved bytes, then the 256 bit content key
+        return nonce, payload[8:40]
+
+    def decrypt_chunk(self, chunk: bytes, chunk_index: int, header_nonce: bytes, content_gcm) -> bytes:
+        """Decrypt one ciphertext chunk: nonce || ciphertext || tag"""
+        aad = chunk_index.to_bytes(8, byteorder='big') + header_nonce
+        try:
+            return content_gcm.decrypt(chunk[:self.CHUNK_NONCE_SIZE], chunk[self.CHUNK_NONCE_SIZE:], aad)
+        except InvalidTag:
+            raise VaultError(f"Chunk {chunk_index} authentication failed")
+
+    def encrypt_header(self, header_nonce: bytes, content_key: bytes) -> bytes:
+        """Build a 68 byte file header for a new file"""
+        payload = b"\xff" * 8 + content_key
+        return header_nonce + self._header_gcm.encrypt(header_nonce, payload, None)
+
+    def encrypt_chunk(self, cleartext: bytes, chunk_index: int, header_nonce: bytes, content_gcm) -> bytes:
+        """Encrypt one chunk of at most CLEARTEXT_CHUNK_SIZE bytes"""
+        nonce = os.urandom(self.CHUNK_NONCE_SIZE)
+        aad = chunk_index.to_bytes(8, byteorder='big') + header_nonce
+        return nonce + content_gcm.encrypt(nonce, cleartext, aad)
+
+    @classmethod
+    def chunk_count(cls, cleartext_size: int) -> int:
+        return -(-cleartext_size // cls.CLEARTEXT_CHUNK_SIZE)
+
+    @classmethod
+    def cleartext_size(cls, ciphertext_size: int) -> int:
+        payload = max(0, ciphertext_size - cls.HEADER_SIZE)
+        full_chunks, remainder = divmod(payload, cls.CIPHERTEXT_CHUNK_SIZE)
+        overhead = cls.CHUNK_NONCE_SIZE + cls.TAG_SIZE
+        return full_chunks * cls.CLEARTEXT_CHUNK_SIZE + max(0, remainder - overhead)
+
+    def open(self, cleartext_path: str) -> "DecryptingReader":
+        node = self.resolve(cleartext_path)
+        if node.kind != "file":
+            raise IsADirectoryError(cleartext_path)
+        return DecryptingReader(self, node.path)
+
+    def read_symlink(self, node: Node) -> str:
+        with DecryptingReader(self, node.path) as f:
+            return f.read().decode('utf-8')
+
+
+class DecryptingReader(io.RawIOBase):
+    """Seekable, read-only file object over a .c9r file; decrypts chunk by chunk"""
+
+    def __init__(self, vault: VaultReader, ciphertext_path):
+        super().__init__()
+        self.vault = vault
+        self._file = open(ciphertext_path, 'rb')
+        try:
+            self.header_nonce, content_key = vault.decrypt_header(self._file.read(vault.HEADER_SIZE))
+        except Exception:
+            self._file.close()
+            raise
+        self._gcm = AESGCM(content_key)
+        self.size = vault.cleartext_size(os.fstat(self._file.fileno()).st_size)
+        self._pos = 0
+        # Sequential access detection for read-ahead
+        self._read_ahead_lock = threading.Lock()
+        self._last_chunk = None
+        self._window = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError("negative seek position")
+        self._pos = offset
+        return self._pos
+
+    def read_chunk(self, chunk_index: int) -> bytes:
+        cache = self.vault.chunk_cache
+        if cache is None:
+            return self.decrypt_chunk_at(chunk_index)
+        return cache.get((self.header_nonce, chunk_index), lambda: self.decrypt_chunk_at(chunk_index))
+
+    def decrypt_chunk_at(self, chunk_index: int) -> bytes:
+        """Read and decrypt one chunk, bypassing the chunk cache"""
+        vault = self.vault
+        offset = vault.HEADER_SIZE + chunk_index * vault.CIPHERTEXT_CHUNK_SIZE
+        chunk = os.pread(self._file.fileno(), vault.CIPHERTEXT_CHUNK_SIZE, offset)
+        if not chunk:
+            return b""
+        return vault.decrypt_chunk(chunk, chunk_index, self.header_nonce, self._gcm)
+
+    def read_at(self, offset: int, size: int) -> bytes:
+        """Positional read that only decrypts the chunks overlapping the range.
+        Safe to call from several threads at once."""
+        size = min(size, self.size - offset)
+        if size <= 0:
+            return b""
+
+        chunk_size = self.vault.CLEARTEXT_CHUNK_SIZE
+        out = bytearray()
+        while len(out) < size:
+            chunk_index, chunk_offset = divmod(offset + len(out), chunk_size)
+            cleartext = self.read_chunk(chunk_index)
+            if not cleartext:
+                break
+            out += cleartext[chunk_offset:chunk_offset + size - len(out)]
+
+        if self.vault.chunk_cache is not None:
+            self._read_ahead(offset // chunk_size, (offset + len(out) - 1) // chunk_size)
+        return bytes(out)
+
+    def _read_ahead(self, first_chunk, last_chunk):
+        """Grow the read-ahead window while access is sequential, reset it otherwise"""
+        cache = self.vault.chunk_cache
+        with self._read_ahead_lock:
+            if self._last_chunk is not None and self._last_chunk <= first_chunk <= self._last_chunk + 1:
+                self._window = min(max(1, self._window * 2), cache.max_readahead)
+            else:
+                self._window = 0
+            self._last_chunk = last_chunk
+            window = self._window
+        if not window:
+            return
+
+        chunk_count = self.vault.chunk_count(self.size)
+        cache.prefetch([
+            ((self.header_nonce, index), lambda index=index: self.decrypt_chunk_at(index))
+            for index in range(last_chunk + 1, min(last_chunk + 1 + window, chunk_count))
+        ], owner=self)
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.size - self._pos
+        data = self.read_at(self._pos, size)
+        self._pos += len(data)
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            if self.vault.chunk_cache is not None:
+                # No read-ahead may touch the file (or a reused fd) after this
+                self.vault.chunk_cache.cancel_prefetch(self)
+            self._file.close()
+        super().close()
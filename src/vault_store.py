@@ -0,0 +1,285 @@
+"""
+Crash-safe storage for the vault list.
+
+vaults.json stays the snapshot (a JSON list, readable by older versions).
+Changes are appended to vaults.json.journal as one JSON line per vault, so
+renaming or removing one vault writes one line instead of the whole list.
+Writes are debounced and coalesced, and each batch is fsynced. Once the
+journal grows past COMPACT_AFTER lines it is folded into a new snapshot,
+which is written to a temporary file, fsynced and renamed over the old one.
+
+GUI, CLI and daemon may share the files: journal appends and compaction
+hold an exclusive flock on vaults.json.lock.
+"""
+
+import os
+import json
+import fcntl
+import contextlib
+import threading
+
+from vault import Vault
+
+COMPACT_AFTER = 128 # Journal lines before they are folded into the snapshot
+FLUSH_DELAY_MS = 250 # Debounce window for coalescing writes
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def write_atomic(path, content):
+    """Replace path with content so that it is either complete or absent"""
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, 'w') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(os.path.dirname(path))
+
+def _fsync_dir(path):
+    fd = os.open(path or ".", os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def iter_json_list(f):
+    """Yield the elements of a JSON list from a file without parsing it all first"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    started = False
+    while True:
+        # Skip whitespace and separators
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,[":
+            if buffer[pos] == "[":
+                started = True
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        if pos < len(buffer) and started:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                yield item
+                pos = end
+                continue
+            except ValueError:
+                if eof:
+                    raise
+        elif pos < len(buffer):
+            raise ValueError("Not a JSON list")
+        if eof:
+            if started:
+                raise ValueError("Unterminated JSON list")
+            return
+        chunk = f.read(READ_CHUNK_SIZE)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
+class VaultStore:
+    """The saved vault list, keyed by vault path.
+
+    `schedule(delay_ms, callback)` runs the debounced flush; pass
+    GLib.timeout_add-style scheduling from the GTK main loop. Without it a
+    background timer thread is used.
+    """
+
+    def __init__(self, path=None, schedule=None):
+        if path is None:
+            import config
+            path = config.vaults_file()
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.lock_path = path + ".lock"
+        self._schedule = schedule
+        self._saved = {} # vault path -> dict as last read or written
+        self._pending = {} # vault path -> dict to write, or None to delete
+        self._flush_scheduled = False
+        self._lock = threading.RLock()
+
+    # Reading
+
+    def _read_journal(self):
+        """Return ({path: dict or None}, [paths in first-seen order])"""
+        changes = {}
+        order = []
+        try:
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A torn last line from a crash; earlier lines are intact
+                        continue
+                    vault_path = entry.get("path")
+                    if not vault_path:
+                        continue
+                    if vault_path not in changes:
+                        order.append(vault_path)
+                    changes[vault_path] = entry.get("vault")
+        except FileNotFoundError:
+            pass
+        return changes, order
+
+    def iter_load(self):
+        """Yield saved vaults one at a time, in list order"""
+        return self._iter_vaults(strict=False)
+
+    def _iter_vaults(self, strict):
+        # strict: raise on an unreadable snapshot instead of yielding what was read
+        changes, order = self._read_journal()
+        seen = set()
+        try:
+            with open(self.path, 'r') as f:
+                for data in iter_json_list(f):
+                    vault_path = data.get("path")
+                    if vault_path in seen:
+                        continue
+                    seen.add(vault_path)
+                    if vault_path in changes:
+                        data = changes[vault_path]
+                        if data is None:
+                            continue
+                    with self._lock:
+                        self._saved[vault_path] = data
+                    yield Vault.from_dict(data)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            if strict:
+                raise
+            print(f"Failed to load vaults: {e}", flush=True)
+
+        # Vaults added since the last compaction
+        for vault_path in order:
+            data = changes[vault_path]
+            if vault_path in seen or data is None:
+                continue
+            with self._lock:
+                self._saved[vault_path] = data
+            yield Vault.from_dict(data)
+
+    def load(self):
+        return list(self.iter_load())
+
+    # Writing
+
+    def put(self, vault):
+        """Save one vault (added or changed); a no-op if nothing changed"""
+        data = vault.to_dict()
+        with self._lock:
+            if self._pending.get(vault.path, self._saved.get(vault.path)) == data:
+                return
+            self._pending[vault.path] = data
+        self._schedule_flush()
+
+    def delete(self, vault_path):
+        with self._lock:
+            self._pending[vault_path] = None
+        self._schedule_flush()
+
+    def put_all(self, vaults):
+        for vault in vaults:
+            self.put(vault)
+
+    def _schedule_flush(self):
+        with self._lock:
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        if self._schedule is not None:
+            self._schedule(FLUSH_DELAY_MS, self._scheduled_flush)
+        else:
+            timer = threading.Timer(FLUSH_DELAY_MS / 1000, self._scheduled_flush)
+            timer.daemon = True
+            timer.start()
+
+    def _scheduled_flush(self):
+        self.flush()
+        return False
+
+    def flush(self):
+        """Write pending changes to the journal now"""
+        with self._lock:
+            self._flush_scheduled = False
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            lines = "".join(json.dumps({"path": p, "vault": data}) + "\n" for p, data in pending.items())
+            try:
+                with self._file_lock():
+                    fd = os.open(self.journal_path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o600)
+                    try:
+                        # Start on a fresh line after a torn write from a crash
+                        size = os.fstat(fd).st_size
+                        if size and os.pread(fd, 1, size - 1) != b"\n":
+                            lines = "\n" + lines
+                        os.write(fd, lines.encode('utf-8'))
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+                    if self._journal_lines() > COMPACT_AFTER:
+                        try:
+                            self._compact_locked()
+                        except (ValueError, KeyError) as e:
+                            # The journal still holds every change; keep it
+                            print(f"Not compacting, vault list snapshot is unreadable: {e}", flush=True)
+            except OSError as e:
+                print(f"Failed to save vaults: {e}", flush=True)
+                # Keep the changes for the next attempt
+                for vault_path, data in pending.items():
+                    self._pending.setdefault(vault_path, data)
+                return
+            for vault_path, data in pending.items():
+                if data is None:
+                    self._saved.pop(vault_path, None)
+                else:
+                    self._saved[vault_path] = data
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot. Raises ValueError if the
+        snapshot cannot be read, leaving both files untouched."""
+        self.flush()
+        with self._lock, self._file_lock():
+            self._compact_locked()
+
+    def close(self):
+        self.flush()
+
+    def _journal_lines(self):
+        try:
+            with open(self.journal_path, 'rb') as f:
+                return sum(1 for _ in f)
+        except FileNotFoundError:
+            return 0
+
+    def _compact_locked(self):
+        # Rebuild from disk, not from memory: other processes may have written.
+        # A partly readable snapshot must not replace the full one.
+        vaults = [vault.to_dict() for vault in self._iter_vaults(strict=True)]
+        write_atomic(self.path, json.dumps(vaults))
+        # A crash before this truncate only replays entries already in the snapshot
+        with open(self.journal_path, 'w') as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared with other processes using the same store"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
@@ -2,10 +2,14 @@ import os
 import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw, Gio, GLib
+from gi.repository import Gtk, Adw, Gio, GLib, GObject
 
 from vault import Vault, VaultStatus
-from row import VaultRow
+from vault_list import VaultListModel
+
+STARTUP_FALLBACK_MS = 1000 # Finish startup even if the window is never shown
+VAULTS_PER_BATCH = 500 # Vaults added to the model per main loop iteration while loading
+AUTOMOUNT_DELAY_MS = 500
 
 class MainWindow(Adw.ApplicationWindow):
     def __init__(self, *args, **kwargs):
@@ -14,8 +18,7 @@ class MainWindow(Adw.ApplicationWindow):
         self.set_default_size(550, 600)
         self.set_title("Locker")
         
-        self.vaults = [] 
-        self._rows = [] 
+        self.vault_list = VaultListModel()
 
         # Main content with toast overlay
         self.toast_overlay = Adw.ToastOverlay()
@@ -41,6 +44,22 @@ class MainWindow(Adw.ApplicationWindow):
         add_btn.set_menu_model(self.create_add_menu_model())
         header.pack_start(add_btn)
         
+        # Search
+        search_btn = Gtk.ToggleButton(icon_name="system-search-symbolic")
+        search_btn.set_tooltip_text("Search Vaults")
+        header.pack_end(search_btn)
+        
+        self.search_entry = Gtk.SearchEntry()
+        self.search_entry.set_placeholder_text("Name, path, or is:unlocked")
+        self.search_entry.set_hexpand(True)
+        self.search_entry.connect("search-changed", self.on_search_changed)
+        self.search_bar = Gtk.SearchBar(child=Adw.Clamp(child=self.search_entry))
+        self.search_bar.connect_entry(self.search_entry)
+        self.search_bar.set_key_capture_widget(self)
+        self.search_bar.bind_property("search-mode-enabled", search_btn, "active",
+                                      GObject.BindingFlags.BIDIRECTIONAL | GObject.BindingFlags.SYNC_CREATE)
+        self.toolbar_view.add_top_bar(self.search_bar)
+        
         # Register window actions
         self.setup_actions()
 
@@ -54,31 +73,85 @@ class MainWindow(Adw.ApplicationWindow):
         self.status_page.set_description("Add a vault to get started.")
         self.status_page.set_icon_name("io.github.ljam96.locker") 
         self.stack.add_named(self.status_page, "empty")
-
-        # List view (Preferences Page used as a list container)
-        self.pref_page = Adw.PreferencesPage()
         
-        # We need a group to hold the rows
-        self.vaults_group = Adw.PreferencesGroup()
-        self.pref_page.add(self.vaults_group)
-        
-        self.stack.add_named(self.pref_page, "list")
+        # Status Page (Nothing matches the search)
+        no_results_page = Adw.StatusPage()
+        no_results_page.set_title("No Results Found")
+        no_results_page.set_description("Try a different search.")
+        no_results_page.set_icon_name("edit-find-symbolic")
+        self.stack.add_named(no_results_page, "no-results")
+
+        # List view: rows are created for visible vaults only and recycled
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self.on_row_setup)
+        factory.connect("bind", self.on_row_bind)
+        factory.connect("unbind", self.on_row_unbind)
+        
+        self.list_view = Gtk.ListView(model=Gtk.NoSelection(model=self.vault_list.filtered),
+                                      factory=factory)
+        self.list_view.set_show_separators(True)
+        self.list_view.add_css_class("boxed-list")
+        self.list_view.set_valign(Gtk.Align.START)
+        self.list_view.connect("activate", self.on_list_activate)
+        
+        clamp = Adw.Clamp(child=self.list_view)
+        clamp.set_margin_top(24)
+        clamp.set_margin_bottom(24)
+        clamp.set_margin_start(12)
+        clamp.set_margin_end(12)
+        self.list_scroller = Gtk.ScrolledWindow(child=clamp)
+        self.list_scroller.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        
+        self.stack.add_named(self.list_scroller, "list")
+        self.vault_list.filtered.connect("items-changed", lambda *args: self.update_ui_state())
 
         self.config_dir = os.path.join(GLib.get_user_config_dir(), "locker")
         self.migrate_data()
         self.vaults_file = os.path.join(self.config_dir, "vaults.json")
+        
+        # Everything that is not needed to draw the list waits for the first frame
+        self._startup_done = False
+        self._startup_waiting = False
         self.load_vaults()
+        self.update_ui_state()
+        self.connect("map", self.on_first_map)
+        GLib.timeout_add(STARTUP_FALLBACK_MS, self.finish_startup) # Window kept hidden
+        
+        # Connect close request handler
+        self.connect("close-request", self.on_close_request)
+    
+    def on_first_map(self, widget):
+        # Low priority runs after the frame clock has laid out and painted
+        GLib.idle_add(self.finish_startup, priority=GLib.PRIORITY_LOW)
+    
+    def finish_startup(self):
+        """Attach to the daemon, restore mount states and start auto-mount"""
+        if self._startup_done:
+            return False
+        if not self._vaults_loaded:
+            # load_vault_batch() calls back once every row exists
+            self._startup_waiting = True
+            return False
+        self._startup_done = True
+        import startup_profile
+        startup_profile.mark("after first frame")
+        
+        # If the background daemon is running it owns the mounts; act as its client
+        from backend import CryptomatorBackend
+        from daemon import DaemonClient
+        CryptomatorBackend.remote = DaemonClient.connect()
+        CryptomatorBackend.exit_listeners.append(
+            lambda vault_path: GLib.idle_add(self.on_mount_process_exited, vault_path))
+        if CryptomatorBackend.remote is None:
+            CryptomatorBackend.start_standby() # The daemon starts its own otherwise
         
         # Restore vault states (detect if still mounted)
         self.restore_vault_states()
-        
-        self.update_ui_state()
+        startup_profile.finish()
         
         # Auto-mount logic
-        GLib.timeout_add(500, self.check_automount) # Small delay to let UI show first or run in BG?
-        
-        # Connect close request handler
-        self.connect("close-request", self.on_close_request)
+        GLib.timeout_add(AUTOMOUNT_DELAY_MS, self.check_automount)
+        return False
 
     def migrate_data(self):
         """Migrate data from old config locations to the new 'locker' directory"""
@@ -111,40 +184,78 @@ class MainWindow(Adw.ApplicationWindow):
     def check_automount(self):
         # Load settings to see if automount is enabled
         settings_file = os.path.join(self.config_dir, "settings.json")
-        enabled = False
+        data = {}
         if os.path.exists(settings_file):
             try:
                 import json
                 with open(settings_file, 'r') as f:
                     data = json.load(f)
-                    enabled = data.get("automount", False)
             except: pass
         
-        if enabled:
-            self.perform_automount()
+        if data.get("automount", False):
+            from automount import DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT
+            self.perform_automount(
+                max_workers=data.get("automount_concurrency", DEFAULT_CONCURRENCY),
+                timeout=data.get("automount_timeout", DEFAULT_TIMEOUT)
+            )
         return False
     
     def restore_vault_states(self):
         """Check if vaults are still mounted from previous session"""
+        from mount_monitor import MountMonitor
+        from vault import restore_mount_states
+        
+        # One scan of the mount table serves every row
+        monitor = MountMonitor.get()
+        monitor.refresh()
+        
+        changed = restore_mount_states(self.vault_list.vaults(),
+                                       lambda mount_path: monitor.mount_id(mount_path) is not None)
+        for vault in changed:
+            self.vault_list.get(vault.path).notify_changed()
+        
+        # From now on the kernel tells us when mounts come and go
+        monitor.connect(self.on_mounts_changed)
+        monitor.start()
+    
+    def on_mounts_changed(self, added, removed):
+        """Mark vaults locked when their mount disappears behind our back, and
+        unlocked when the daemon mounts them"""
         from backend import CryptomatorBackend
         
-        for row in self.get_vault_rows():
-            vault = row.vault
-            # Check if vault has a mount_path saved and if it's still mounted
-            if vault.mount_path and CryptomatorBackend.is_mounted(vault.path, vault.mount_path):
-                print(f"DEBUG: Vault {vault.name} is still mounted at {vault.mount_path}", flush=True)
-                vault.status = VaultStatus.UNLOCKED
-                row.update_status()
-            else:
-                # Not mounted, clear mount_path
-                vault.mount_path = None
+        for item in self.vault_list:
+            vault = item.vault
+            if CryptomatorBackend.remote is not None and vault.status == VaultStatus.LOCKED:
+                mount_point = CryptomatorBackend.default_mount_point(vault.name)
+                if mount_point in added:
+                    vault.status = VaultStatus.UNLOCKED
+                    vault.mount_path = mount_point
+                    item.notify_changed()
+                    continue
+            if (vault.status == VaultStatus.UNLOCKED and vault.mount_path in removed
+                    and not CryptomatorBackend.is_restarting(vault.path)):
+                print(f"DEBUG: Vault {vault.name} was unmounted externally", flush=True)
+                CryptomatorBackend.forget(vault.path)
                 vault.status = VaultStatus.LOCKED
-                row.update_status()
+                vault.mount_path = None
+                item.notify_changed()
+    
+    def on_mount_process_exited(self, vault_path):
+        """A mount process died and was not restarted"""
+        item = self.vault_list.get(vault_path)
+        if item is not None and item.vault.status == VaultStatus.UNLOCKED:
+            item.vault.status = VaultStatus.LOCKED
+            item.vault.mount_path = None
+            item.notify_changed()
+            self.save_vault(item.vault)
+            toast = Adw.Toast.new(f"'{item.vault.name}' stopped unexpectedly and was locked")
+            self.toast_overlay.add_toast(toast)
+        return False
     
     def on_close_request(self, window):
         """Handle window close request - warn if vaults are unlocked"""
-        unlocked_vaults = [row.vault for row in self.get_vault_rows() 
-                          if row.vault.status == VaultStatus.UNLOCKED]
+        unlocked_vaults = [vault for vault in self.vault_list.vaults()
+                          if vault.status == VaultStatus.UNLOCKED]
         
         if unlocked_vaults:
             # Save vault states before showing dialog
@@ -177,41 +288,49 @@ class MainWindow(Adw.ApplicationWindow):
         self.save_vaults()
         return False  # Allow default close
 
-    def perform_automount(self):
-        import keyring_helper
-        from backend import CryptomatorBackend
+    def perform_automount(self, max_workers=None, timeout=None):
+        """Unlock all vaults with saved passwords in parallel, off the main loop"""
+        from automount import AutoMounter, DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT
+        import tracing
+        
+        # Ends on the main loop once every vault is done
+        span = tracing.span("automount", vaults=len(self.vault_list))
+        states = {}
+        
+        def on_progress(vault, state, mount_path):
+            item = self.vault_list.get(vault.path)
+            if item is not None:
+                item.set_automount_state(state, mount_path)
+            if state != "unlocking":
+                states[state] = states.get(state, 0) + 1
+            return False
+        
+        def on_finished():
+            span.end(**states)
+            self.save_vaults()
+            return False
         
-        for row in self.get_vault_rows():
-            vault = row.vault
-            if vault.status == VaultStatus.LOCKED:
-                pwd = keyring_helper.load_password(vault.path)
-                if pwd:
-                    home_dir = os.path.expanduser('~')
-                    home_dir = os.path.expanduser('~')
-                    mount_base = os.path.join(home_dir, "mnt", "cryptomator")
-                    mount_point = os.path.join(mount_base, vault.name)
-                    
-                    print(f"Auto-mounting {vault.name}...", flush=True)
-                    success, actual_mount = CryptomatorBackend.unlock(vault.path, pwd, mount_point)
-                    if success:
-                         vault.status = VaultStatus.UNLOCKED
-                         vault.mount_path = actual_mount
-                         row.update_status()
-                         print(f"Auto-mounted {vault.name} at {actual_mount}", flush=True)
-                         # Don't auto-open file manager for automount to avoid multiple windows
-
-    def get_vault_rows(self):
-        # Helper to iterate rows in vaults_group
-        # Adw.PreferencesGroup doesn't explicitly expose child list easily via get_children?
-        # It inherits from Gtk.Widget, but children are rows.
-        # Let's iterate using standard Gtk widget capabilities if needed, 
-        # or maintain a list of rows self.rows = []
-        # easier to use self.vaults but I need the ROW widget to update status visually?
-        # Actually I can update vault object, but Row needs to reflect it.
-        # Row has `vault` ref. If I update vault status, I need row to call update_status().
-        # I should keep track of rows or find them.
-        # Let's just create a list self.rows = [] in init and append.
-        return self._rows
+        mounter = AutoMounter(
+            max_workers=max_workers or DEFAULT_CONCURRENCY,
+            timeout=timeout or DEFAULT_TIMEOUT,
+            dispatch=GLib.idle_add
+        )
+        mounter.run(self.vault_list.vaults(), on_progress, on_finished)
+
+    def on_row_setup(self, factory, list_item):
+        from row import VaultRow
+        list_item.set_child(VaultRow())
+
+    def on_row_bind(self, factory, list_item):
+        list_item.get_child().bind(list_item.get_item())
+
+    def on_row_unbind(self, factory, list_item):
+        list_item.get_child().unbind()
+
+    def on_list_activate(self, list_view, position):
+        item = self.vault_list.filtered.get_item(position)
+        if item is not None:
+            self.on_row_activated(item)
 
     def on_settings_clicked(self, action, param):
         from settings_dialog import SettingsDialog
@@ -220,40 +339,50 @@ class MainWindow(Adw.ApplicationWindow):
 
 
     def load_vaults(self):
-        if not os.path.exists(self.vaults_file):
-            return
-            
-        try:
-            with open(self.vaults_file, 'r') as f:
-                import json
-                data = json.load(f)
-                for v_data in data:
-                    vault = Vault.from_dict(v_data)
-                    self.vaults.append(vault)
-                    row = VaultRow(vault)
-                    self.vaults_group.add(row)
-                    self._rows.append(row)
-                    
-                    # Connect activation
-                    row.connect("activated", self.on_row_activated)
-        except Exception as e:
-            print(f"Failed to load vaults: {e}")
+        """Show the first rows right away and stream the rest in from idle"""
+        from vault_store import VaultStore
+        
+        self.store = VaultStore(self.vaults_file, schedule=GLib.timeout_add)
+        self._vault_loader = self.store.iter_load()
+        self._vaults_loaded = False
+        if self.load_vault_batch():
+            GLib.idle_add(self.load_vault_batch)
+    
+    def load_vault_batch(self):
+        """Add up to VAULTS_PER_BATCH vaults; returns True while more are left"""
+        batch = []
+        for vault in self._vault_loader:
+            batch.append(vault)
+            if len(batch) == VAULTS_PER_BATCH:
+                break
+        self.vault_list.extend(batch)
+        self.update_ui_state()
+        if len(batch) < VAULTS_PER_BATCH:
+            self._vaults_loaded = True
+            if self._startup_waiting:
+                self.finish_startup()
+            return False
+        return True
+    
+    def save_vault(self, vault):
+        """Persist one added or changed vault (debounced)"""
+        self.store.put(vault)
 
     def save_vaults(self):
-        os.makedirs(self.config_dir, exist_ok=True)
-        data = [v.to_dict() for v in self.vaults]
-        try:
-            with open(self.vaults_file, 'w') as f:
-                import json
-                json.dump(data, f)
-        except Exception as e:
-            print(f"Failed to save vaults: {e}")
+        """Persist every vault that changed, immediately"""
+        self.store.put_all(self.vault_list.vaults())
+        self.store.flush()
     
-    def remove_vault(self, vault):
-        """Remove a vault from the list"""
-        # Find the row for this vault
-        row = next((r for r in self._rows if r.vault == vault), None)
-        if not row:
+    def add_vault(self, vault):
+        """Add a vault to the list and save it"""
+        item = self.vault_list.append(vault)
+        self.save_vault(vault)
+        self.update_ui_state()
+        return item
+    
+    def remove_vault(self, vault, forget_password=False):
+        """Remove a vault from the list, and its saved password if asked to"""
+        if vault.path not in self.vault_list:
             return
 
         # First, ensure vault is locked (backend logic)
@@ -263,19 +392,13 @@ class MainWindow(Adw.ApplicationWindow):
             # Monitoring is now in VaultView, which calls this. 
             # VaultView should handle its own stopping.
         
-        # Remove from vaults list
-        if vault in self.vaults:
-            self.vaults.remove(vault)
-        
-        # Remove from rows list
-        if row in self._rows:
-            self._rows.remove(row)
-        
-        # Remove from UI
-        self.vaults_group.remove(row)
+        # Remove from the list; its row is unbound and recycled
+        self.vault_list.remove(vault.path)
         
         # Save changes
-        self.save_vaults()
+        self.store.delete(vault.path)
+        if forget_password:
+            self.forget_password(vault)
         
         # Update UI state
         self.update_ui_state()
@@ -286,12 +409,31 @@ class MainWindow(Adw.ApplicationWindow):
             toast.set_timeout(3)
             self.toast_overlay.add_toast(toast)
 
+    def forget_password(self, vault):
+        """Remove a vault's saved password from the keyring in the background"""
+        try:
+            import keyring_helper
+            future = keyring_helper.delete_password_async(vault.path)
+        except Exception as e:
+            print(f"DEBUG: Keyring unavailable: {e}", flush=True)
+            return
+
+        def on_deleted(future):
+            if future.exception() is None and future.result():
+                print(f"DEBUG: Removed saved password for {vault.name}", flush=True)
+        future.add_done_callback(on_deleted)
+
     def update_ui_state(self):
-        if not self.vaults:
+        if not len(self.vault_list):
             self.stack.set_visible_child_name("empty")
+        elif not self.vault_list.filtered.get_n_items():
+            self.stack.set_visible_child_name("no-results")
         else:
             self.stack.set_visible_child_name("list")
 
+    def on_search_changed(self, entry):
+        self.vault_list.search(entry.get_text())
+
     def on_add_clicked(self, action, param):
         dialog = Gtk.FileChooserNative(
             title="Open Cryptomator Vault",
@@ -386,16 +528,7 @@ class MainWindow(Adw.ApplicationWindow):
         if success:
             # Add vault to list
             vault = Vault(name=vault_name, path=vault_path)
-            self.vaults.append(vault)
-            self.save_vaults()
-            
-            row = VaultRow(vault)
-            row.set_activatable(True)
-            row.connect("activated", self.on_row_activated)
-            self.vaults_group.add(row)
-            self._rows.append(row)
-            
-            self.update_ui_state()
+            self.add_vault(vault)
             
             # Show success message
             success_dialog = Adw.MessageDialog(
@@ -413,17 +546,13 @@ class MainWindow(Adw.ApplicationWindow):
             
             def on_response(dlg, response):
                 if response == "unlock_now":
-                    # Find the row and trigger unlock
-                    for row in self._rows:
-                        if row.vault.path == vault_path:
-                            # Navigate to page
-                            self.on_row_activated(row)
-                            # Can we auto-trigger unlock? 
-                            # The view creates a new instance. We can't easily reach it unless on_row_activated returned it.
-                            # But we can just leave it as user needs to click unlock button on the new page.
-                            # Or we can push and then find the page.
-                            # Simpler: just navigate. The user will see the big "Unlock" button.
-                            break
+                    # Find the vault and trigger unlock
+                    item = self.vault_list.get(vault_path)
+                    if item is not None:
+                        # Navigate to page
+                        self.on_row_activated(item)
+                        # Can we auto-trigger unlock? 
+                        # Simpler: just navigate. The user will see the big "Unlock" button.
                 dlg.destroy()
             
             success_dialog.connect("response", on_response)
@@ -473,27 +602,19 @@ class MainWindow(Adw.ApplicationWindow):
         action = Gio.SimpleAction.new("preferences", None)
         action.connect("activate", self.on_settings_clicked)
         self.add_action(action)
+        
+        # Search
+        action = Gio.SimpleAction.new("search", None)
+        action.connect("activate", lambda *args: self.search_bar.set_search_mode(True))
+        self.add_action(action)
+        app = self.get_application()
+        if app is not None:
+            app.set_accels_for_action("win.search", ["<Control>f"])
 
-    def on_row_activated(self, row):
+    def on_row_activated(self, item):
         # Navigation disabled in single-page mode
         pass
 
-    def update_list_ui(self):
-        # Refresh the rows in the main list to reflect status changes
-        # For now, we might just need to update the specific row if we had a reference, 
-        # but simpler to just reload or if we have the row object, call update.
-        # Since we don't keep a map of rows easily, let's just iterate or rely on the fact that
-        # the row objects are alive. 
-        # Actually, VaultRow listens to nothing? VaultRow needs to update itself?
-        # Let's make VaultRow have an update method and call it.
-        for row in self._rows:
-            if hasattr(row, 'update_ui'):
-                row.update_ui()
-            # Or re-create list? Re-creating is safer but heavier.
-            # Let's try to find the row for the Vault and update it.
-            # Ideally the Row should listen to Vault changes or we notify it.
-        pass
-        
     def show_about(self, action, param):
         dialog = Adw.AboutDialog(
             application_name="Locker",
@@ -516,15 +637,7 @@ class MainWindow(Adw.ApplicationWindow):
             
             # Create vault and row
             vault = Vault(name=name, path=path)
-            self.vaults.append(vault)
-            self.save_vaults()
-            
-            row = VaultRow(vault)
-            row.set_activatable(True)
-            row.connect("activated", self.on_row_activated)
-            self.vaults_group.add(row)
-            self._rows.append(row)
-            
-            self.update_ui_state()
+            if vault.path not in self.vault_list:
+                self.add_vault(vault)
             
         dialog.destroy()